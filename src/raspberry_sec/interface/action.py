@@ -2,12 +2,14 @@ class ActionMessage:
 	"""
 	Class for holding Action alert details
 	"""
-	def __init__(self, data):
+	def __init__(self, data, images: list = None):
 		"""
 		Constructor
 		:param data: alert detail
+		:param images: snapshots of the alert (list of JPEG encoded bytes)
 		"""
 		self.data = data
+		self.images = images if images is not None else []
 
 
 class Action:
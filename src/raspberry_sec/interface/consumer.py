@@ -12,6 +12,15 @@ class ConsumerContext:
 		self.data = _data
 		self.alert = _alert
 		self.alert_data = _alert_data
+		# derived views of the sample computed by the producer (view name --> data)
+		self.views = dict()
+		# regions of interest found by a previous consumer: list of (x, y, width, height),
+		# relative to the size of the sample (0.0 - 1.0), None if not known
+		self.regions = None
+		# identifiers of the tracked objects in data (in the same order), None if not known
+		self.track_ids = None
+		# snapshots to be reported in case of an alert: list of JPEG encoded images (bytes)
+		self.alert_images = []
 
 
 class Consumer:
@@ -44,6 +53,27 @@ class Consumer:
 		"""
 		pass
 
+	def notify(self, context: ConsumerContext):
+		"""
+		Called with the final context of every sample, after the consumers of the stream have run
+		(also if this consumer was skipped because a previous one did not alert).
+		The alert is already False if the zone of the producer is not active.
+		:param context: result of the stream for the sample
+		"""
+		pass
+
+	def get_shared_model(self):
+		"""
+		:return: path of the model to be run by the shared inference process (None if not needed)
+		"""
+		return None
+
+	def set_inference_client(self, client):
+		"""
+		:param client: InferenceClient of the shared model (see get_shared_model)
+		"""
+		pass
+
 	def __eq__(self, other):
 		"""
 		:param other: other object
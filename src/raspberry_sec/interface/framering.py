@@ -0,0 +1,256 @@
+import logging
+import struct
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from raspberry_sec.interface.producer import ProducerDataProxy
+
+
+class SharedFrameRing(ProducerDataProxy):
+	"""
+	Shared-memory transport for frames (alternative of the BaseManager proxy).
+	The producer process copies every frame into the next slot of a fixed-size ring,
+	readers get a NumPy view of the latest slot without any pickling or copying.
+	Readers can also wait until a new frame is published (see get_next).
+	Derived views of a frame (e.g. resized, gray) can be published in their own rings
+	under the same sequence number, so that they are computed only once.
+	"""
+	LOGGER = logging.getLogger('SharedFrameRing')
+	# sequence number of the latest frame
+	RING_HEADER = struct.Struct('=Q')
+	# sequence number, capture timestamp, number of dimensions, shape (max. 3 dimensions), dtype
+	SLOT_HEADER = struct.Struct('=QdI3I8s')
+	MAX_DIMENSIONS = 3
+	READ_ATTEMPTS = 3
+	# readers poll the sequence number instead of waiting on a shared condition:
+	# notify_all() of a multiprocessing.Condition hangs once a waiting reader gets terminated
+	POLL_INTERVAL = 0.002
+	MAX_POLL_INTERVAL = 0.01
+
+	def __init__(self, slots: int, slot_size: int, name: str = None, views: dict = None):
+		"""
+		Constructor
+		:param slots: number of frames the ring can hold
+		:param slot_size: maximum size of a frame in bytes
+		:param name: name of an existing shared memory block to attach to (None creates a new one)
+		:param views: rings of the derived views (view name --> SharedFrameRing)
+		"""
+		super().__init__()
+		self.views = views if views is not None else dict()
+		self.slots = slots
+		self.slot_size = slot_size
+		self.slot_stride = SharedFrameRing.SLOT_HEADER.size + slot_size
+		self.owner = name is None
+
+		size = SharedFrameRing.RING_HEADER.size + slots * self.slot_stride
+		self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+		if self.owner:
+			SharedFrameRing.RING_HEADER.pack_into(self.shm.buf, 0, 0)
+			SharedFrameRing.LOGGER.debug('Created ring: ' + self.shm.name + ' (' + str(size) + ' bytes)')
+
+	def __getstate__(self):
+		"""
+		Only the name of the shared memory block travels to the other processes
+		:return: state to be pickled
+		"""
+		return {
+			'name': self.shm.name,
+			'slots': self.slots,
+			'slot_size': self.slot_size,
+			'views': self.views
+		}
+
+	def __setstate__(self, state: dict):
+		"""
+		Attaches to the shared memory block created by the owner
+		:param state: unpickled state
+		"""
+		self.__init__(
+			slots=state['slots'],
+			slot_size=state['slot_size'],
+			name=state['name'],
+			views=state['views'])
+
+	def get_slot_offset(self, seq: int):
+		"""
+		:param seq: sequence number of the frame
+		:return: offset of the slot header the frame is stored in
+		"""
+		return SharedFrameRing.RING_HEADER.size + ((seq - 1) % self.slots) * self.slot_stride
+
+	def get_latest_seq(self):
+		"""
+		:return: sequence number of the latest frame (0 if there is none yet)
+		"""
+		return SharedFrameRing.RING_HEADER.unpack_from(self.shm.buf, 0)[0]
+
+	def write_slot(self, seq: int, new: np.ndarray):
+		"""
+		Copies the frame into its slot (without publishing it)
+		:param seq: sequence number of the frame
+		:param new: frame
+		"""
+		if new.ndim > SharedFrameRing.MAX_DIMENSIONS or new.nbytes > self.slot_size:
+			raise ValueError('Frame does not fit into the ring slot: ' + str(new.shape))
+
+		offset = self.get_slot_offset(seq)
+		data_offset = offset + SharedFrameRing.SLOT_HEADER.size
+		shape = tuple(new.shape) + (0,) * (SharedFrameRing.MAX_DIMENSIONS - new.ndim)
+
+		# invalidate the slot while it is being overwritten
+		SharedFrameRing.SLOT_HEADER.pack_into(self.shm.buf, offset, 0, 0.0, 0, 0, 0, 0, b'')
+		slot = np.ndarray(new.shape, dtype=new.dtype, buffer=self.shm.buf, offset=data_offset)
+		np.copyto(slot, new)
+		SharedFrameRing.SLOT_HEADER.pack_into(
+			self.shm.buf, offset, seq, time.time(), new.ndim, *shape, new.dtype.str.encode())
+
+	def set_data(self, new: np.ndarray, views: dict = None):
+		"""
+		Copies the frame (and its views) into the next slot and publishes it
+		:param new: frame
+		:param views: derived views of the frame (view name --> image)
+		"""
+		seq = self.get_latest_seq() + 1
+		# views go first, so they are already there when the frame gets published
+		if views:
+			for view_name, view in views.items():
+				self.views[view_name].write_slot(seq, view)
+		self.write_slot(seq, new)
+		SharedFrameRing.RING_HEADER.pack_into(self.shm.buf, 0, seq)
+
+	def read(self, seq: int):
+		"""
+		The returned view is valid until the writer wraps around the ring
+		(slots - 1 further frames), copy it if it has to be kept longer.
+		:param seq: sequence number of the frame
+		:return: (sequence number, timestamp, read-only view) or None if the frame is not in the ring
+		"""
+		if seq <= 0:
+			return None
+
+		offset = self.get_slot_offset(seq)
+		slot_seq, timestamp, ndim, *shape, dtype = SharedFrameRing.SLOT_HEADER.unpack_from(self.shm.buf, offset)
+		# not written yet or the writer has already started overwriting this slot
+		if slot_seq != seq:
+			return None
+
+		frame = np.ndarray(
+			tuple(shape[:ndim]),
+			dtype=np.dtype(dtype.rstrip(b'\0').decode()),
+			buffer=self.shm.buf,
+			offset=offset + SharedFrameRing.SLOT_HEADER.size)
+		frame.flags.writeable = False
+		return seq, timestamp, frame
+
+	def read_latest(self):
+		"""
+		:return: (sequence number, timestamp, read-only view) of the latest frame or None (see read)
+		"""
+		for _ in range(SharedFrameRing.READ_ATTEMPTS):
+			seq = self.get_latest_seq()
+			if seq == 0:
+				return None
+
+			latest = self.read(seq)
+			if latest is not None:
+				return latest
+
+		SharedFrameRing.LOGGER.warning('Could not read a consistent frame')
+		return None
+
+	def read_range(self, first_seq: int, last_seq: int):
+		"""
+		Copies consecutive frames out of the ring (e.g. chunks of a continuous signal).
+		Frames that are not in the ring any more (or got overwritten while being copied) are skipped.
+		:param first_seq: sequence number of the first frame
+		:param last_seq: sequence number of the last frame
+		:return: list of (sequence number, timestamp, copy of the frame)
+		"""
+		frames = []
+		for seq in range(max(first_seq, last_seq - self.slots + 1, 1), last_seq + 1):
+			frame = self.read(seq)
+			if frame is None:
+				continue
+			copy = frame[2].copy()
+			# the writer invalidates the slot header before overwriting it
+			if self.read(seq) is not None:
+				frames.append((seq, frame[1], copy))
+		return frames
+
+	def get_view(self, view_name: str, seq: int):
+		"""
+		:param view_name: name of the derived view
+		:param seq: sequence number of the frame
+		:return: read-only view or None if it is not available (any more)
+		"""
+		view_ring = self.views.get(view_name)
+		if view_ring is None:
+			return None
+
+		view = view_ring.read(seq)
+		return view[2] if view is not None else None
+
+	def get_data(self):
+		"""
+		:return: read-only view of the latest frame or None (see read_latest)
+		"""
+		latest = self.read_latest()
+		return latest[2] if latest else None
+
+	def get_next(self, after_id: int, timeout: float):
+		"""
+		Waits until a frame newer than after_id is published.
+		The sequence number is polled, backing off from POLL_INTERVAL to MAX_POLL_INTERVAL.
+		:param after_id: sequence number of the last frame seen by the caller
+		:param timeout: in seconds
+		:return: (sequence number, timestamp, read-only view) or None on timeout
+		"""
+		deadline = time.monotonic() + timeout
+		interval = SharedFrameRing.POLL_INTERVAL
+		while self.get_latest_seq() <= after_id:
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				return None
+			time.sleep(min(interval, remaining))
+			interval = min(interval * 2, SharedFrameRing.MAX_POLL_INTERVAL)
+
+		return self.read_latest()
+
+	def release(self):
+		"""
+		Detaches from the shared memory block and frees it if this instance created it
+		"""
+		for view_ring in self.views.values():
+			view_ring.release()
+
+		try:
+			self.shm.close()
+		except BufferError:
+			SharedFrameRing.LOGGER.warning('Frames are still referenced, keeping ' + self.shm.name + ' mapped')
+
+		if self.owner:
+			self.shm.unlink()
+
+
+class FrameViews:
+	"""
+	Read-only access to the derived views of a given frame.
+	Views are only read from shared memory when asked for.
+	"""
+	def __init__(self, ring: SharedFrameRing, seq: int):
+		"""
+		Constructor
+		:param ring: ring of the frames
+		:param seq: sequence number of the frame
+		"""
+		self.ring = ring
+		self.seq = seq
+
+	def get(self, view_name: str, default=None):
+		"""
+		:param view_name: name of the derived view
+		:param default: returned if the view is not available
+		:return: read-only view
+		"""
+		view = self.ring.get_view(view_name, self.seq)
+		return view if view is not None else default
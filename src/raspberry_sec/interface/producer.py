@@ -1,5 +1,7 @@
+import time
 from enum import Enum
 from multiprocessing.managers import BaseManager
+from threading import Condition
 
 from raspberry_sec.system.util import ProcessContext, ProcessReady
 
@@ -21,20 +23,29 @@ class ProducerDataManager(BaseManager):
 
 class ProducerDataProxy(object):
 	"""
-	Data proxy for shared data
+	Data proxy for shared data.
+	Every sample gets a monotonically increasing id and a timestamp,
+	so readers can wait for a new sample instead of re-reading the current one.
 	"""
 	def __init__(self):
 		"""
 		Constructor
 		"""
 		self.data = None
+		self.data_id = 0
+		self.timestamp = None
+		self.condition = Condition()
 
 	def set_data(self, new):
 		"""
-		Sets shared data
+		Sets shared data and wakes up the waiting readers
 		:param new: new data
 		"""
-		self.data = new
+		with self.condition:
+			self.data = new
+			self.data_id += 1
+			self.timestamp = time.time()
+			self.condition.notify_all()
 
 	def get_data(self):
 		"""
@@ -42,6 +53,18 @@ class ProducerDataProxy(object):
 		"""
 		return self.data
 
+	def get_next(self, after_id: int, timeout: float):
+		"""
+		Blocks until a sample newer than after_id arrives
+		:param after_id: id of the last sample seen by the caller
+		:param timeout: in seconds
+		:return: (id, timestamp, data) or None on timeout
+		"""
+		with self.condition:
+			if self.condition.wait_for(lambda: self.data_id > after_id, timeout):
+				return self.data_id, self.timestamp, self.data
+			return None
+
 
 class Producer(ProcessReady):
 	"""
@@ -68,6 +91,13 @@ class Producer(ProcessReady):
 		"""
 		pass
 
+	def release_shared_data_proxy(self, data_proxy: ProducerDataProxy):
+		"""
+		Frees the resources held by the shared data proxy (called once, on shutdown)
+		:param data_proxy: instance created by create_shared_data_proxy
+		"""
+		pass
+
 	def run(self, context: ProcessContext):
 		"""
 		Generates data for the other producers of the same class.
@@ -89,6 +119,24 @@ class Producer(ProcessReady):
 		"""
 		pass
 
+	def get_next_data(self, data_proxy: ProducerDataProxy, after_id: int, timeout: float):
+		"""
+		Waits for a sample that is newer than the one the caller has already seen
+		:param data_proxy: the producing Producer process stores the sample here
+		:param after_id: id of the last sample seen by the caller (0 if none)
+		:param timeout: in seconds
+		:return: (id, timestamp, sample data) or None if no new sample arrived in time
+		"""
+		return data_proxy.get_next(after_id, timeout)
+
+	def get_views(self, data_proxy: ProducerDataProxy, data_id: int):
+		"""
+		:param data_proxy: the producing Producer process stores the sample here
+		:param data_id: id of the sample
+		:return: dict-like object of the derived views of the sample (view name --> data)
+		"""
+		return dict()
+
 	def get_type(self):
 		"""
 		:return: Producer.Type
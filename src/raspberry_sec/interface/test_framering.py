@@ -0,0 +1,148 @@
+import unittest
+import multiprocessing
+import threading
+import time
+import numpy as np
+from raspberry_sec.interface.framering import SharedFrameRing, FrameViews
+
+
+def wait_for_frame(ring: SharedFrameRing):
+    ring.get_next(after_id=ring.get_latest_seq(), timeout=60)
+
+
+class TestSharedFrameRingMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = SharedFrameRing(slots=2, slot_size=4 * 4 * 3)
+
+    def tearDown(self):
+        self.ring.release()
+
+    def test_get_data_returns_none_when_empty(self):
+        # When
+        data = self.ring.get_data()
+
+        # Then
+        self.assertIsNone(data)
+
+    def test_get_data_returns_latest_frame(self):
+        # Given
+        frames = [np.full((4, 4, 3), i, dtype=np.uint8) for i in range(3)]
+
+        # When
+        for frame in frames:
+            self.ring.set_data(frame)
+        data = self.ring.get_data()
+
+        # Then
+        self.assertEqual(3, self.ring.get_latest_seq())
+        self.assertTrue(np.array_equal(frames[-1], data))
+
+    def test_set_data_throws_exception_when_frame_is_too_big(self):
+        # Given
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+        # Then
+        self.assertRaises(ValueError, self.ring.set_data, frame)
+
+    def test_attached_ring_shares_the_frames(self):
+        # Given
+        frame = np.arange(16, dtype=np.uint16).reshape(4, 4)
+        attached = SharedFrameRing(**self.ring.__getstate__())
+
+        # When
+        self.ring.set_data(frame)
+        data = attached.get_data()
+
+        # Then
+        self.assertFalse(attached.owner)
+        self.assertTrue(np.array_equal(frame, data))
+        del data
+        attached.release()
+
+    def test_get_next_returns_none_on_timeout(self):
+        # Given
+        self.ring.set_data(np.zeros((4, 4), dtype=np.uint8))
+
+        # When
+        result = self.ring.get_next(after_id=1, timeout=0.01)
+
+        # Then
+        self.assertIsNone(result)
+
+    def test_get_next_returns_newer_frame(self):
+        # Given
+        self.ring.set_data(np.zeros((4, 4), dtype=np.uint8))
+        self.ring.set_data(np.ones((4, 4), dtype=np.uint8))
+
+        # When
+        seq, timestamp, data = self.ring.get_next(after_id=1, timeout=0.01)
+
+        # Then
+        self.assertEqual(2, seq)
+        self.assertGreater(timestamp, 0)
+        self.assertEqual(1, data[0, 0])
+
+    def test_get_next_waits_for_published_frame(self):
+        # Given
+        frame = np.ones((4, 4), dtype=np.uint8)
+        timer = threading.Timer(0.05, self.ring.set_data, args=(frame, ))
+
+        # When
+        timer.start()
+        result = self.ring.get_next(after_id=0, timeout=1)
+        timer.join()
+
+        # Then
+        self.assertEqual(1, result[0])
+
+    def test_set_data_does_not_block_after_reader_is_terminated(self):
+        # Given
+        reader = multiprocessing.get_context('spawn').Process(target=wait_for_frame, args=(self.ring, ))
+        reader.start()
+        time.sleep(0.5)
+        reader.terminate()
+        reader.join()
+        writer = threading.Thread(target=self.ring.set_data, args=(np.ones((4, 4), dtype=np.uint8), ), daemon=True)
+
+        # When
+        writer.start()
+        writer.join(timeout=1)
+
+        # Then
+        self.assertFalse(writer.is_alive())
+        self.assertEqual(1, self.ring.get_latest_seq())
+
+    def test_read_range_skips_overwritten_frames(self):
+        # Given
+        for i in range(1, 5):
+            self.ring.set_data(np.full(4, i, dtype=np.int16))
+
+        # When
+        frames = self.ring.read_range(1, 4)
+
+        # Then
+        self.assertEqual([3, 4], [seq for seq, _, _ in frames])
+        self.assertEqual([3, 4], [data[0] for _, _, data in frames])
+
+    def test_views_are_published_with_the_frame(self):
+        # Given
+        ring = SharedFrameRing(slots=2, slot_size=4 * 4 * 3, views={'gray': SharedFrameRing(slots=2, slot_size=4 * 4)})
+
+        # When
+        ring.set_data(np.zeros((4, 4, 3), dtype=np.uint8), {'gray': np.full((4, 4), 7, dtype=np.uint8)})
+        views = FrameViews(ring, ring.get_latest_seq())
+        gray = views.get('gray')
+        missing = views.get('blurred')
+        outdated = FrameViews(ring, 2).get('gray')
+
+        # Then
+        self.assertEqual(7, gray[0, 0])
+        self.assertIsNone(missing)
+        self.assertIsNone(outdated)
+        del gray
+        ring.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from threading import Timer
+from raspberry_sec.interface.producer import ProducerDataProxy
+
+
+class TestProducerDataProxyMethods(unittest.TestCase):
+
+    def test_set_data_increments_id(self):
+        # Given
+        proxy = ProducerDataProxy()
+
+        # When
+        proxy.set_data('DATA1')
+        proxy.set_data('DATA2')
+
+        # Then
+        self.assertEqual(2, proxy.data_id)
+        self.assertEqual('DATA2', proxy.get_data())
+
+    def test_get_next_returns_none_on_timeout(self):
+        # Given
+        proxy = ProducerDataProxy()
+        proxy.set_data('DATA')
+
+        # When
+        result = proxy.get_next(after_id=1, timeout=0.01)
+
+        # Then
+        self.assertIsNone(result)
+
+    def test_get_next_waits_for_new_data(self):
+        # Given
+        proxy = ProducerDataProxy()
+        proxy.set_data('OLD')
+        Timer(0.05, proxy.set_data, args=('NEW',)).start()
+
+        # When
+        data_id, timestamp, data = proxy.get_next(after_id=1, timeout=1)
+
+        # Then
+        self.assertEqual(2, data_id)
+        self.assertEqual('NEW', data)
+
+
+if __name__ == '__main__':
+    unittest.main()
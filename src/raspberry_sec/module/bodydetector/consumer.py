@@ -10,6 +10,9 @@ class BodydetectorConsumer(Consumer):
 	Consumer class for detecting human body in an image
 	"""
 	LOGGER = logging.getLogger('BodydetectorConsumer')
+	# size of the default people detector window (width, height)
+	WINDOW_SIZE = (64, 128)
+	REGION_PADDING = 16
 
 	def __init__(self, parameters: dict):
 		"""
@@ -41,13 +44,12 @@ class BodydetectorConsumer(Consumer):
 		context.alert = False
 
 		if img is not None:
-			img = cv2.resize(img, (self.parameters['resize_width'], self.parameters['resize_height']))
-			img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-			found, _ = self.hog.detectMultiScale(
-				img,
-				winStride=(self.parameters['win_stride_x'], self.parameters['win_stride_y']),
-				padding=(self.parameters['padding_x'], self.parameters['padding_y']),
-				scale=self.parameters['scale'])
+			img = self.preprocess(context)
+			# only the moving regions are searched if a previous consumer has found them
+			if self.parameters.get('use_regions', False) and context.regions is not None:
+				found = self.detect_in_regions(img, context.regions)
+			else:
+				found = self.detect(img)
 
 			if len(found) > 0:
 				context.alert = True
@@ -59,5 +61,113 @@ class BodydetectorConsumer(Consumer):
 
 		return context
 
+	def detect(self, img):
+		"""
+		Runs the HOG people detector
+		:param img: gray image
+		:return: list of detected bodies
+		"""
+		found, _ = self.hog.detectMultiScale(
+			img,
+			winStride=(self.parameters['win_stride_x'], self.parameters['win_stride_y']),
+			padding=(self.parameters['padding_x'], self.parameters['padding_y']),
+			scale=self.parameters['scale'])
+		return found
+
+	def detect_in_regions(self, img, regions: list):
+		"""
+		Runs the HOG people detector on the padded, merged regions only
+		:param img: gray image
+		:param regions: see ConsumerContext.regions
+		:return: list of detected bodies (in region coordinates)
+		"""
+		padding = self.parameters.get('region_padding', BodydetectorConsumer.REGION_PADDING)
+		boxes = BodydetectorConsumer.to_boxes(regions, img.shape, padding, BodydetectorConsumer.WINDOW_SIZE)
+
+		found = []
+		for (x1, y1, x2, y2) in BodydetectorConsumer.merge_boxes(boxes):
+			found += list(self.detect(img[y1:y2, x1:x2]))
+		BodydetectorConsumer.LOGGER.debug('Searched ' + str(len(boxes)) + ' regions')
+		return found
+
+	@staticmethod
+	def to_boxes(regions: list, shape: tuple, padding: int, min_size: tuple):
+		"""
+		Converts the relative regions into padded boxes of the image
+		(at least as big as the detector window, if the image allows it)
+		:param regions: see ConsumerContext.regions
+		:param shape: of the image
+		:param padding: in pixels
+		:param min_size: (width, height) in pixels
+		:return: list of (x1, y1, x2, y2)
+		"""
+		height, width = shape[:2]
+		boxes = []
+		for (x, y, w, h) in regions:
+			x1, x2 = BodydetectorConsumer.expand(x * width, (x + w) * width, padding, min_size[0], width)
+			y1, y2 = BodydetectorConsumer.expand(y * height, (y + h) * height, padding, min_size[1], height)
+			boxes.append((x1, y1, x2, y2))
+		return boxes
+
+	@staticmethod
+	def expand(start: float, end: float, padding: int, min_length: int, limit: int):
+		"""
+		Pads an interval, grows it to min_length (around its center) and fits it into [0, limit]
+		:param start: of the interval
+		:param end: of the interval
+		:param padding: added to both sides
+		:param min_length: minimum length of the interval
+		:param limit: size of the image along this axis
+		:return: (start, end) as integers
+		"""
+		start, end = int(start) - padding, int(end) + padding
+		if end - start < min_length:
+			center = (start + end) // 2
+			start, end = center - min_length // 2, center + (min_length - min_length // 2)
+		if start < 0:
+			start, end = 0, end - start
+		if end > limit:
+			start, end = start - (end - limit), limit
+		return max(start, 0), end
+
+	@staticmethod
+	def merge_boxes(boxes: list):
+		"""
+		Merges the overlapping boxes
+		:param boxes: list of (x1, y1, x2, y2)
+		:return: list of (x1, y1, x2, y2) that do not overlap
+		"""
+		changed = True
+		while changed:
+			changed = False
+			merged = []
+			for box in boxes:
+				for i, other in enumerate(merged):
+					if box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]:
+						merged[i] = (
+							min(box[0], other[0]), min(box[1], other[1]),
+							max(box[2], other[2]), max(box[3], other[3]))
+						changed = True
+						break
+				else:
+					merged.append(box)
+			boxes = merged
+		return boxes
+
+	def preprocess(self, context: ConsumerContext):
+		"""
+		Uses the view shared by the producer if configured (parameter: view), computes it otherwise
+		:param context: contains the frame and its views
+		:return: resized, gray frame
+		"""
+		if 'view' in self.parameters:
+			view = context.views.get(self.parameters['view'])
+			if view is not None:
+				# the shared view can be overwritten by the producer while the detector reads it
+				return view.copy()
+
+		img = cv2.resize(context.data, (self.parameters['resize_width'], self.parameters['resize_height']))
+		return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
 	def get_type(self):
 		return Type.CAMERA
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+from raspberry_sec.module.bodydetector.consumer import BodydetectorConsumer
+from raspberry_sec.interface.consumer import ConsumerContext
+
+
+class TestBodydetectorConsumerMethods(unittest.TestCase):
+
+    def test_to_boxes_converts_relative_regions(self):
+        # Given
+        regions = [(0.25, 0.25, 0.5, 0.5), (0, 0, 0.1, 0.2)]
+
+        # When
+        boxes = BodydetectorConsumer.to_boxes(regions, shape=(100, 200, 3), padding=0, min_size=(0, 0))
+
+        # Then
+        self.assertEqual([(50, 25, 150, 75), (0, 0, 20, 20)], boxes)
+
+    def test_to_boxes_keeps_padded_box_inside_the_image(self):
+        # Given
+        regions = [(0.9, 0.9, 0.1, 0.1), (0, 0, 0.1, 0.1)]
+
+        # When
+        boxes = BodydetectorConsumer.to_boxes(regions, shape=(100, 100), padding=10, min_size=(0, 0))
+
+        # Then
+        self.assertEqual([(70, 70, 100, 100), (0, 0, 30, 30)], boxes)
+
+    def test_expand_grows_interval_to_min_length(self):
+        # When
+        inside = BodydetectorConsumer.expand(45, 55, padding=0, min_length=20, limit=100)
+        at_edge = BodydetectorConsumer.expand(90, 100, padding=0, min_length=20, limit=100)
+        too_long = BodydetectorConsumer.expand(0, 10, padding=0, min_length=64, limit=50)
+
+        # Then
+        self.assertEqual((40, 60), inside)
+        self.assertEqual((80, 100), at_edge)
+        self.assertEqual((0, 50), too_long)
+
+    def test_merge_boxes_merges_overlapping_boxes(self):
+        # Given
+        boxes = [(0, 0, 10, 10), (5, 5, 15, 15), (20, 20, 30, 30), (10, 20, 20, 30)]
+
+        # When
+        merged = BodydetectorConsumer.merge_boxes(boxes)
+
+        # Then
+        self.assertEqual([(0, 0, 15, 15), (20, 20, 30, 30), (10, 20, 20, 30)], merged)
+
+    def test_merge_boxes_merges_chains_of_boxes(self):
+        # Given
+        boxes = [(0, 0, 10, 10), (20, 0, 30, 10), (8, 0, 22, 10)]
+
+        # When
+        merged = BodydetectorConsumer.merge_boxes(boxes)
+
+        # Then
+        self.assertEqual([(0, 0, 30, 10)], merged)
+
+    def test_preprocess_copies_shared_view(self):
+        # Given
+        consumer = BodydetectorConsumer({'view': 'gray'})
+        view = np.zeros((4, 4), dtype=np.uint8)
+        context = ConsumerContext(None, False)
+        context.views['gray'] = view
+
+        # When
+        img = consumer.preprocess(context)
+        view[:] = 255
+
+        # Then
+        self.assertEqual(0, img.max())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import cv2
+
+
+class FramePreprocessor:
+	"""
+	Computes a derived view of the camera frames: resize -> gray -> blur.
+	Each step is optional, parameters: resize_width, resize_height, gray, blur (kernel size).
+	"""
+	def __init__(self, parameters: dict):
+		"""
+		Constructor
+		:param parameters: configuration of the view (coming from the JSON file)
+		"""
+		self.parameters = parameters
+
+	def get_max_size(self, max_frame_size: int):
+		"""
+		:param max_frame_size: maximum size of a camera frame in bytes
+		:return: maximum size of the view in bytes
+		"""
+		if 'resize_width' not in self.parameters:
+			return max_frame_size
+
+		channels = 1 if self.parameters.get('gray', False) else 3
+		return self.parameters['resize_width'] * self.parameters['resize_height'] * channels
+
+	def process(self, img):
+		"""
+		:param img: camera frame (BGR)
+		:return: the derived view
+		"""
+		view = img
+		if 'resize_width' in self.parameters:
+			view = cv2.resize(view, (self.parameters['resize_width'], self.parameters['resize_height']))
+		if self.parameters.get('gray', False):
+			view = cv2.cvtColor(view, cv2.COLOR_BGR2GRAY)
+		if self.parameters.get('blur', 0):
+			kernel = self.parameters['blur']
+			view = cv2.GaussianBlur(view, (kernel, kernel), 0)
+		return view
@@ -1,21 +1,19 @@
 import logging
+import math
 import cv2
 from raspberry_sec.interface.producer import Producer, ProducerDataManager, ProducerDataProxy, Type
+from raspberry_sec.interface.framering import SharedFrameRing, FrameViews
+from raspberry_sec.module.camera.preprocessor import FramePreprocessor
 from raspberry_sec.system.util import ProcessContext
 
 
-class CameraProducerDataProxy(ProducerDataProxy):
-	"""
-	For storing shared camera data
-	"""
-	pass
-
-
 class CameraProducer(Producer):
 	"""
 	Class for producing camera sample data
 	"""
 	LOGGER = logging.getLogger('CameraProducer')
+	RING_SLOTS = 4
+	MAX_FRAME_SIZE = 1280 * 720 * 3
 
 	def __init__(self, parameters: dict):
 		"""
@@ -23,12 +21,28 @@ class CameraProducer(Producer):
 		:param parameters: see Producer constructor
 		"""
 		super().__init__(parameters)
+		self.oversized_logged = False
+		# derived views computed once per frame for every stream (view name --> FramePreprocessor)
+		self.preprocessors = {
+			name: FramePreprocessor(view_parameters)
+			for name, view_parameters in self.parameters.get('views', dict()).items()
+		}
 
 	def register_shared_data_proxy(self):
-		ProducerDataManager.register('CameraProducerDataProxy', CameraProducerDataProxy)
+		# frames are shared through shared memory, not through the manager
+		pass
 
 	def create_shared_data_proxy(self, manager: ProducerDataManager):
-		return manager.CameraProducerDataProxy()
+		slots = self.parameters.get('ring_slots', CameraProducer.RING_SLOTS)
+		max_frame_size = self.parameters.get('max_frame_size', CameraProducer.MAX_FRAME_SIZE)
+		views = {
+			name: SharedFrameRing(slots=slots, slot_size=preprocessor.get_max_size(max_frame_size))
+			for name, preprocessor in self.preprocessors.items()
+		}
+		return SharedFrameRing(slots=slots, slot_size=max_frame_size, views=views)
+
+	def release_shared_data_proxy(self, data_proxy: SharedFrameRing):
+		data_proxy.release()
 
 	def run(self, context: ProcessContext):
 		try:
@@ -43,7 +57,9 @@ class CameraProducer(Producer):
 			while not context.stop_event.is_set():
 				ret_val, img = cam.read()
 				if ret_val:
-					data_proxy.set_data(img)
+					img = self.fit_frame(img, data_proxy.slot_size)
+					views = {name: p.process(img) for name, p in self.preprocessors.items()}
+					data_proxy.set_data(img, views)
 				else:
 					unsuccessful_images += 1
 					CameraProducer.LOGGER.warning('Could not capture image')
@@ -56,10 +72,31 @@ class CameraProducer(Producer):
 			CameraProducer.LOGGER.debug('Stopping capturing images')
 			cam.release()
 
+	def fit_frame(self, img, max_size: int):
+		"""
+		Frames bigger than the ring slots (see 'max_frame_size') are downscaled instead of killing the producer
+		:param img: captured frame
+		:param max_size: size of a ring slot in bytes
+		:return: the frame or its downscaled copy (same aspect ratio)
+		"""
+		if img.nbytes <= max_size:
+			return img
+
+		scale = math.sqrt(max_size / float(img.nbytes))
+		width, height = int(img.shape[1] * scale), int(img.shape[0] * scale)
+		if not self.oversized_logged:
+			CameraProducer.LOGGER.error('Frame ' + str(img.shape) + ' does not fit into max_frame_size ('
+				+ str(max_size) + ' bytes), downscaling to ' + str((height, width)))
+			self.oversized_logged = True
+		return cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA)
+
 	def get_data(self, data_proxy: ProducerDataProxy):
 		CameraProducer.LOGGER.debug('Producer called')
 		return data_proxy.get_data()
 
+	def get_views(self, data_proxy: SharedFrameRing, data_id: int):
+		return FrameViews(data_proxy, data_id)
+
 	def get_name(self):
 		"""
 		:return: name of the component
@@ -0,0 +1,35 @@
+import unittest
+import numpy as np
+from raspberry_sec.module.camera.producer import CameraProducer
+
+
+class TestCameraProducerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.producer = CameraProducer(dict())
+
+    def test_fit_frame_keeps_frame_that_fits(self):
+        # Given
+        frame = np.zeros((72, 128, 3), dtype=np.uint8)
+
+        # When
+        result = self.producer.fit_frame(frame, frame.nbytes)
+
+        # Then
+        self.assertIs(frame, result)
+
+    def test_fit_frame_downscales_oversized_frame(self):
+        # Given
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+
+        # When
+        with self.assertLogs('CameraProducer', level='ERROR'):
+            result = self.producer.fit_frame(frame, CameraProducer.MAX_FRAME_SIZE)
+
+        # Then
+        self.assertLessEqual(result.nbytes, CameraProducer.MAX_FRAME_SIZE)
+        self.assertEqual((720, 1280, 3), result.shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import logging
+import os
+import time
+from collections import deque
+from threading import Thread
+import cv2
+from raspberry_sec.interface.producer import Type
+from raspberry_sec.interface.consumer import Consumer, ConsumerContext
+
+
+class CliprecorderConsumer(Consumer):
+	"""
+	Consumer class for recording video clips of the alerts.
+	It has to be the first consumer of the stream: every frame (at most 'fps' per second) is JPEG encoded
+	as it arrives and kept in a ring of the last 'pre_seconds' (at most 'max_bytes').
+	When the stream alerts (in an active zone), the ring becomes the beginning of a clip which is continued
+	for 'post_seconds' after the last alert, then written to 'clip_dir' as Motion JPEG with one write.
+	The context is passed on unchanged.
+	"""
+	LOGGER = logging.getLogger('CliprecorderConsumer')
+
+	def __init__(self, parameters: dict):
+		"""
+		Constructor
+		:param parameters: see Consumer constructor
+		"""
+		super().__init__(parameters)
+		# pre-roll: deque of (time, JPEG bytes)
+		self.ring = deque()
+		self.ring_bytes = 0
+		self.last_encoded = None
+		# clip being recorded: list of JPEG bytes (None if there is no alert)
+		self.clip = None
+		self.clip_bytes = 0
+		self.clip_end = None
+		self.clip_path = None
+
+	def get_name(self):
+		return 'CliprecorderConsumer'
+
+	def run(self, context: ConsumerContext):
+		img = context.data
+		now = time.monotonic()
+
+		if img is not None and (self.last_encoded is None or
+				now - self.last_encoded >= 1.0 / self.parameters.get('fps', 5)):
+			self.last_encoded = now
+			self.add_frame(now, self.encode(img))
+
+		if self.clip is not None and now >= self.clip_end:
+			self.save_clip()
+
+		return context
+
+	def notify(self, context: ConsumerContext):
+		if not context.alert:
+			return
+
+		now = time.monotonic()
+		if self.clip is None:
+			CliprecorderConsumer.LOGGER.debug('Starting clip with ' + str(len(self.ring)) + ' frames')
+			self.clip = [jpeg for _, jpeg in self.ring]
+			self.clip_bytes = self.ring_bytes
+			self.clip_path = self.get_clip_path()
+			self.ring.clear()
+			self.ring_bytes = 0
+		# the clip lasts until 'post_seconds' after the last alert
+		self.clip_end = now + self.parameters.get('post_seconds', 5)
+
+	def encode(self, img):
+		"""
+		:param img: frame
+		:return: the downscaled frame as JPEG bytes
+		"""
+		scale = self.parameters.get('scale', 0.5)
+		if scale != 1:
+			img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+		_, jpeg = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, self.parameters.get('quality', 70)])
+		return jpeg.tobytes()
+
+	def add_frame(self, now: float, jpeg: bytes):
+		"""
+		Adds the frame to the clip if one is being recorded, otherwise to the pre-roll ring
+		:param now: time of the frame
+		:param jpeg: encoded frame
+		"""
+		max_bytes = self.parameters.get('max_bytes', 8 * 1024 * 1024)
+		if self.clip is not None:
+			if self.clip_bytes + len(jpeg) <= max_bytes:
+				self.clip.append(jpeg)
+				self.clip_bytes += len(jpeg)
+				return
+			CliprecorderConsumer.LOGGER.debug('Clip is full')
+			self.save_clip()
+
+		self.ring.append((now, jpeg))
+		self.ring_bytes += len(jpeg)
+		pre_seconds = self.parameters.get('pre_seconds', 5)
+		while self.ring and (self.ring_bytes > max_bytes or now - self.ring[0][0] > pre_seconds):
+			_, dropped = self.ring.popleft()
+			self.ring_bytes -= len(dropped)
+
+	def get_clip_path(self):
+		"""
+		:return: path of a new clip (named after the time of the alert)
+		"""
+		name = 'clip_' + time.strftime('%Y%m%d_%H%M%S') + '_' + str(os.getpid()) + '.mjpg'
+		return os.path.join(self.parameters.get('clip_dir', 'clips'), name)
+
+	def save_clip(self):
+		"""
+		Writes the clip in the background and starts filling the pre-roll ring again
+		"""
+		Thread(target=CliprecorderConsumer.write_clip, args=(self.clip_path, self.clip), daemon=True).start()
+		self.clip = None
+		self.clip_bytes = 0
+		self.clip_end = None
+		self.clip_path = None
+
+	@staticmethod
+	def write_clip(path: str, frames: list):
+		"""
+		:param path: of the clip file
+		:param frames: JPEG bytes of the frames
+		"""
+		try:
+			os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+			with open(path, 'wb') as clip_file:
+				clip_file.write(b''.join(frames))
+			CliprecorderConsumer.LOGGER.info('Clip saved (' + str(len(frames)) + ' frames): ' + path)
+		except OSError as e:
+			CliprecorderConsumer.LOGGER.error('Cannot save clip: ' + path + ' (' + str(e) + ')')
+
+	def get_type(self):
+		return Type.CAMERA
@@ -0,0 +1,41 @@
+import cv2
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+from raspberry_sec.module.cliprecorder.consumer import CliprecorderConsumer, ConsumerContext
+
+
+def set_parameters():
+	parameters = dict()
+	parameters['clip_dir'] = 'clips'
+	parameters['fps'] = 5
+	parameters['max_bytes'] = 8 * 1024 * 1024
+	parameters['post_seconds'] = 3
+	parameters['pre_seconds'] = 3
+	parameters['quality'] = 70
+	parameters['scale'] = 0.5
+	return parameters
+
+
+def integration_test():
+	# Given
+	consumer = CliprecorderConsumer(set_parameters())
+	cap = cv2.VideoCapture(0)
+
+	# When
+	try:
+		count = 0
+		while True:
+			success, frame = cap.read()
+			context = ConsumerContext(frame if success else None, True)
+			consumer.run(context)
+			# pretend an alert every 100 frames
+			context.alert = count % 100 == 99
+			consumer.notify(context)
+			count += 1
+	finally:
+		cap.release()
+
+
+if __name__ == '__main__':
+	integration_test()
@@ -0,0 +1,145 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+import numpy as np
+from raspberry_sec.interface.consumer import ConsumerContext
+from raspberry_sec.module.cliprecorder.consumer import CliprecorderConsumer
+
+
+class ImmediateThread:
+
+    def __init__(self, target, args, daemon):
+        self.target = target
+        self.args = args
+
+    def start(self):
+        self.target(*self.args)
+
+
+@mock.patch('raspberry_sec.module.cliprecorder.consumer.Thread', ImmediateThread)
+class TestCliprecorderConsumerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.clip_dir = tempfile.TemporaryDirectory()
+        self.now = 0
+        clock = mock.patch('raspberry_sec.module.cliprecorder.consumer.time.monotonic', lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def tearDown(self):
+        self.clip_dir.cleanup()
+
+    def create_consumer(self, **parameters):
+        defaults = dict(clip_dir=self.clip_dir.name, fps=10, pre_seconds=2, post_seconds=3, max_bytes=100)
+        defaults.update(parameters)
+        return CliprecorderConsumer(defaults)
+
+    def get_clips(self):
+        return [open(os.path.join(self.clip_dir.name, name), 'rb').read() for name in os.listdir(self.clip_dir.name)]
+
+    def test_add_frame_drops_frames_older_than_pre_seconds(self):
+        # Given
+        consumer = self.create_consumer()
+
+        # When
+        for t in range(4):
+            consumer.add_frame(t, bytes([t]) * 10)
+
+        # Then
+        self.assertEqual([1, 2, 3], [t for t, _ in consumer.ring])
+        self.assertEqual(30, consumer.ring_bytes)
+
+    def test_add_frame_keeps_ring_within_max_bytes(self):
+        # Given
+        consumer = self.create_consumer(max_bytes=25)
+
+        # When
+        for i in range(3):
+            consumer.add_frame(0, bytes([i]) * 10)
+
+        # Then
+        self.assertEqual([b'\x01' * 10, b'\x02' * 10], [jpeg for _, jpeg in consumer.ring])
+        self.assertEqual(20, consumer.ring_bytes)
+
+    def test_notify_ignores_samples_without_alert(self):
+        # Given
+        consumer = self.create_consumer()
+        consumer.add_frame(0, b'A')
+
+        # When
+        consumer.notify(ConsumerContext(None, False))
+
+        # Then
+        self.assertIsNone(consumer.clip)
+        self.assertEqual(1, len(consumer.ring))
+
+    def test_clip_contains_pre_roll_and_post_roll(self):
+        # Given
+        consumer = self.create_consumer()
+        consumer.add_frame(0, b'A')
+        consumer.add_frame(1, b'B')
+
+        # When
+        self.now = 1
+        consumer.notify(ConsumerContext(None, True))
+        self.now = 2
+        consumer.add_frame(2, b'C')
+        consumer.run(ConsumerContext(None, True))
+        clips_during_post_roll = self.get_clips()
+        self.now = 4
+        consumer.run(ConsumerContext(None, True))
+
+        # Then
+        self.assertEqual([], clips_during_post_roll)
+        self.assertEqual([b'ABC'], self.get_clips())
+        self.assertIsNone(consumer.clip)
+        self.assertEqual(0, len(consumer.ring))
+
+    def test_post_roll_is_extended_by_further_alerts(self):
+        # Given
+        consumer = self.create_consumer()
+        consumer.notify(ConsumerContext(None, True))
+
+        # When
+        self.now = 2
+        consumer.notify(ConsumerContext(None, True))
+        self.now = 4
+        consumer.run(ConsumerContext(None, True))
+
+        # Then
+        self.assertEqual(5, consumer.clip_end)
+        self.assertEqual([], self.get_clips())
+
+    def test_full_clip_is_saved_and_recording_continues_in_ring(self):
+        # Given
+        consumer = self.create_consumer(max_bytes=25)
+        consumer.add_frame(0, b'A' * 10)
+        consumer.notify(ConsumerContext(None, True))
+
+        # When
+        consumer.add_frame(0, b'B' * 10)
+        consumer.add_frame(0, b'C' * 10)
+
+        # Then
+        self.assertEqual([b'A' * 10 + b'B' * 10], self.get_clips())
+        self.assertIsNone(consumer.clip)
+        self.assertEqual([b'C' * 10], [jpeg for _, jpeg in consumer.ring])
+
+    def test_run_encodes_at_most_fps_frames(self):
+        # Given
+        consumer = self.create_consumer(fps=2, max_bytes=10 ** 6)
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+        # When
+        for t in [0, 0.2, 0.5, 0.9]:
+            self.now = t
+            consumer.run(ConsumerContext(frame, True))
+
+        # Then
+        self.assertEqual([0, 0.5], [t for t, _ in consumer.ring])
+        self.assertTrue(all(jpeg.startswith(b'\xff\xd8') for _, jpeg in consumer.ring))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,19 @@
 import logging
-import smtplib
+from threading import Lock
+from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from raspberry_sec.interface.action import Action
+from raspberry_sec.module.email.sender import SmtpSender
 
 
 class EmailAction(Action):
 	"""
-	Action class for sending emails (with HTML content)
+	Action class for sending emails (with HTML content and the snapshots of the alerts as inline images)
 	"""
 	LOGGER = logging.getLogger('EmailAction')
+	# the sender (and its threads) is created in the process that fires the action
+	sender_lock = Lock()
 
 	def __init__(self, parameters: dict):
 		"""
@@ -17,31 +21,67 @@ class EmailAction(Action):
 		:param parameters: see Action constructor
 		"""
 		super().__init__(parameters)
+		self.sender = None
 
 	def get_name(self):
 		return 'EmailAction'
 
+	def __getstate__(self):
+		"""
+		The sender threads cannot be passed to another process
+		:return: state to be pickled
+		"""
+		state = dict(self.__dict__)
+		state['sender'] = None
+		return state
+
+	def get_sender(self):
+		"""
+		:return: the SmtpSender (created on first use)
+		"""
+		with EmailAction.sender_lock:
+			if self.sender is None:
+				self.sender = SmtpSender(
+					host=self.parameters['smtp_addr'],
+					user=self.parameters['user'],
+					password=self.parameters['password'],
+					starttls=self.parameters.get('starttls', True),
+					connections=int(self.parameters.get('connections', 1)),
+					queue_size=int(self.parameters.get('queue_size', 10)),
+					retries=int(self.parameters.get('retries', 3)),
+					backoff=float(self.parameters.get('retry_backoff', 1.0)),
+					timeout=float(self.parameters.get('timeout', 30)))
+			return self.sender
+
 	def fire(self, msg: list):
 		"""
-		This method sends an email with the content set to the msg.
+		This method queues an email with the content set to the msg.
+		The email is sent in the background (see SmtpSender).
 		:param msg: ActionMessage-s
 		"""
 		EmailAction.LOGGER.info('Action fired')
 		try:
-			mail = MIMEMultipart('alternative')
+			mail = MIMEMultipart('related')
 			mail['From'] = self.parameters['from_addr']
 			mail['To'] = self.parameters['to_addr']
 			mail['Subject'] = self.parameters['subject']
 
-			content = ''.join(['<p>' + str(m.data) + '</p>' for m in msg])
+			content = ''
+			images = []
+			for m in msg:
+				content += '<p>' + str(m.data) + '</p>'
+				for image in m.images:
+					content += '<img src="cid:snapshot' + str(len(images)) + '">'
+					images.append(image)
 			mail.attach(MIMEText('<html>' + content + '</html>', 'html'))
 
-			with smtplib.SMTP(host=self.parameters['smtp_addr']) as server:
-				server.ehlo()
-				server.starttls()
-				server.login(self.parameters['user'], self.parameters['password'])
-				server.sendmail(self.parameters['from_addr'], self.parameters['to_addr'], mail.as_string())
+			for i, image in enumerate(images):
+				part = MIMEImage(image, 'jpeg')
+				part.add_header('Content-ID', '<snapshot' + str(i) + '>')
+				part.add_header('Content-Disposition', 'inline', filename='snapshot' + str(i) + '.jpg')
+				mail.attach(part)
 
-			EmailAction.LOGGER.info('Email has been successfully sent')
+			if self.get_sender().send(self.parameters['from_addr'], self.parameters['to_addr'], mail.as_string()):
+				EmailAction.LOGGER.info('Email has been queued')
 		except Exception as e:
 			EmailAction.LOGGER.error('Email could not be sent: ' + e.__str__())
@@ -0,0 +1,145 @@
+import logging
+import queue
+import smtplib
+import time
+from threading import Thread
+
+
+class SmtpSender:
+	"""
+	Sends emails in the background over kept-alive SMTP connections.
+	Every worker thread owns a connection, which is reopened when it fails
+	and closed after being idle for a while. Emails wait in a bounded queue,
+	if it is full the new email is dropped instead of piling up connections.
+	"""
+	LOGGER = logging.getLogger('SmtpSender')
+
+	def __init__(self, host: str, user: str = None, password: str = None, starttls: bool = True,
+		connections: int = 1, queue_size: int = 10, retries: int = 3, backoff: float = 1.0, idle_timeout: float = 60,
+		timeout: float = 30):
+		"""
+		Constructor
+		:param host: SMTP server, e.g. smtp.gmail.com:587
+		:param user: for login (no login if not set)
+		:param password: for login
+		:param starttls: whether to upgrade the connection with STARTTLS
+		:param connections: number of connections (and worker threads)
+		:param queue_size: maximum number of emails waiting to be sent
+		:param retries: number of attempts after a failed one
+		:param backoff: waiting time after the first failed attempt in seconds (doubled for every further attempt)
+		:param idle_timeout: unused connections are closed after this many seconds
+		:param timeout: of the blocking socket operations in seconds (a dead server cannot block a worker forever)
+		"""
+		self.host = host
+		self.user = user
+		self.password = password
+		self.starttls = starttls
+		self.retries = retries
+		self.backoff = backoff
+		self.idle_timeout = idle_timeout
+		self.timeout = timeout
+		self.outbox = queue.Queue(maxsize=queue_size)
+
+		self.workers = [Thread(target=self.work, name='SmtpSender-' + str(i), daemon=True) for i in range(connections)]
+		for worker in self.workers:
+			worker.start()
+
+	def send(self, from_addr: str, to_addr: str, mail: str):
+		"""
+		Queues the email for sending (does not block)
+		:param from_addr: sender address
+		:param to_addr: recipient address
+		:param mail: the whole email as string
+		:return: True if the email was queued, False if the queue was full
+		"""
+		try:
+			self.outbox.put_nowait((from_addr, to_addr, mail))
+			return True
+		except queue.Full:
+			SmtpSender.LOGGER.error('Outbound queue is full, dropping email')
+			return False
+
+	def connect(self):
+		"""
+		:return: new logged in SMTP connection
+		"""
+		SmtpSender.LOGGER.debug('Connecting to ' + self.host)
+		server = smtplib.SMTP(host=self.host, timeout=self.timeout)
+		server.ehlo()
+		if self.starttls:
+			server.starttls()
+			server.ehlo()
+		if self.user:
+			server.login(self.user, self.password)
+		return server
+
+	@staticmethod
+	def disconnect(server: smtplib.SMTP):
+		"""
+		Closes the connection (ignoring the errors of an already broken one)
+		:param server: SMTP connection
+		"""
+		try:
+			server.quit()
+		except (smtplib.SMTPException, OSError):
+			server.close()
+
+	def deliver(self, server: smtplib.SMTP, email: tuple):
+		"""
+		Sends the email, reconnecting and retrying with exponential backoff on failure
+		:param server: current connection (or None)
+		:param email: (from_addr, to_addr, mail)
+		:return: the connection to be used for the next email (or None)
+		"""
+		for attempt in range(self.retries + 1):
+			try:
+				if server is None:
+					server = self.connect()
+				server.sendmail(*email)
+				SmtpSender.LOGGER.info('Email has been successfully sent')
+				return server
+			except (smtplib.SMTPException, OSError) as e:
+				SmtpSender.LOGGER.warning('Sending failed (attempt ' + str(attempt + 1) + '): ' + str(e))
+				if server is not None:
+					SmtpSender.disconnect(server)
+					server = None
+				if attempt < self.retries:
+					time.sleep(self.backoff * 2 ** attempt)
+
+		SmtpSender.LOGGER.error('Email could not be sent, giving up')
+		return server
+
+	def work(self):
+		"""
+		Worker thread: sends the queued emails over its own connection
+		"""
+		server = None
+		while True:
+			try:
+				email = self.outbox.get(timeout=self.idle_timeout if server is not None else None)
+			except queue.Empty:
+				SmtpSender.LOGGER.debug('Closing idle connection')
+				SmtpSender.disconnect(server)
+				server = None
+				continue
+
+			if email is None:
+				break
+			try:
+				server = self.deliver(server, email)
+			finally:
+				self.outbox.task_done()
+
+		if server is not None:
+			SmtpSender.disconnect(server)
+		self.outbox.task_done()
+
+	def stop(self):
+		"""
+		Waits until the queued emails are sent and then closes the connections
+		"""
+		self.outbox.join()
+		for _ in self.workers:
+			self.outbox.put(None)
+		for worker in self.workers:
+			worker.join()
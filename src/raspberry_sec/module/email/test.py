@@ -1,5 +1,7 @@
 import sys
 import os
+import cv2
+import numpy as np
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
 from raspberry_sec.module.email.action import EmailAction
 from raspberry_sec.interface.action import ActionMessage
@@ -17,15 +19,29 @@ def set_parameters():
 	return parameters
 
 
-def integration_test():
+def set_local_parameters():
+	print('Start the stand-in server first: python -m aiosmtpd -n -l localhost:1025')
+	parameters = set_parameters()
+	parameters['smtp_addr'] = 'localhost:1025'
+	parameters['starttls'] = False
+	parameters['user'] = ''
+	return parameters
+
+
+def integration_test(parameters: dict):
 	# Given
-	email_action = EmailAction(set_parameters())
+	email_action = EmailAction(parameters)
 
 	# When
+	snapshot = cv2.imencode('.jpg', np.full((64, 64, 3), 128, dtype=np.uint8))[1].tobytes()
 	email_action.fire([
 		ActionMessage('<b>TEST</b> Message1'),
-		ActionMessage('<a href="www.google.com">TEST</a> Message2')])
+		ActionMessage('<a href="www.google.com">TEST</a> Message2'),
+		ActionMessage('TEST Message3 with snapshots', [snapshot, snapshot])])
+
+	# Then
+	email_action.get_sender().stop()
 
 
 if __name__ == '__main__':
-	integration_test()
+	integration_test(set_local_parameters() if '--local' in sys.argv else set_parameters())
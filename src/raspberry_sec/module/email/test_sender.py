@@ -0,0 +1,84 @@
+import unittest
+import smtplib
+from unittest import mock
+from raspberry_sec.module.email.sender import SmtpSender
+
+
+class TestSmtpSenderMethods(unittest.TestCase):
+
+    def setUp(self):
+        # no worker threads, the tests drive the sender themselves
+        self.sender = SmtpSender('localhost:1025', starttls=False, connections=0, queue_size=1, retries=2, backoff=0.5)
+        self.email = ('from@localhost', 'to@localhost', 'MAIL')
+
+    @mock.patch('raspberry_sec.module.email.sender.time.sleep')
+    @mock.patch('raspberry_sec.module.email.sender.smtplib.SMTP')
+    def test_deliver_retries_with_backoff(self, smtp, sleep):
+        # Given
+        server = smtp.return_value
+        server.sendmail.side_effect = [smtplib.SMTPException('busy'), smtplib.SMTPException('busy'), dict()]
+
+        # When
+        result = self.sender.deliver(None, self.email)
+
+        # Then
+        self.assertEqual(3, server.sendmail.call_count)
+        self.assertEqual([mock.call(0.5), mock.call(1.0)], sleep.call_args_list)
+        self.assertIs(server, result)
+        smtp.assert_called_with(host='localhost:1025', timeout=30)
+
+    @mock.patch('raspberry_sec.module.email.sender.time.sleep')
+    @mock.patch('raspberry_sec.module.email.sender.smtplib.SMTP')
+    def test_deliver_reconnects_after_server_drops(self, smtp, sleep):
+        # Given
+        dropped, fresh = mock.Mock(), mock.Mock()
+        dropped.sendmail.side_effect = smtplib.SMTPServerDisconnected('gone')
+        dropped.quit.side_effect = smtplib.SMTPServerDisconnected('gone')
+        smtp.return_value = fresh
+
+        # When
+        result = self.sender.deliver(dropped, self.email)
+
+        # Then
+        dropped.close.assert_called_once_with()
+        fresh.sendmail.assert_called_once_with(*self.email)
+        self.assertIs(fresh, result)
+
+    @mock.patch('raspberry_sec.module.email.sender.time.sleep')
+    @mock.patch('raspberry_sec.module.email.sender.smtplib.SMTP')
+    def test_deliver_gives_up_after_retries(self, smtp, sleep):
+        # Given
+        smtp.return_value.sendmail.side_effect = OSError('refused')
+
+        # When
+        result = self.sender.deliver(None, self.email)
+
+        # Then
+        self.assertEqual(3, smtp.return_value.sendmail.call_count)
+        self.assertIsNone(result)
+
+    def test_send_drops_email_when_queue_is_full(self):
+        # When
+        first = self.sender.send(*self.email)
+        second = self.sender.send(*self.email)
+
+        # Then
+        self.assertTrue(first)
+        self.assertFalse(second)
+
+    @mock.patch('raspberry_sec.module.email.sender.smtplib.SMTP')
+    def test_stop_sends_queued_emails(self, smtp):
+        # Given
+        sender = SmtpSender('localhost:1025', starttls=False, connections=1)
+
+        # When
+        sender.send(*self.email)
+        sender.stop()
+
+        # Then
+        smtp.return_value.sendmail.assert_called_once_with(*self.email)
+        smtp.return_value.quit.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
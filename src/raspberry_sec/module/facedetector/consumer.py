@@ -11,6 +11,10 @@ class FacedetectorConsumer(Consumer):
 	Consumer class for detecting human body in an image
 	"""
 	LOGGER = logging.getLogger('FacedetectorConsumer')
+	# search window around a tracked face (relative to the size of the face)
+	TRACK_MARGIN = 0.5
+	# minimum overlap (intersection over union) of a new detection and a tracked face to keep its track id
+	TRACK_OVERLAP = 0.3
 
 	def __init__(self, parameters: dict):
 		"""
@@ -20,6 +24,11 @@ class FacedetectorConsumer(Consumer):
 		super().__init__(parameters)
 		self.initialized = False
 		self.face_cascade = None
+		# faces found in the previous frame (with their track ids) and the number of frames since the last full scan
+		self.tracked_faces = []
+		self.track_ids = []
+		self.tracked_frames = 0
+		self.next_track_id = 0
 
 	def get_name(self):
 		return 'FacedetectorConsumer'
@@ -49,18 +58,15 @@ class FacedetectorConsumer(Consumer):
 
 		if img is not None:
 			img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-			faces = self.face_cascade.detectMultiScale(
-				image=img,
-				scaleFactor=self.parameters['scale_factor'],
-				minNeighbors=self.parameters['min_neighbors'])
+			faces = self.detect_faces(img)
 
-			# Take one of the faces and process that
+			# Pass on every face (list of gray face crops)
 			if len(faces) > 0:
-				(x, y, w, h) = faces[0]
 				context.alert = True
 				context.alert_data = 'Face detected'
-				context.data = img[y:(y + h), x:(x + w)]
-				FacedetectorConsumer.LOGGER.info(context.alert_data)
+				context.data = [img[y:(y + h), x:(x + w)] for (x, y, w, h) in faces]
+				context.track_ids = list(self.track_ids)
+				FacedetectorConsumer.LOGGER.info(context.alert_data + ' (' + str(len(faces)) + ')')
 			else:
 				FacedetectorConsumer.LOGGER.debug('Could not detect any faces')
 		else:
@@ -69,5 +75,95 @@ class FacedetectorConsumer(Consumer):
 
 		return context
 
+	def detect_faces(self, img):
+		"""
+		Detect-then-track: after a detection the faces are only searched for around their
+		last position for 'track_frames' frames, then (or if they get lost) the whole image is scanned again.
+		A face keeps its track id as long as it is found around (or overlapping) its last position.
+		:param img: gray image
+		:return: list of (x, y, w, h), the track ids are stored in track_ids
+		"""
+		track_frames = self.parameters.get('track_frames', 0)
+		if self.tracked_faces and self.tracked_frames < track_frames:
+			self.tracked_frames += 1
+			faces, track_ids = [], []
+			for face, track_id in zip(self.tracked_faces, self.track_ids):
+				for found in self.search_around(img, face):
+					faces.append(found)
+					# only the first match continues the track
+					track_ids.append(track_id if track_id not in track_ids else self.new_track_id())
+			if faces:
+				self.tracked_faces, self.track_ids = faces, track_ids
+				return faces
+			FacedetectorConsumer.LOGGER.debug('Lost track of the faces')
+
+		faces = [tuple(face) for face in self.face_cascade.detectMultiScale(
+			image=img,
+			scaleFactor=self.parameters['scale_factor'],
+			minNeighbors=self.parameters['min_neighbors'])]
+		self.track_ids = self.match_tracks(faces)
+		self.tracked_faces = faces
+		self.tracked_frames = 0
+		return faces
+
+	def new_track_id(self):
+		"""
+		:return: next unused track id
+		"""
+		self.next_track_id += 1
+		return self.next_track_id
+
+	def match_tracks(self, faces: list):
+		"""
+		Assigns the track ids of the tracked faces to the overlapping new detections
+		:param faces: list of (x, y, w, h) found by a full scan
+		:return: track id for each face
+		"""
+		track_ids = []
+		unmatched = list(zip(self.tracked_faces, self.track_ids))
+		for face in faces:
+			best = max(unmatched, key=lambda tracked: FacedetectorConsumer.get_overlap(face, tracked[0]), default=None)
+			if best is not None and FacedetectorConsumer.get_overlap(face, best[0]) >= FacedetectorConsumer.TRACK_OVERLAP:
+				unmatched.remove(best)
+				track_ids.append(best[1])
+			else:
+				track_ids.append(self.new_track_id())
+		return track_ids
+
+	@staticmethod
+	def get_overlap(a: tuple, b: tuple):
+		"""
+		:param a: (x, y, w, h)
+		:param b: (x, y, w, h)
+		:return: intersection over union of the two boxes
+		"""
+		width = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+		height = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+		if width <= 0 or height <= 0:
+			return 0.0
+		intersection = width * height
+		return intersection / float(a[2] * a[3] + b[2] * b[3] - intersection)
+
+	def search_around(self, img, face: tuple):
+		"""
+		Runs the cascade in a window around the face, only for similar face sizes
+		:param img: gray image
+		:param face: (x, y, w, h) in the previous frame
+		:return: list of (x, y, w, h) found in the window
+		"""
+		(x, y, w, h) = face
+		margin = self.parameters.get('track_margin', FacedetectorConsumer.TRACK_MARGIN)
+		dx, dy = int(w * margin), int(h * margin)
+		x1, y1 = max(x - dx, 0), max(y - dy, 0)
+		x2, y2 = min(x + w + dx, img.shape[1]), min(y + h + dy, img.shape[0])
+
+		found = self.face_cascade.detectMultiScale(
+			image=img[y1:y2, x1:x2],
+			scaleFactor=self.parameters['scale_factor'],
+			minNeighbors=self.parameters['min_neighbors'],
+			minSize=(int(w * (1 - margin)), int(h * (1 - margin))),
+			maxSize=(int(w * (1 + margin)), int(h * (1 + margin))))
+		return [(fx + x1, fy + y1, fw, fh) for (fx, fy, fw, fh) in found]
+
 	def get_type(self):
 		return Type.CAMERA
@@ -31,7 +31,7 @@ def integration_test():
 			if context.alert:
 				print('Face Detected: ' + str(count))
 				count += 1
-				cv2.imshow('Face', context.data)
+				cv2.imshow('Face', context.data[0])
 	finally:
 		cap.release()
 		cv2.destroyAllWindows()
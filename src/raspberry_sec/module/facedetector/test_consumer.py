@@ -0,0 +1,135 @@
+import unittest
+import numpy as np
+from raspberry_sec.module.facedetector.consumer import FacedetectorConsumer
+
+
+class StubCascade:
+    """
+    Returns 'full' for a full scan and 'window' (in window coordinates) when searching around a face
+    """
+    def __init__(self, full: list, window: list):
+        self.full = full
+        self.window = window
+        # (image shape, is a window search) of every call
+        self.scans = []
+
+    def detectMultiScale(self, image, scaleFactor, minNeighbors, minSize=None, maxSize=None):
+        self.scans.append((image.shape, minSize is not None))
+        return self.window if minSize is not None else self.full
+
+
+class TestFacedetectorConsumerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.consumer = FacedetectorConsumer(dict())
+        self.consumer.tracked_faces = [(0, 0, 10, 10), (50, 50, 10, 10)]
+        self.consumer.track_ids = [7, 8]
+        self.consumer.next_track_id = 8
+
+    def test_get_overlap(self):
+        # When
+        same = FacedetectorConsumer.get_overlap((0, 0, 10, 10), (0, 0, 10, 10))
+        half = FacedetectorConsumer.get_overlap((0, 0, 10, 10), (5, 0, 10, 10))
+        touching = FacedetectorConsumer.get_overlap((0, 0, 10, 10), (10, 0, 10, 10))
+
+        # Then
+        self.assertEqual(1.0, same)
+        self.assertAlmostEqual(1 / 3, half)
+        self.assertEqual(0.0, touching)
+
+    def test_match_tracks_keeps_ids_of_overlapping_faces(self):
+        # Given
+        faces = [(51, 50, 10, 10), (1, 1, 10, 10)]
+
+        # When
+        track_ids = self.consumer.match_tracks(faces)
+
+        # Then
+        self.assertEqual([8, 7], track_ids)
+
+    def test_match_tracks_gives_new_id_below_overlap_threshold(self):
+        # Given
+        # intersection over union: 40 / 160 = 0.25
+        faces = [(6, 0, 10, 10), (200, 200, 10, 10)]
+
+        # When
+        track_ids = self.consumer.match_tracks(faces)
+
+        # Then
+        self.assertEqual([9, 10], track_ids)
+
+    def test_match_tracks_continues_a_track_only_once(self):
+        # Given
+        faces = [(0, 0, 10, 10), (1, 0, 10, 10)]
+
+        # When
+        track_ids = self.consumer.match_tracks(faces)
+
+        # Then
+        self.assertEqual([7, 9], track_ids)
+
+
+class TestFacedetectorConsumerTracking(unittest.TestCase):
+
+    def setUp(self):
+        self.img = np.zeros((200, 200), dtype=np.uint8)
+
+    def create_consumer(self, track_frames: int, full: list, window: list):
+        consumer = FacedetectorConsumer({'track_frames': track_frames, 'scale_factor': 1.1, 'min_neighbors': 3})
+        consumer.face_cascade = StubCascade(full, window)
+        consumer.initialized = True
+        return consumer
+
+    def test_full_scan_is_skipped_while_tracking(self):
+        # Given
+        consumer = self.create_consumer(2, full=[(40, 40, 20, 20)], window=[(10, 10, 20, 20)])
+
+        # When
+        for _ in range(4):
+            consumer.detect_faces(self.img)
+
+        # Then
+        self.assertEqual([False, True, True, False], [window for _, window in consumer.face_cascade.scans])
+
+    def test_window_coordinates_are_mapped_to_image(self):
+        # Given
+        consumer = self.create_consumer(2, full=[(40, 40, 20, 20)], window=[(12, 11, 20, 20)])
+        consumer.detect_faces(self.img)
+        track_ids = list(consumer.track_ids)
+
+        # When
+        faces = consumer.detect_faces(self.img)
+
+        # Then
+        # the window is the face padded by half of its size: (30, 30) - (70, 70)
+        self.assertEqual((40, 40), consumer.face_cascade.scans[1][0])
+        self.assertEqual([(42, 41, 20, 20)], faces)
+        self.assertEqual(track_ids, consumer.track_ids)
+
+    def test_lost_face_triggers_full_scan(self):
+        # Given
+        consumer = self.create_consumer(2, full=[(40, 40, 20, 20)], window=[])
+        consumer.detect_faces(self.img)
+
+        # When
+        faces = consumer.detect_faces(self.img)
+
+        # Then
+        self.assertEqual([False, True, False], [window for _, window in consumer.face_cascade.scans])
+        self.assertEqual([(40, 40, 20, 20)], faces)
+        self.assertEqual(0, consumer.tracked_frames)
+
+    def test_every_frame_is_scanned_without_tracking(self):
+        # Given
+        consumer = self.create_consumer(0, full=[(40, 40, 20, 20)], window=[(10, 10, 20, 20)])
+
+        # When
+        for _ in range(3):
+            consumer.detect_faces(self.img)
+
+        # Then
+        self.assertEqual([False, False, False], [window for _, window in consumer.face_cascade.scans])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,16 +1,59 @@
 import logging
 import json
 import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import cv2
 from raspberry_sec.interface.producer import Type
 from raspberry_sec.interface.consumer import Consumer, ConsumerContext
 
 
+class TrackIdentity:
+	"""
+	Recognition results collected for a tracked face
+	"""
+	def __init__(self):
+		self.votes = Counter()
+		self.name = None
+		self.confirmed_at = None
+
+	def add_vote(self, name: str, votes_needed: int, now: float):
+		"""
+		The identity gets confirmed once a name has enough votes
+		:param name: result of a recognition
+		:param votes_needed: for the confirmation
+		:param now: current time
+		"""
+		self.votes[name] += 1
+		if self.votes[name] >= votes_needed:
+			self.name = name
+			self.confirmed_at = now
+
+	def get_name(self, ttl: float, now: float):
+		"""
+		:param ttl: maximum age of a confirmation in seconds
+		:param now: current time
+		:return: the confirmed name or None if it is not confirmed (any more)
+		"""
+		if self.name is not None and now - self.confirmed_at > ttl:
+			# the identity has to be confirmed again
+			self.votes.clear()
+			self.name = None
+		return self.name
+
+
 class FacerecognizerConsumer(Consumer):
 	"""
 	Consumer class for recognizing human face
 	"""
 	LOGGER = logging.getLogger('FacerecognizerConsumer')
+	# all recognizers run one after the other
+	SEQUENTIAL = 'sequential'
+	# recognizers run one after the other until two of them disagree
+	ORDERED = 'ordered'
+	# recognizers run at the same time (OpenCV releases the GIL) until two of them disagree
+	PARALLEL = 'parallel'
 
 	def __init__(self, parameters: dict):
 		"""
@@ -23,6 +66,11 @@ class FacerecognizerConsumer(Consumer):
 		self.fisher_recognizer = None
 		self.lbph_recognizer = None
 		self.label_to_name = None
+		# enabled recognizers: list of (name, recognizer)
+		self.recognizers = []
+		self.executor = None
+		# track id --> TrackIdentity (see 'cache_ttl' and 'cache_votes' parameters)
+		self.identities = dict()
 
 	def get_name(self):
 		return 'FacerecognizerConsumer'
@@ -60,6 +108,16 @@ class FacerecognizerConsumer(Consumer):
 		self.fisher_recognizer.read(FacerecognizerConsumer.get_path(self.parameters['fisher_model']))
 		self.lbph_recognizer.read(FacerecognizerConsumer.get_path(self.parameters['lbph_model']))
 
+		recognizers = [
+			('FisherRecognizer', self.parameters['fisher_enabled'], self.fisher_recognizer),
+			('EigenRecognizer', self.parameters['eigen_enabled'], self.eigen_recognizer),
+			('LBPHRecognizer', self.parameters['lbph_enabled'], self.lbph_recognizer)
+		]
+		self.recognizers = [(name, recognizer) for name, enabled, recognizer in recognizers if enabled]
+
+		if self.get_mode() == FacerecognizerConsumer.PARALLEL:
+			self.executor = ThreadPoolExecutor(max_workers=len(self.recognizers) or 1)
+
 		try:
 			label_map_path = FacerecognizerConsumer.get_path(self.parameters['label_map'])
 			with open(label_map_path) as label_file:
@@ -75,41 +133,81 @@ class FacerecognizerConsumer(Consumer):
 		if not self.initialized:
 			self.initialize()
 
-		# the data is expected to be the detected face
-		face = context.data
+		# the data is expected to be the list of detected faces
+		faces = context.data
 		context.alert = True
 
-		if face is not None:
-			face = cv2.resize(face, (self.parameters['size'], self.parameters['size']))
-			name = self.recognize(face)
-			if name is None:
-				context.alert_data = 'Cannot recognize face'
+		if faces:
+			names = self.recognize_tracked(faces, context.track_ids)
+			unknown = names.count(None)
+			if unknown:
+				context.alert_data = 'Cannot recognize face (' + str(unknown) + ' of ' + str(len(names)) + ')'
 			else:
 				context.alert = False
-				context.alert_data = name
+				context.alert_data = ', '.join(names)
 		else:
-			FacerecognizerConsumer.LOGGER.warning('Face was not provided (is None)')
+			FacerecognizerConsumer.LOGGER.warning('Faces were not provided')
 
 		return context
 
+	def recognize_tracked(self, faces: list, track_ids: list):
+		"""
+		Faces whose track already has a confirmed identity are not recognized again.
+		Identities of the tracks that are not present any more are dropped.
+		:param faces: detected faces
+		:param track_ids: track id for each face (or None if the faces are not tracked)
+		:return: name or None for each face
+		"""
+		size = (self.parameters['size'], self.parameters['size'])
+		ttl = self.parameters.get('cache_ttl', 0)
+		if track_ids is None or ttl <= 0:
+			return [self.recognize(cv2.resize(face, size)) for face in faces]
+
+		now = time.monotonic()
+		self.identities = {track_id: self.identities.get(track_id, TrackIdentity()) for track_id in track_ids}
+
+		names = []
+		for face, track_id in zip(faces, track_ids):
+			identity = self.identities[track_id]
+			name = identity.get_name(ttl, now)
+			if name is None:
+				name = self.recognize(cv2.resize(face, size))
+				if name is not None:
+					identity.add_vote(name, self.parameters.get('cache_votes', 3), now)
+			else:
+				FacerecognizerConsumer.LOGGER.debug('Track ' + str(track_id) + ' is known as ' + name)
+			names.append(name)
+		return names
+
 	def recognize(self, face):
 		"""
 		This method decides if the face is among those that are to be recognized.
 		It uses 3 different recognition algorithms for this (Eigen, Fisher, LBPH).
 		Though any of these can be disabled by the configuration.
+		In 'ordered' and 'parallel' mode (see 'recognition_mode') the rest of the recognizers
+		are skipped (or not waited for) as soon as two of them have identified different people.
 		:param face: detected face
 		:return: name if the face was successfully identified by at least 1 of the recognizers or None
 		"""
 		FacerecognizerConsumer.LOGGER.info('Starting recognition')
-		# Get the recognition results
-		names = {
-			self.recognize_face(self.parameters['fisher_enabled'], 'FisherRecognizer', face, self.fisher_recognizer),
-			self.recognize_face(self.parameters['eigen_enabled'], 'EigenRecognizer', face, self.eigen_recognizer),
-			self.recognize_face(self.parameters['lbph_enabled'], 'LBPHRecognizer', face, self.lbph_recognizer)
-		}
+		mode = self.get_mode()
+		# Get the recognition results (lazily)
+		if self.executor is not None:
+			# every recognizer has its own worker, the ones still running are simply not waited for
+			futures = [self.executor.submit(self.recognize_face, name, face, recognizer)
+				for name, recognizer in self.recognizers]
+			results = (future.result() for future in as_completed(futures))
+		else:
+			results = (self.recognize_face(name, face, recognizer) for name, recognizer in self.recognizers)
 
 		# Filter out None-s
-		names = {name for name in names if name is not None}
+		names = set()
+		for name in results:
+			if name is not None:
+				names.add(name)
+			if len(names) > 1 and mode != FacerecognizerConsumer.SEQUENTIAL:
+				FacerecognizerConsumer.LOGGER.debug('Recognizers disagree, skipping the rest')
+				break
 
 		# If there is only one name in the set, the result is unambiguous
 		if len(names) == 1:
@@ -117,21 +215,25 @@ class FacerecognizerConsumer(Consumer):
 		else:
 			return None
 
-	def recognize_face(self, enabled: bool, name: str, face, recognizer):
+	def get_mode(self):
+		"""
+		:return: recognition mode (SEQUENTIAL, ORDERED or PARALLEL)
+		"""
+		return self.parameters.get('recognition_mode', FacerecognizerConsumer.SEQUENTIAL)
+
+	def recognize_face(self, name: str, face, recognizer):
 		"""
 		Conducts face recognition
-		:param enabled: if False, None is returned
 		:param name: of the technique used for recognition
 		:param face: numpy object
 		:param recognizer: method object
 		:return: name of the recognized person, or None
 		"""
-		if enabled:
-			label, c = recognizer.predict(face)
-			if self.label_to_name.__contains__(label):
-				recognized = self.label_to_name[label]
-				FacerecognizerConsumer.LOGGER.info(name + ' identified ' + recognized + ' with ' + str(c))
-				return recognized
+		label, c = recognizer.predict(face)
+		if self.label_to_name.__contains__(label):
+			recognized = self.label_to_name[label]
+			FacerecognizerConsumer.LOGGER.info(name + ' identified ' + recognized + ' with ' + str(c))
+			return recognized
 
 		return None
 
@@ -15,6 +15,8 @@ logging.basicConfig(format='%(asctime)s:%(name)s:%(levelname)s - %(message)s', l
 
 def set_parameters():
 	parameters = dict()
+	parameters['cache_ttl'] = 30
+	parameters['cache_votes'] = 3
 	parameters['eigen_components'] = 7
 	parameters['eigen_enabled'] = True
 	parameters['eigen_model'] = 'resources/eigen.yml'
@@ -31,6 +33,7 @@ def set_parameters():
 	parameters['lbph_radius'] = 5
 	parameters['lbph_threshold'] = 80.0
 	parameters['lbph_width'] = 7
+	parameters['recognition_mode'] = 'parallel'
 	parameters['size'] = 100
 	return parameters
 
@@ -41,6 +44,7 @@ def set_detector_parameters():
 	parameters['min_neighbors'] = 5
 	parameters['scale_factor'] = 1.3
 	parameters['timeout'] = 1
+	parameters['track_frames'] = 10
 	return parameters
 
 
@@ -59,7 +63,7 @@ def test():
 			if success:
 				context.data = frame
 				detector_consumer.run(context)
-				face = context.data
+				face = context.data[0] if context.alert else None
 			# Recognition
 			if context.alert:
 				recognizer_consumer.run(context)
@@ -137,7 +141,7 @@ def get_images_and_labels(path: str, size: int):
 			# Detect face in image
 			context.data = image
 			detector_consumer.run(context)
-			face = context.data
+			face = context.data[0] if context.alert else None
 
 			if face is not None and context.alert:
 				name = os.path.split(image_path)[1].split('.')[0]
@@ -176,7 +180,7 @@ def produce_training_data(who: str, timeout: int=2000):
 			if success:
 				context.data = frame
 				detector_consumer.run(context)
-				face = context.data
+				face = context.data[0] if context.alert else None
 			if context.alert:
 				count += 1
 				cv2.imwrite(filename=output + '.' + str(count) + '.png', img=face)
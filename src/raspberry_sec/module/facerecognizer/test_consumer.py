@@ -0,0 +1,135 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import numpy as np
+from raspberry_sec.module.facerecognizer.consumer import FacerecognizerConsumer, TrackIdentity
+
+
+class StubRecognizer:
+
+    def __init__(self, label: int):
+        self.label = label
+        self.calls = 0
+
+    def predict(self, face):
+        self.calls += 1
+        return self.label, 0.0
+
+
+class TestTrackIdentityMethods(unittest.TestCase):
+
+    def test_add_vote_confirms_name_with_enough_votes(self):
+        # Given
+        identity = TrackIdentity()
+
+        # When
+        identity.add_vote('ALICE', votes_needed=2, now=0)
+        first = identity.get_name(ttl=10, now=0)
+        identity.add_vote('BOB', votes_needed=2, now=1)
+        identity.add_vote('ALICE', votes_needed=2, now=2)
+        second = identity.get_name(ttl=10, now=2)
+
+        # Then
+        self.assertIsNone(first)
+        self.assertEqual('ALICE', second)
+
+    def test_get_name_expires_after_ttl(self):
+        # Given
+        identity = TrackIdentity()
+        identity.add_vote('ALICE', votes_needed=1, now=0)
+
+        # When
+        valid = identity.get_name(ttl=10, now=10)
+        expired = identity.get_name(ttl=10, now=11)
+
+        # Then
+        self.assertEqual('ALICE', valid)
+        self.assertIsNone(expired)
+        self.assertEqual(0, sum(identity.votes.values()))
+
+
+class TestFacerecognizerConsumerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.consumer = FacerecognizerConsumer(dict(size=8, cache_ttl=10, cache_votes=2))
+        self.consumer.recognize = mock.Mock(return_value='ALICE')
+        self.faces = [np.zeros((16, 16), dtype=np.uint8)]
+
+    @mock.patch('raspberry_sec.module.facerecognizer.consumer.time.monotonic', return_value=0)
+    def test_recognize_tracked_reuses_confirmed_identity(self, monotonic):
+        # When
+        names = [self.consumer.recognize_tracked(self.faces, [1]) for _ in range(4)]
+
+        # Then
+        self.assertEqual([['ALICE']] * 4, names)
+        self.assertEqual(2, self.consumer.recognize.call_count)
+
+    @mock.patch('raspberry_sec.module.facerecognizer.consumer.time.monotonic')
+    def test_recognize_tracked_recognizes_again_after_ttl(self, monotonic):
+        # Given
+        monotonic.return_value = 0
+        self.consumer.recognize_tracked(self.faces, [1])
+        self.consumer.recognize_tracked(self.faces, [1])
+
+        # When
+        monotonic.return_value = 11
+        self.consumer.recognize_tracked(self.faces, [1])
+
+        # Then
+        self.assertEqual(3, self.consumer.recognize.call_count)
+
+    def test_recognize_tracked_drops_identities_of_lost_tracks(self):
+        # When
+        self.consumer.recognize_tracked(self.faces, [1])
+        self.consumer.recognize_tracked(self.faces, [2])
+
+        # Then
+        self.assertEqual([2], list(self.consumer.identities))
+
+    def test_recognize_tracked_without_track_ids_does_not_cache(self):
+        # When
+        self.consumer.recognize_tracked(self.faces, None)
+        self.consumer.recognize_tracked(self.faces, None)
+        self.consumer.recognize_tracked(self.faces, None)
+
+        # Then
+        self.assertEqual(3, self.consumer.recognize.call_count)
+        self.assertEqual(dict(), self.consumer.identities)
+
+    def create_consumer(self, mode: str, labels: list):
+        consumer = FacerecognizerConsumer(dict(recognition_mode=mode))
+        consumer.label_to_name = {1: 'ALICE', 2: 'BOB'}
+        consumer.recognizers = [('Recognizer' + str(i), StubRecognizer(label)) for i, label in enumerate(labels)]
+        if mode == FacerecognizerConsumer.PARALLEL:
+            consumer.executor = ThreadPoolExecutor(max_workers=len(labels))
+        return consumer
+
+    def test_recognize_gives_same_names_in_every_mode(self):
+        # Given
+        modes = [FacerecognizerConsumer.SEQUENTIAL, FacerecognizerConsumer.ORDERED, FacerecognizerConsumer.PARALLEL]
+        cases = [[1, 1, 1], [1, 0, 1], [0, 0, 0], [1, 2, 1], [2, 1, 0]]
+
+        # When
+        results = {mode: [self.create_consumer(mode, labels).recognize(self.faces[0]) for labels in cases]
+                   for mode in modes}
+
+        # Then
+        for mode in modes:
+            self.assertEqual(['ALICE', 'ALICE', None, None, None], results[mode], mode)
+
+    def test_recognize_in_ordered_mode_stops_when_recognizers_disagree(self):
+        # Given
+        sequential = self.create_consumer(FacerecognizerConsumer.SEQUENTIAL, [1, 2, 1])
+        ordered = self.create_consumer(FacerecognizerConsumer.ORDERED, [1, 2, 1])
+
+        # When
+        sequential.recognize(self.faces[0])
+        ordered.recognize(self.faces[0])
+
+        # Then
+        self.assertEqual([1, 1, 1], [recognizer.calls for _, recognizer in sequential.recognizers])
+        self.assertEqual([1, 1, 0], [recognizer.calls for _, recognizer in ordered.recognizers])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -86,7 +86,7 @@ while(1):
     else:
         mask = fgmask.copy()
 
-    _, contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    contours = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
 
     rects = []
     #rects = np.array([[x, y, x + w, y + h] for (x, y, w, h) in rects])
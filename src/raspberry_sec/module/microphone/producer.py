@@ -1,21 +1,22 @@
 import logging
+import numpy as np
 import speech_recognition as sr
 from raspberry_sec.interface.producer import Producer, ProducerDataManager, ProducerDataProxy, Type
+from raspberry_sec.interface.framering import SharedFrameRing
 from raspberry_sec.system.util import ProcessContext
 
 
-class MicrophoneProducerDataProxy(ProducerDataProxy):
-	"""
-	For storing shared microphone data
-	"""
-	pass
-
-
 class MicrophoneProducer(Producer):
 	"""
-	Class for producing audio sample data
+	Class for producing audio sample data.
+	The microphone is read continuously in fixed-size chunks (16 bit mono PCM),
+	which are stored in a shared-memory ring. Readers get every chunk published
+	since their last read, so the audio has no gaps as long as they keep up with the ring.
 	"""
 	LOGGER = logging.getLogger('MicrophoneProducer')
+	# length of the audio kept in the ring (seconds)
+	RING_SECONDS = 10
+	SAMPLE_WIDTH = 2
 
 	def __init__(self, parameters: dict):
 		"""
@@ -23,33 +24,64 @@ class MicrophoneProducer(Producer):
 		:param parameters: see Producer constructor
 		"""
 		super().__init__(parameters)
+		self.chunk_size = self.parameters['chunk_size']
+		self.sample_rate = self.parameters['sample_rate']
 
 	def register_shared_data_proxy(self):
-		ProducerDataManager.register('MicrophoneProducerDataProxy', MicrophoneProducerDataProxy)
+		# chunks are shared through shared memory, not through the manager
+		pass
 
 	def create_shared_data_proxy(self, manager: ProducerDataManager):
-		return manager.MicrophoneProducerDataProxy()
+		ring_seconds = self.parameters.get('ring_seconds', MicrophoneProducer.RING_SECONDS)
+		slots = -(-ring_seconds * self.sample_rate // self.chunk_size)
+		return SharedFrameRing(slots=slots, slot_size=self.chunk_size * MicrophoneProducer.SAMPLE_WIDTH)
+
+	def release_shared_data_proxy(self, data_proxy: SharedFrameRing):
+		data_proxy.release()
 
 	def run(self, context: ProcessContext):
-		r = sr.Recognizer()
-
-		with sr.Microphone() as source:
-    			MicrophoneProducer.LOGGER.info('Microphone active')
-    			audio = r.listen(source)	
-		try:	
-			if audio:
-				data_proxy = context.get_prop('shared_data_proxy')
-				data_proxy.set_data(audio)
-				audio = None
-
-		except sr.UnknownValueError:
-			print("Google Speech Recognition could not understand audio")
-		except sr.RequestError as e:
-	    		print("Could not request results from Google Speech Recognition service; {0}".format(e))
-					
+		data_proxy = context.get_prop('shared_data_proxy')
+		microphone = sr.Microphone(
+			device_index=self.parameters.get('device'),
+			sample_rate=self.sample_rate,
+			chunk_size=self.chunk_size)
+
+		with microphone as source:
+			MicrophoneProducer.LOGGER.info('Microphone active')
+			while not context.stop_event.is_set():
+				chunk = source.stream.read(self.chunk_size)
+				data_proxy.set_data(np.frombuffer(chunk, dtype=np.int16))
+
+		MicrophoneProducer.LOGGER.debug('Stopping capturing audio')
+
+	def to_audio(self, chunks: list):
+		"""
+		:param chunks: list of PCM chunks
+		:return: AudioData of the concatenated chunks
+		"""
+		return sr.AudioData(np.concatenate(chunks).tobytes(), self.sample_rate, MicrophoneProducer.SAMPLE_WIDTH)
+
 	def get_data(self, data_proxy: ProducerDataProxy):
 		MicrophoneProducer.LOGGER.debug('Producer called')
-		return data_proxy.get_data()
+		chunk = data_proxy.get_data()
+		return self.to_audio([chunk]) if chunk is not None else None
+
+	def get_next_data(self, data_proxy: SharedFrameRing, after_id: int, timeout: float):
+		"""
+		:return: (id of the last chunk, its timestamp, AudioData of every chunk since after_id) or None
+		"""
+		latest = data_proxy.get_next(after_id, timeout)
+		if latest is None:
+			return None
+
+		chunks = data_proxy.read_range(after_id + 1, latest[0])
+		if not chunks:
+			return None
+		if chunks[0][0] != after_id + 1 and after_id > 0:
+			MicrophoneProducer.LOGGER.warning('Audio chunks were lost: ' + str(chunks[0][0] - after_id - 1))
+
+		last_id, timestamp, _ = chunks[-1]
+		return last_id, timestamp, self.to_audio([chunk for _, _, chunk in chunks])
 
 	def get_name(self):
 		"""
@@ -0,0 +1,85 @@
+import unittest
+from unittest import mock
+import numpy as np
+try:
+    from raspberry_sec.module.microphone.producer import MicrophoneProducer
+except ImportError:
+    # speech_recognition is an optional dependency of the microphone
+    MicrophoneProducer = None
+
+
+@unittest.skipIf(MicrophoneProducer is None, 'speech_recognition is not installed')
+class TestMicrophoneProducerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.producer = MicrophoneProducer({'chunk_size': 4, 'sample_rate': 16, 'ring_seconds': 1})
+        # 4 slots of 4 samples
+        self.ring = self.producer.create_shared_data_proxy(None)
+
+    def tearDown(self):
+        self.ring.release()
+
+    def publish(self, count: int):
+        for i in range(1, count + 1):
+            self.ring.set_data(np.full(4, i, dtype=np.int16))
+
+    @staticmethod
+    def get_samples(audio):
+        return list(np.frombuffer(audio.get_raw_data(), dtype=np.int16))
+
+    def test_get_next_data_joins_chunks_since_after_id(self):
+        # Given
+        self.publish(3)
+
+        # When
+        last_id, _, audio = self.producer.get_next_data(self.ring, 1, 0)
+
+        # Then
+        self.assertEqual(3, last_id)
+        self.assertEqual([2] * 4 + [3] * 4, self.get_samples(audio))
+        self.assertEqual(16, audio.sample_rate)
+        self.assertEqual(MicrophoneProducer.SAMPLE_WIDTH, audio.sample_width)
+
+    def test_get_next_data_returns_none_without_chunks(self):
+        # Given
+        self.publish(1)
+
+        # When
+        timed_out = self.producer.get_next_data(self.ring, 1, 0)
+        with mock.patch.object(self.ring, 'read_range', return_value=[]):
+            overwritten = self.producer.get_next_data(self.ring, 0, 0)
+
+        # Then
+        self.assertIsNone(timed_out)
+        self.assertIsNone(overwritten)
+
+    def test_get_next_data_warns_about_lost_chunks(self):
+        # Given
+        self.publish(6)
+
+        # When
+        with self.assertLogs('MicrophoneProducer', level='WARNING') as logs:
+            last_id, _, audio = self.producer.get_next_data(self.ring, 1, 0)
+
+        # Then
+        self.assertEqual(['WARNING:MicrophoneProducer:Audio chunks were lost: 1'], logs.output)
+        self.assertEqual(6, last_id)
+        self.assertEqual([3] * 4 + [4] * 4 + [5] * 4 + [6] * 4, self.get_samples(audio))
+
+    def test_get_next_data_reads_across_ring_wrap_around(self):
+        # Given
+        self.publish(3)
+        last_id, _, _ = self.producer.get_next_data(self.ring, 0, 0)
+        # chunks 4-7 are stored in the last slot, then in the first three
+        self.publish(4)
+
+        # When
+        last_id, _, audio = self.producer.get_next_data(self.ring, last_id, 0)
+
+        # Then
+        self.assertEqual(7, last_id)
+        self.assertEqual([1] * 4 + [2] * 4 + [3] * 4 + [4] * 4, self.get_samples(audio))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,9 +31,7 @@ class MotiondetectorConsumer(Consumer):
 			time.sleep(self.parameters['timeout'])
 			return context
 
-		frame = cv2.resize(img, (self.parameters['resize_width'], self.parameters['resize_height']))
-		gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-		gray = cv2.GaussianBlur(gray, (21, 21), 0)
+		gray = self.preprocess(context)
 
 		# if the first frame is None, initialize it
 		if self.previous_frame is None:
@@ -49,13 +47,15 @@ class MotiondetectorConsumer(Consumer):
 
 		# dilate the image to fill in holes, then find contours on image
 		thresh = cv2.dilate(thresh, None, iterations=self.parameters['dilate_iteration'])
-		(_, contours, _) = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+		# OpenCV 3 returns (image, contours, hierarchy), OpenCV 4 returns (contours, hierarchy)
+		contours = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
 
 		# loop over the contours
-		motion_detected = any([True for c in contours if cv2.contourArea(c) > self.parameters['area_threshold']])
-		if motion_detected:
+		moving = [c for c in contours if cv2.contourArea(c) > self.parameters['area_threshold']]
+		if moving:
 			context.alert = True
 			context.alert_data = 'Motion detected'
+			context.regions = MotiondetectorConsumer.get_regions(moving, gray.shape)
 			MotiondetectorConsumer.LOGGER.debug(context.alert_data)
 		else:
 			MotiondetectorConsumer.LOGGER.debug('No motion was detected')
@@ -63,5 +63,35 @@ class MotiondetectorConsumer(Consumer):
 		self.previous_frame = gray
 		return context
 
+	@staticmethod
+	def get_regions(contours: list, shape: tuple):
+		"""
+		:param contours: moving contours
+		:param shape: of the image the contours were found in
+		:return: bounding boxes relative to the image size (see ConsumerContext.regions)
+		"""
+		height, width = shape[:2]
+		regions = []
+		for contour in contours:
+			(x, y, w, h) = cv2.boundingRect(contour)
+			regions.append((x / width, y / height, w / width, h / height))
+		return regions
+
+	def preprocess(self, context: ConsumerContext):
+		"""
+		Uses the view shared by the producer if configured (parameter: view), computes it otherwise
+		:param context: contains the frame and its views
+		:return: resized, gray, blurred frame
+		"""
+		if 'view' in self.parameters:
+			view = context.views.get(self.parameters['view'])
+			if view is not None:
+				# the shared view gets overwritten eventually, but it is kept as the previous frame
+				return view.copy()
+
+		frame = cv2.resize(context.data, (self.parameters['resize_width'], self.parameters['resize_height']))
+		gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+		return cv2.GaussianBlur(gray, (21, 21), 0)
+
 	def get_type(self):
 		return Type.CAMERA
@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+from raspberry_sec.module.motiondetector.consumer import MotiondetectorConsumer
+from raspberry_sec.interface.consumer import ConsumerContext
+
+
+class TestMotiondetectorConsumerMethods(unittest.TestCase):
+
+    def test_get_regions_are_relative_to_image_size(self):
+        # Given
+        contour = np.array([[[10, 20]], [[29, 20]], [[29, 39]], [[10, 39]]], dtype=np.int32)
+
+        # When
+        regions = MotiondetectorConsumer.get_regions([contour], shape=(100, 200))
+
+        # Then
+        self.assertEqual([(0.05, 0.2, 0.1, 0.2)], regions)
+
+    def test_run_finds_moving_region(self):
+        # Given
+        consumer = MotiondetectorConsumer({
+            'area_threshold': 10, 'dilate_iteration': 0, 'threshold': 25, 'threshold_max_val': 255, 'view': 'gray'})
+        frame = np.zeros((100, 200), dtype=np.uint8)
+        moved = frame.copy()
+        moved[20:40, 10:30] = 255
+
+        # When
+        results = []
+        for img in [frame, moved]:
+            context = ConsumerContext(img, False)
+            context.views['gray'] = img
+            results.append(consumer.run(context))
+
+        # Then
+        self.assertFalse(results[0].alert)
+        self.assertTrue(results[1].alert)
+        self.assertEqual([(0.05, 0.2, 0.1, 0.2)], results[1].regions)
+
+
+if __name__ == '__main__':
+    unittest.main()
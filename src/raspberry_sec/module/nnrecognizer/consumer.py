@@ -1,7 +1,6 @@
 import logging
-import os, base64
+import os
 import cv2, numpy as np
-from keras.models import load_model
 from raspberry_sec.interface.producer import Type
 from raspberry_sec.interface.consumer import Consumer, ConsumerContext
 
@@ -19,6 +18,7 @@ class NnrecognizerConsumer(Consumer):
 		"""
 		super().__init__(parameters)
 		self.model = None
+		self.inference_client = None
 		self.size = self.parameters['size']
 		self.initialized = False
 
@@ -28,6 +28,18 @@ class NnrecognizerConsumer(Consumer):
 	def get_type(self):
 		return Type.CAMERA
 
+	def get_shared_model(self):
+		"""
+		The model is only shared between the streams if the 'shared_model' parameter is set
+		:return: path of the model or None
+		"""
+		if self.parameters.get('shared_model', False):
+			return NnrecognizerConsumer.get_path(self.parameters['model'])
+		return None
+
+	def set_inference_client(self, client):
+		self.inference_client = client
+
 	@staticmethod
 	def get_path(file: str):
 		"""
@@ -36,30 +48,33 @@ class NnrecognizerConsumer(Consumer):
 		"""
 		return os.sep.join([os.path.dirname(__file__), file])
 
-	@staticmethod
-	def img_to_str(img):
+	def img_to_jpeg(self, img):
 		"""
-		Converts the numpy ndarray into a HTML compatible png src
+		Converts the numpy ndarray into a snapshot for the alert
 		:param img: numpy array
-		:return: HTML compatible img src
+		:return: JPEG encoded bytes (see 'snapshot_quality' parameter)
 		"""
-		resized = cv2.resize(img, (0, 0), fx=0.5, fy=0.5)
-		png_encoded = cv2.imencode('.png', resized)[1]
-		b64_encoded = base64.b64encode(png_encoded.tostring())
-		final_format = b64_encoded.decode('utf-8')
-		return '<img class="img-responsive center-block" src="data:image/png;base64,' + final_format + '">'
+		quality = self.parameters.get('snapshot_quality', 80)
+		return cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
 
 	def initialize(self):
 		"""
 		Initializes component
 		"""
 		NnrecognizerConsumer.LOGGER.info('Initializing component')
-		try:
-			model_path = NnrecognizerConsumer.get_path(self.parameters['model'])
-			self.model = load_model(model_path)
-			NnrecognizerConsumer.LOGGER.info('Loaded network model')
-		except Exception as e:
-			NnrecognizerConsumer.LOGGER.error('Cannot load model: ' + str(e))
+		if self.inference_client is not None:
+			# the client has the same predict interface as the model
+			self.model = self.inference_client
+			NnrecognizerConsumer.LOGGER.info('Using the shared inference process')
+		else:
+			try:
+				# imported here, so that streams using the shared model do not load the runtime
+				from keras.models import load_model
+				model_path = NnrecognizerConsumer.get_path(self.parameters['model'])
+				self.model = load_model(model_path)
+				NnrecognizerConsumer.LOGGER.info('Loaded network model')
+			except Exception as e:
+				NnrecognizerConsumer.LOGGER.error('Cannot load model: ' + str(e))
 
 		self.initialized = True
 
@@ -67,41 +82,41 @@ class NnrecognizerConsumer(Consumer):
 		if not self.initialized:
 			self.initialize()
 
-		# the data is expected to be the detected face
-		face = context.data
+		# the data is expected to be the list of detected faces
+		faces = context.data
 		context.alert = True
 
-		if face is not None:
+		if faces:
 			NnrecognizerConsumer.LOGGER.info('Running face recognition...')
-			if self.recognize(face):
+			recognized = self.recognize(faces)
+			unknown_faces = [face for face, known in zip(faces, recognized) if not known]
+			if not unknown_faces:
 				context.alert = False
 				context.alert_data = 'Positive recognition'
 				NnrecognizerConsumer.LOGGER.info(context.alert_data)
 			else:
-				context.alert_data = NnrecognizerConsumer.img_to_str(face)
-				NnrecognizerConsumer.LOGGER.info('Negative recognition')
+				context.alert_data = 'Unknown face (' + str(len(unknown_faces)) + ' of ' + str(len(faces)) + ')'
+				context.alert_images = [self.img_to_jpeg(face) for face in unknown_faces]
+				NnrecognizerConsumer.LOGGER.info('Negative recognition (' + str(len(unknown_faces)) + ')')
 		else:
-			NnrecognizerConsumer.LOGGER.warning('Face was not provided (is None)')
+			NnrecognizerConsumer.LOGGER.warning('Faces were not provided')
 			context.alert_data = 'No face provided'
 
 		return context
 
-	def recognize(self, face: np.ndarray):
+	def recognize(self, faces: list):
 		"""
-		Runs the face through the neural network
-		:param face: detected face
-		:return:
+		Runs the faces through the neural network (as one batch)
+		:param faces: detected faces
+		:return: list of True/False (positive recognition or not) for each face
 		"""
 		# Resize
-		face = cv2.resize(face, (self.size, self.size))
+		batch = np.stack([cv2.resize(face, (self.size, self.size)) for face in faces])
 
-		# Normalize image
-		face = np.asarray([face]).reshape(-1, self.size, self.size, 1).astype('float32') / 255
+		# Normalize images
+		batch = batch.reshape(-1, self.size, self.size, 1).astype('float32') / 255
 
-		# Run it through the network
-		prediction = self.model.predict(face)
+		# Run them through the network
+		prediction = self.model.predict(batch)
 		prediction = np.argmax(np.round(prediction), axis=1)
-		if prediction[0] == 1:
-			return True
-		else:
-			return False
+		return [label == 1 for label in prediction]
@@ -111,7 +111,7 @@ class Context:
 				if detect:
 					context.data = image
 					detector_consumer.run(context)
-					face = context.data
+					face = context.data[0] if context.alert else None
 				else:
 					face = image
 
@@ -273,7 +273,7 @@ def test():
 			if success:
 				context.data = frame
 				detector_consumer.run(context)
-				face = context.data
+				face = context.data[0] if context.alert else None
 			# Recognition
 			if context.alert:
 				context = recognizer_consumer.run(context)
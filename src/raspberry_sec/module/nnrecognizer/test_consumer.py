@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+from raspberry_sec.interface.consumer import ConsumerContext
+from raspberry_sec.module.nnrecognizer.consumer import NnrecognizerConsumer
+
+
+class StubModel:
+
+    def __init__(self, known: list):
+        self.known = known
+        self.batches = []
+
+    def predict(self, batch):
+        self.batches.append(batch)
+        return np.array([[0.1, 0.9] if known else [0.9, 0.1] for known in self.known])
+
+
+class TestNnrecognizerConsumerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.consumer = NnrecognizerConsumer(dict(size=8))
+        self.consumer.initialized = True
+        self.faces = [np.full((20, 20), 50, dtype=np.uint8), np.full((30, 24), 100, dtype=np.uint8),
+                      np.full((12, 12), 150, dtype=np.uint8)]
+
+    def test_recognize_runs_faces_in_one_batch(self):
+        # Given
+        self.consumer.model = StubModel([True, False, True])
+
+        # When
+        recognized = self.consumer.recognize(self.faces)
+
+        # Then
+        self.assertEqual([True, False, True], recognized)
+        self.assertEqual(1, len(self.consumer.model.batches))
+        self.assertEqual((3, 8, 8, 1), self.consumer.model.batches[0].shape)
+        self.assertEqual(np.float32, self.consumer.model.batches[0].dtype)
+
+    def test_run_predicts_once_per_frame(self):
+        # Given
+        self.consumer.model = StubModel([True, False, True])
+
+        # When
+        contexts = [self.consumer.run(ConsumerContext(list(self.faces), True)) for _ in range(2)]
+
+        # Then
+        self.assertEqual(2, len(self.consumer.model.batches))
+        for context in contexts:
+            self.assertTrue(context.alert)
+            self.assertEqual('Unknown face (1 of 3)', context.alert_data)
+            self.assertEqual(1, len(context.alert_images))
+
+    def test_run_does_not_alert_when_every_face_is_known(self):
+        # Given
+        self.consumer.model = StubModel([True, True, True])
+
+        # When
+        context = self.consumer.run(ConsumerContext(self.faces, True))
+
+        # Then
+        self.assertFalse(context.alert)
+        self.assertEqual([], context.alert_images)
+
+
+if __name__ == '__main__':
+    unittest.main()
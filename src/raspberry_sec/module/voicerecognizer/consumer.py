@@ -1,9 +1,12 @@
 import logging
-import time
 import importlib
+import numpy as np
 import speech_recognition as sr
 import builtins
 import json
+import os
+from raspberry_sec.module.voicerecognizer.keywords import KeywordSpotter
+from raspberry_sec.module.voicerecognizer.vad import VoiceActivityDetector
 from raspberry_sec.system.zonemanager import ZoneManager
 from raspberry_sec.system.pca import PCASystem
 from raspberry_sec.interface.producer import Type
@@ -16,6 +19,10 @@ class VoicerecognizerConsumer(Consumer):
 
 	"""
 	LOGGER = logging.getLogger('VoicerecognizerConsumer')
+	# 'recognizer' parameter: online recognition or offline keyword spotting
+	GOOGLE = 'google'
+	KEYWORDS = 'keywords'
+	COMMANDS = ['on', 'off']
 
 	def __init__(self, parameters: dict):
 		"""
@@ -26,6 +33,8 @@ class VoicerecognizerConsumer(Consumer):
 		self.initialized = False
 		self.zone_manager = None
 		self.VoiceRecognizer = None
+		self.vad = None
+		self.keyword_spotter = None
 
 	def initialize(self):
 		"""
@@ -33,8 +42,22 @@ class VoicerecognizerConsumer(Consumer):
 		"""
 		self.VoiceRecognizer = sr.Recognizer()
 		self.zone_manager = ZoneManager()
+		self.vad = VoiceActivityDetector(self.parameters['threshold'])
+		if self.parameters.get('recognizer', VoicerecognizerConsumer.GOOGLE) == VoicerecognizerConsumer.KEYWORDS:
+			VoicerecognizerConsumer.LOGGER.info('Using offline keyword spotting')
+			self.keyword_spotter = KeywordSpotter(
+				VoicerecognizerConsumer.get_path(self.parameters.get('keyword_templates', 'resources/keywords')),
+				self.parameters.get('keyword_threshold', 10))
 		self.initialized = True
 
+	@staticmethod
+	def get_path(file: str):
+		"""
+		:param file: e.g. resources/keywords
+		:return: the path for the file
+		"""
+		return os.sep.join([os.path.dirname(__file__), file])
+
 	def get_name(self):
 		return 'VoicerecognizerConsumer'
 
@@ -42,40 +65,69 @@ class VoicerecognizerConsumer(Consumer):
 		if not self.initialized:
 			self.initialize()
 
-		audio = None
 		audio = context.data
 		context.alert = False
-		zones = self.zone_manager.get_zones()
 
 		if audio:
-			try:
-				voice_recognition = self.VoiceRecognizer.recognize_google(audio)
-				VoicerecognizerConsumer.LOGGER.info('You said: ' + voice_recognition)
-
-				#Search in the zone dictionary the word that the user said
-				for key, value in zones.items():
-					if key in voice_recognition:
-						#search for the value in the word, whether on or off
-						if 'off' in voice_recognition:
-							if zones[key] == False:
-								VoicerecognizerConsumer.LOGGER.info(key + ' is already inactive')
-								break
-							else:
-								self.zone_manager.toggle_zone(key)
-								break
-						if 'on' in voice_recognition:
-							if zones[key] == True:
-								VoicerecognizerConsumer.LOGGER.info(key + ' is already active')
-								break
-							else:
-								self.zone_manager.toggle_zone(key)
-								break	
-			except sr.UnknownValueError: 
-				VoicerecognizerConsumer.LOGGER.info('Voicerecognizer could not understand audio')
-			except sr.RequestError as e:
-				print("Could not request results from Speech Recognition service; {0}".format(e))
-		time.sleep(3)
+			# only the speech is sent to the recognizer (16 bit PCM is expected)
+			samples = np.frombuffer(audio.get_raw_data(), dtype=np.int16)
+			for segment in self.vad.process(samples, audio.sample_rate):
+				VoicerecognizerConsumer.LOGGER.debug('Speech segment: ' + str(len(segment) / audio.sample_rate) + ' s')
+				self.recognize(sr.AudioData(segment.tobytes(), audio.sample_rate, 2), segment)
+
 		return context
 
+	def transcribe(self, audio: sr.AudioData, samples, zones: dict):
+		"""
+		Raises sr.UnknownValueError if nothing was recognized
+		:param audio: speech segment
+		:param samples: the same segment as 16 bit PCM array
+		:param zones: current zones (the vocabulary of the keyword spotting)
+		:return: the recognized text
+		"""
+		if self.keyword_spotter is None:
+			return self.VoiceRecognizer.recognize_google(audio)
+
+		# templates are only loaded again if the zones have changed
+		self.keyword_spotter.update_vocabulary(list(zones) + VoicerecognizerConsumer.COMMANDS)
+		text = self.keyword_spotter.spot(samples, audio.sample_rate)
+		if not text:
+			raise sr.UnknownValueError()
+		return text
+
+	def recognize(self, audio: sr.AudioData, samples):
+		"""
+		Recognizes the voice command and switches the zone it refers to
+		:param audio: speech segment
+		:param samples: the same segment as 16 bit PCM array
+		"""
+		zones = self.zone_manager.get_zones()
+		try:
+			voice_recognition = self.transcribe(audio, samples, zones)
+			VoicerecognizerConsumer.LOGGER.info('You said: ' + voice_recognition)
+
+			#Search in the zone dictionary the word that the user said
+			for key, value in zones.items():
+				if key in voice_recognition:
+					#search for the value in the word, whether on or off
+					if 'off' in voice_recognition:
+						if zones[key] == False:
+							VoicerecognizerConsumer.LOGGER.info(key + ' is already inactive')
+							break
+						else:
+							self.zone_manager.toggle_zone(key)
+							break
+					if 'on' in voice_recognition:
+						if zones[key] == True:
+							VoicerecognizerConsumer.LOGGER.info(key + ' is already active')
+							break
+						else:
+							self.zone_manager.toggle_zone(key)
+							break	
+		except sr.UnknownValueError: 
+			VoicerecognizerConsumer.LOGGER.info('Voicerecognizer could not understand audio')
+		except sr.RequestError as e:
+			VoicerecognizerConsumer.LOGGER.error('Could not request results from Speech Recognition service: ' + str(e))
+
 	def get_type(self):
 		return Type.MICROPHONE
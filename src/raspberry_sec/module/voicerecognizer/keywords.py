@@ -0,0 +1,159 @@
+import glob
+import logging
+import os
+import wave
+import numpy as np
+
+
+class KeywordSpotter:
+	"""
+	Offline recognizer for a small vocabulary (e.g. zone names and on/off).
+	Every word needs at least one recorded template (<word>.wav or <word>_<n>.wav in lower case, 16 bit mono).
+	The MFCC features of the templates are computed once per vocabulary, an utterance is matched against
+	them with subsequence DTW, so the words are found anywhere in it.
+	"""
+	LOGGER = logging.getLogger('KeywordSpotter')
+	FRAME_DURATION = 0.025
+	FRAME_STEP = 0.01
+	FFT_SIZE = 512
+	MEL_FILTERS = 26
+	CEPSTRAL_COEFFICIENTS = 13
+	# upper end of the filterbank (Hz), the same for every sample rate so features are comparable
+	MAX_FREQUENCY = 4000
+	PRE_EMPHASIS = 0.97
+
+	def __init__(self, template_dir: str, threshold: float):
+		"""
+		Constructor
+		:param template_dir: directory of the recorded templates
+		:param threshold: maximum average frame distance of a match
+		"""
+		self.template_dir = template_dir
+		self.threshold = threshold
+		self.vocabulary = None
+		# word --> list of MFCC feature matrices
+		self.templates = dict()
+		# sample rate --> (window, mel filterbank)
+		self.filterbanks = dict()
+
+	def get_filterbank(self, sample_rate: int):
+		"""
+		:param sample_rate: of the audio
+		:return: hamming window and mel filterbank matrix (cached per sample rate)
+		"""
+		if sample_rate not in self.filterbanks:
+			frame_length = int(sample_rate * KeywordSpotter.FRAME_DURATION)
+			fft_size = max(KeywordSpotter.FFT_SIZE, 1 << (frame_length - 1).bit_length())
+			max_mel = 2595 * np.log10(1 + min(KeywordSpotter.MAX_FREQUENCY, sample_rate / 2) / 700.0)
+			hz = 700 * (10 ** (np.linspace(0, max_mel, KeywordSpotter.MEL_FILTERS + 2) / 2595) - 1)
+			bins = np.floor((fft_size + 1) * hz / sample_rate).astype(int)
+
+			filterbank = np.zeros((KeywordSpotter.MEL_FILTERS, fft_size // 2 + 1))
+			for i in range(KeywordSpotter.MEL_FILTERS):
+				left, center, right = bins[i], bins[i + 1], bins[i + 2]
+				filterbank[i, left:center] = (np.arange(left, center) - left) / max(center - left, 1)
+				filterbank[i, center:right] = (right - np.arange(center, right)) / max(right - center, 1)
+			self.filterbanks[sample_rate] = (np.hamming(frame_length), filterbank)
+
+		return self.filterbanks[sample_rate]
+
+	def get_features(self, samples: np.ndarray, sample_rate: int):
+		"""
+		:param samples: 16 bit mono PCM
+		:param sample_rate: of the audio
+		:return: MFCC matrix (one row per frame, without the energy coefficient) or None if the audio is too short
+		"""
+		window, filterbank = self.get_filterbank(sample_rate)
+		frame_length = len(window)
+		step = int(sample_rate * KeywordSpotter.FRAME_STEP)
+		signal = samples.astype(np.float32)
+		signal = np.append(signal[0], signal[1:] - KeywordSpotter.PRE_EMPHASIS * signal[:-1])
+		if len(signal) < frame_length:
+			return None
+
+		count = 1 + (len(signal) - frame_length) // step
+		indices = np.arange(frame_length)[None, :] + step * np.arange(count)[:, None]
+		frames = signal[indices] * window
+		fft_size = (filterbank.shape[1] - 1) * 2
+		power = np.abs(np.fft.rfft(frames, fft_size)) ** 2 / fft_size
+		energies = np.log(np.maximum(power.dot(filterbank.T), 1e-10))
+
+		# DCT-II of the log filterbank energies (the 0th coefficient only depends on the loudness)
+		n = KeywordSpotter.MEL_FILTERS
+		dct = np.cos(np.pi / n * (np.arange(n) + 0.5)[None, :] * np.arange(1, KeywordSpotter.CEPSTRAL_COEFFICIENTS)[:, None])
+		return energies.dot(dct.T)
+
+	@staticmethod
+	def read_wav(path: str):
+		"""
+		:param path: of a 16 bit mono WAV file
+		:return: samples and sample rate
+		"""
+		with wave.open(path, 'rb') as wav:
+			return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16), wav.getframerate()
+
+	def update_vocabulary(self, words: list):
+		"""
+		Loads the templates of the words (only if the vocabulary has changed)
+		:param words: the words to be recognized
+		"""
+		vocabulary = sorted(set(words))
+		if vocabulary == self.vocabulary:
+			return
+
+		KeywordSpotter.LOGGER.info('Loading keyword templates: ' + str(vocabulary))
+		templates = dict()
+		for word in vocabulary:
+			paths = glob.glob(os.path.join(self.template_dir, word.lower() + '.wav'))
+			paths += glob.glob(os.path.join(self.template_dir, word.lower() + '_*.wav'))
+			features = [self.get_features(*KeywordSpotter.read_wav(path)) for path in paths]
+			templates[word] = [f for f in features if f is not None]
+			if not templates[word]:
+				KeywordSpotter.LOGGER.warning('No template for: ' + word)
+
+		if not any(templates.values()):
+			KeywordSpotter.LOGGER.error('No usable keyword template in ' + os.path.abspath(self.template_dir))
+
+		self.templates = templates
+		self.vocabulary = vocabulary
+
+	@staticmethod
+	def match(template: np.ndarray, utterance: np.ndarray):
+		"""
+		Subsequence DTW: the template may start and end anywhere in the utterance.
+		Steps (1, 0), (1, 1), (1, 2) keep every row vectorized.
+		:param template: MFCC matrix of the keyword
+		:param utterance: MFCC matrix of the utterance
+		:return: average frame distance of the best match and the frame where it ends
+		"""
+		distances = np.sqrt(((template[:, None, :] - utterance[None, :, :]) ** 2).sum(axis=2))
+		cost = distances[0].copy()
+		for row in distances[1:]:
+			previous = cost
+			cost = previous.copy()
+			cost[1:] = np.minimum(cost[1:], previous[:-1])
+			cost[2:] = np.minimum(cost[2:], previous[:-2])
+			cost += row
+		end = int(np.argmin(cost))
+		return cost[end] / len(template), end
+
+	def spot(self, samples: np.ndarray, sample_rate: int):
+		"""
+		:param samples: 16 bit mono PCM of the utterance
+		:param sample_rate: of the audio
+		:return: the words found in the utterance (in spoken order, separated by spaces)
+		"""
+		utterance = self.get_features(samples, sample_rate)
+		if utterance is None:
+			return ''
+
+		found = []
+		for word, templates in self.templates.items():
+			matches = [KeywordSpotter.match(template, utterance) for template in templates]
+			if matches:
+				distance, end = min(matches)
+				KeywordSpotter.LOGGER.debug(word + ': ' + str(distance))
+				if distance <= self.threshold:
+					found.append((end, word))
+
+		return ' '.join(word for _, word in sorted(found))
@@ -0,0 +1,86 @@
+import unittest
+import os
+import tempfile
+import wave
+import numpy as np
+from raspberry_sec.module.voicerecognizer.keywords import KeywordSpotter
+
+RATE = 16000
+# synthetic words: sequences of tones (Hz)
+WORDS = {'on': [300, 1200], 'off': [2000, 600]}
+
+
+def noise(seconds: float, seed: int):
+    return np.random.RandomState(seed).normal(0, 30, int(RATE * seconds))
+
+
+def word(name: str, seed: int):
+    t = np.arange(int(RATE * 0.2)) / RATE
+    tones = [3000 * np.sin(2 * np.pi * frequency * t) for frequency in WORDS[name]]
+    return np.concatenate(tones) + noise(0.2 * len(tones), seed)
+
+
+def pcm(*parts):
+    return np.concatenate(parts).astype(np.int16)
+
+
+class TestKeywordSpotterMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.template_dir = tempfile.TemporaryDirectory()
+        for name in WORDS:
+            with wave.open(os.path.join(self.template_dir.name, name + '.wav'), 'wb') as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(RATE)
+                wav.writeframes(pcm(word(name, seed=1)).tobytes())
+        self.spotter = KeywordSpotter(self.template_dir.name, threshold=10)
+        self.spotter.update_vocabulary(list(WORDS))
+
+    def tearDown(self):
+        self.template_dir.cleanup()
+
+    def test_spot_finds_word_inside_longer_utterance(self):
+        # Given
+        utterance = pcm(noise(0.5, seed=2), word('on', seed=3), noise(0.7, seed=4))
+
+        # When
+        result = self.spotter.spot(utterance, RATE)
+
+        # Then
+        self.assertEqual('on', result)
+
+    def test_spot_returns_nothing_for_silence(self):
+        # Given
+        utterance = pcm(noise(1.5, seed=5))
+
+        # When
+        result = self.spotter.spot(utterance, RATE)
+
+        # Then
+        self.assertEqual('', result)
+
+    def test_spot_returns_words_in_spoken_order(self):
+        # Given
+        utterance = pcm(noise(0.3, seed=6), word('off', seed=7), noise(0.3, seed=8), word('on', seed=9), noise(0.3, seed=10))
+
+        # When
+        result = self.spotter.spot(utterance, RATE)
+
+        # Then
+        self.assertEqual('off on', result)
+
+    def test_update_vocabulary_logs_error_without_templates(self):
+        # Given
+        spotter = KeywordSpotter(os.path.join(self.template_dir.name, 'missing'), threshold=10)
+
+        # When
+        with self.assertLogs('KeywordSpotter', level='ERROR'):
+            spotter.update_vocabulary(['kitchen'])
+
+        # Then
+        self.assertEqual('', spotter.spot(pcm(word('on', seed=2)), RATE))
+
+
+if __name__ == '__main__':
+    unittest.main()
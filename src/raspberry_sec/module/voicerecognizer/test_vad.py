@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+from raspberry_sec.module.voicerecognizer.vad import VoiceActivityDetector
+
+RATE = 16000
+
+
+def silence(seconds: float):
+    return np.zeros(int(RATE * seconds), dtype=np.int16)
+
+
+def tone(seconds: float):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (3000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+
+
+class TestVoiceActivityDetectorMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.vad = VoiceActivityDetector(threshold=500)
+
+    def test_process_returns_padded_speech_segment(self):
+        # Given
+        samples = np.concatenate([silence(0.5), tone(0.5), silence(1)])
+
+        # When
+        segments = self.vad.process(samples, RATE)
+
+        # Then
+        self.assertEqual(1, len(segments))
+        self.assertEqual(int(RATE * (0.5 + 2 * VoiceActivityDetector.PADDING)), len(segments[0]))
+
+    def test_process_drops_short_bursts(self):
+        # Given
+        samples = np.concatenate([silence(0.5), tone(0.1), silence(1)])
+
+        # When
+        segments = self.vad.process(samples, RATE)
+
+        # Then
+        self.assertEqual([], segments)
+
+    def test_process_stitches_segment_of_several_pieces(self):
+        # Given
+        samples = np.concatenate([silence(0.5), tone(0.5), silence(1)])
+        expected = VoiceActivityDetector(threshold=500).process(samples, RATE)[0]
+
+        # When
+        segments = []
+        for start in range(0, len(samples), 1000):
+            segments += self.vad.process(samples[start:start + 1000], RATE)
+
+        # Then
+        self.assertEqual(1, len(segments))
+        self.assertTrue(np.array_equal(expected, segments[0]))
+
+    def test_process_closes_long_segment(self):
+        # Given
+        samples = np.concatenate([silence(0.5), tone(VoiceActivityDetector.MAX_SEGMENT + 1), silence(1)])
+
+        # When
+        segments = self.vad.process(samples, RATE)
+
+        # Then
+        self.assertEqual(2, len(segments))
+        self.assertEqual(int(RATE * VoiceActivityDetector.MAX_SEGMENT), len(segments[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+from collections import deque
+import numpy as np
+
+
+class VoiceActivityDetector:
+	"""
+	Energy / zero-crossing based voice activity detection on 16 bit mono PCM.
+	The audio is cut into short frames that are classified all at once,
+	consecutive speech frames are collected into segments which are trimmed
+	to the speech (plus a little padding) and returned once the speaker stops.
+	"""
+	# length of a frame (seconds)
+	FRAME_DURATION = 0.02
+	# unvoiced speech (e.g. fricatives) has less energy, but many zero crossings
+	UNVOICED_ZCR = 0.3
+	# silence closing a segment (seconds)
+	HANGOVER = 0.3
+	# silence kept before and after the speech (seconds)
+	PADDING = 0.06
+	# shorter segments are dropped as noise (seconds)
+	MIN_SPEECH = 0.15
+	# longer segments are closed anyway (seconds)
+	MAX_SEGMENT = 8
+
+	def __init__(self, threshold: float):
+		"""
+		Constructor
+		:param threshold: RMS energy of a voiced frame
+		"""
+		self.threshold = threshold
+		self.sample_rate = None
+		self.pending = np.empty(0, dtype=np.int16)
+		self.preroll = deque()
+		self.segment = []
+		self.speech_frames = 0
+		self.trailing_frames = 0
+
+	def get_frames(self, seconds: float):
+		"""
+		:param seconds: duration
+		:return: number of frames
+		"""
+		return max(1, int(round(seconds / VoiceActivityDetector.FRAME_DURATION)))
+
+	def classify(self, frames: np.ndarray):
+		"""
+		:param frames: 2D array (one frame per row)
+		:return: boolean array, True for the speech frames
+		"""
+		samples = frames.astype(np.float32)
+		rms = np.sqrt(np.mean(samples * samples, axis=1))
+		zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+		return (rms > self.threshold) | ((rms > self.threshold / 2) & (zcr > VoiceActivityDetector.UNVOICED_ZCR))
+
+	def reset(self, sample_rate: int):
+		"""
+		Drops the collected audio
+		:param sample_rate: of the upcoming audio
+		"""
+		self.sample_rate = sample_rate
+		self.pending = np.empty(0, dtype=np.int16)
+		self.preroll = deque(maxlen=self.get_frames(VoiceActivityDetector.PADDING))
+		self.segment = []
+
+	def close_segment(self):
+		"""
+		:return: the trimmed speech of the current segment or None if it was too short
+		"""
+		padding = self.get_frames(VoiceActivityDetector.PADDING)
+		end = len(self.segment) - max(0, self.trailing_frames - padding)
+		segment = self.segment[:end]
+		speech_frames = self.speech_frames
+
+		self.segment = []
+		self.preroll.clear()
+		if speech_frames < self.get_frames(VoiceActivityDetector.MIN_SPEECH):
+			return None
+		return np.concatenate(segment)
+
+	def process(self, samples: np.ndarray, sample_rate: int):
+		"""
+		:param samples: the next piece of the audio (int16)
+		:param sample_rate: of the audio
+		:return: list of the speech segments that ended in this piece (int16 arrays)
+		"""
+		if sample_rate != self.sample_rate:
+			self.reset(sample_rate)
+
+		frame_length = int(sample_rate * VoiceActivityDetector.FRAME_DURATION)
+		samples = np.concatenate([self.pending, samples])
+		count = len(samples) // frame_length
+		self.pending = samples[count * frame_length:]
+		frames = samples[:count * frame_length].reshape(count, frame_length)
+
+		hangover = self.get_frames(VoiceActivityDetector.HANGOVER)
+		max_segment = self.get_frames(VoiceActivityDetector.MAX_SEGMENT)
+		segments = []
+		for frame, is_speech in zip(frames, self.classify(frames)):
+			if not self.segment:
+				if is_speech:
+					self.segment = list(self.preroll) + [frame]
+					self.speech_frames = 1
+					self.trailing_frames = 0
+				else:
+					self.preroll.append(frame)
+				continue
+
+			self.segment.append(frame)
+			if is_speech:
+				self.speech_frames += 1
+				self.trailing_frames = 0
+			else:
+				self.trailing_frames += 1
+
+			if self.trailing_frames >= hangover or len(self.segment) >= max_segment:
+				segment = self.close_segment()
+				if segment is not None:
+					segments.append(segment)
+
+		return segments
@@ -0,0 +1,75 @@
+from array import array
+from collections import deque
+
+
+class AlertWindow:
+	"""
+	Sliding time window over the alerts of the streams referenced by a query.
+	The last alert of every stream is kept in a compact array (fast expiry check),
+	the recent alert timestamps are only walked if the stream is still inside the window.
+	Every alert may carry a message, which is handed out once (see pop_messages).
+	"""
+	def __init__(self, length: float, names: set, limit: int):
+		"""
+		Constructor
+		:param length: of the window in seconds
+		:param names: upper-case stream names to be tracked
+		:param limit: maximum number of alerts kept per stream
+		"""
+		self.length = length
+		self.index = {name: i for i, name in enumerate(sorted(names))}
+		self.last_alerts = array('d', [float('-inf')] * len(self.index))
+		# per stream: deque of [timestamp, message]
+		self.alerts = [deque(maxlen=limit) for _ in self.index]
+
+	def add(self, name: str, timestamp: float, message=None):
+		"""
+		Registers an alert (streams the query does not reference are ignored)
+		:param name: upper-case stream name
+		:param timestamp: time of the alert
+		:param message: to be reported if the alert takes part in a decision
+		:return: True if the stream is tracked
+		"""
+		i = self.index.get(name)
+		if i is None:
+			return False
+
+		self.alerts[i].append([timestamp, message])
+		if timestamp > self.last_alerts[i]:
+			self.last_alerts[i] = timestamp
+		return True
+
+	def get_counts(self, now: float):
+		"""
+		Drops the expired alerts and counts the rest
+		:param now: end of the window
+		:return: number of alerts per stream within the window
+		"""
+		start = now - self.length
+		counts = dict()
+		for name, i in self.index.items():
+			alerts = self.alerts[i]
+			if self.last_alerts[i] < start:
+				alerts.clear()
+				continue
+
+			while alerts and alerts[0][0] < start:
+				alerts.popleft()
+			counts[name] = len(alerts)
+		return counts
+
+	def pop_messages(self, now: float):
+		"""
+		Hands out the messages of the alerts within the window that have not been handed out yet
+		:param now: end of the window
+		:return: list of messages (ordered by the time of the alerts)
+		"""
+		start = now - self.length
+		pending = []
+		for alerts in self.alerts:
+			for alert in alerts:
+				if alert[0] >= start and alert[1] is not None:
+					pending.append((alert[0], alert[1]))
+					alert[1] = None
+		pending.sort(key=lambda alert: alert[0])
+		return [message for _, message in pending]
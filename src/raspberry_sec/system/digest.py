@@ -0,0 +1,87 @@
+import logging
+from collections import OrderedDict
+
+
+class TokenBucket:
+	"""
+	Rate limiter: every event takes a token, tokens are refilled at a constant rate
+	"""
+	def __init__(self, rate: float, capacity: float):
+		"""
+		Constructor
+		:param rate: tokens added per second
+		:param capacity: maximum number of tokens (burst size)
+		"""
+		self.rate = rate
+		self.capacity = capacity
+		self.tokens = capacity
+		self.updated = None
+
+	def take(self, now: float):
+		"""
+		:param now: current time in seconds
+		:return: True if there was a token, False if the event has to wait
+		"""
+		if self.updated is not None:
+			self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+		self.updated = now
+
+		if self.tokens >= 1:
+			self.tokens -= 1
+			return True
+		return False
+
+
+class ActionDigest:
+	"""
+	Collects the ActionMessage-s of the alerts and releases them as one digest:
+	the first alert right away, the ones arriving in the next 'window' seconds together at the end of it
+	(and only if the rate limit allows it).
+	Messages with identical content (text and snapshots) are only kept once.
+	"""
+	LOGGER = logging.getLogger('ActionDigest')
+
+	def __init__(self, window: float, limit: int, bucket: TokenBucket = None):
+		"""
+		Constructor
+		:param window: time to collect messages for in seconds
+		:param limit: maximum number of messages in a digest (the oldest ones are dropped)
+		:param bucket: rate limit of the digests (None: unlimited)
+		"""
+		self.window = window
+		self.limit = limit
+		self.bucket = bucket
+		# (text, snapshots) --> ActionMessage
+		self.pending = OrderedDict()
+		self.last_released = None
+
+	def add(self, action_messages: list, now: float):
+		"""
+		:param action_messages: ActionMessage-s of an alert
+		:param now: current time in seconds
+		"""
+		for msg in action_messages:
+			key = (str(msg.data), tuple(msg.images))
+			if key in self.pending:
+				continue
+			self.pending[key] = msg
+			if len(self.pending) > self.limit:
+				self.pending.popitem(last=False)
+
+	def flush(self, now: float):
+		"""
+		:param now: current time in seconds
+		:return: list of ActionMessage-s to be fired or None if the digest is not due yet
+		"""
+		if not self.pending:
+			return None
+		if self.last_released is not None and now - self.last_released < self.window:
+			return None
+		if self.bucket is not None and not self.bucket.take(now):
+			ActionDigest.LOGGER.debug('Rate limit reached, holding back ' + str(len(self.pending)) + ' messages')
+			return None
+
+		digest = list(self.pending.values())
+		self.pending.clear()
+		self.last_released = now
+		return digest
@@ -0,0 +1,171 @@
+import logging
+import queue
+import time
+from multiprocessing import Queue
+import numpy as np
+from raspberry_sec.system.util import ProcessContext, ProcessReady
+
+
+class InferenceRequest:
+	"""
+	Batch of samples sent to the inference process
+	"""
+	def __init__(self, client_id: str, request_id: int, batch: np.ndarray):
+		"""
+		Constructor
+		:param client_id: identifies the response queue of the sender
+		:param request_id: sequence number of the request (per client)
+		:param batch: input of the model (the first dimension is the batch)
+		"""
+		self.client_id = client_id
+		self.request_id = request_id
+		self.batch = batch
+
+
+class InferenceClient:
+	"""
+	Stands in for the model in the stream processes: predict sends the batch
+	to the shared inference process and waits for the result.
+	"""
+	LOGGER = logging.getLogger('InferenceClient')
+	TIMEOUT = 5
+
+	def __init__(self, client_id: str, request_queue: Queue, response_queue: Queue):
+		"""
+		Constructor
+		:param client_id: identifies the client in the inference process
+		:param request_queue: shared by every client of the model
+		:param response_queue: only used by this client
+		"""
+		self.client_id = client_id
+		self.request_queue = request_queue
+		self.response_queue = response_queue
+		self.request_id = 0
+
+	def predict(self, batch: np.ndarray):
+		"""
+		Raises TimeoutError if the inference process does not respond in time
+		and RuntimeError if the prediction failed.
+		:param batch: input of the model
+		:return: output of the model
+		"""
+		self.request_id += 1
+		self.request_queue.put(InferenceRequest(self.client_id, self.request_id, batch))
+
+		deadline = time.monotonic() + InferenceClient.TIMEOUT
+		while True:
+			try:
+				request_id, prediction = self.response_queue.get(timeout=max(0, deadline - time.monotonic()))
+			except queue.Empty:
+				raise TimeoutError('No response from the inference process')
+
+			if request_id != self.request_id:
+				InferenceClient.LOGGER.debug('Dropping late response: ' + str(request_id))
+				continue
+			if prediction is None:
+				raise RuntimeError('Inference process could not run the model')
+			return prediction
+
+
+class InferenceServer(ProcessReady):
+	"""
+	Runs a model in a single process on behalf of every stream that uses it.
+	Requests arriving within MAX_LATENCY of each other are run as one batch.
+	"""
+	LOGGER = logging.getLogger('InferenceServer')
+	# maximum number of samples in a batch
+	MAX_BATCH = 32
+	# maximum time the first request of a batch waits for the others (seconds)
+	MAX_LATENCY = 0.02
+	WAIT_TIMEOUT = 1
+
+	def __init__(self, model_path: str):
+		"""
+		Constructor
+		:param model_path: path of the model file
+		"""
+		self.model_path = model_path
+		self.model = None
+		self.request_queue = Queue()
+		self.response_queues = dict()
+
+	def create_client(self, client_id: str):
+		"""
+		Has to be called before the process is started
+		:param client_id: unique name of the client
+		:return: new InferenceClient
+		"""
+		response_queue = Queue()
+		self.response_queues[client_id] = response_queue
+		return InferenceClient(client_id, self.request_queue, response_queue)
+
+	def load_model(self):
+		"""
+		:return: the loaded model
+		"""
+		# imported here, so only the inference process pays for the runtime
+		from keras.models import load_model
+		return load_model(self.model_path)
+
+	def collect_requests(self):
+		"""
+		Waits for a request and then for further ones until the batch is full or the deadline passes.
+		Raises queue.Empty if there was no request at all.
+		:return: list of InferenceRequest
+		"""
+		requests = [self.request_queue.get(timeout=InferenceServer.WAIT_TIMEOUT)]
+		size = len(requests[0].batch)
+
+		deadline = time.monotonic() + InferenceServer.MAX_LATENCY
+		while size < InferenceServer.MAX_BATCH:
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				break
+			try:
+				request = self.request_queue.get(timeout=remaining)
+			except queue.Empty:
+				break
+			requests.append(request)
+			size += len(request.batch)
+
+		return requests
+
+	def serve(self, requests: list):
+		"""
+		Runs the requests as one batch and sends the results back to the clients
+		:param requests: list of InferenceRequest
+		"""
+		try:
+			prediction = self.model.predict(np.concatenate([request.batch for request in requests]))
+		except Exception as e:
+			InferenceServer.LOGGER.error('Cannot run the model: ' + str(e))
+			prediction = None
+
+		start = 0
+		for request in requests:
+			end = start + len(request.batch)
+			result = prediction[start:end] if prediction is not None else None
+			self.response_queues[request.client_id].put((request.request_id, result))
+			start = end
+
+	def run(self, context: ProcessContext):
+		"""
+		Loads the model and serves the requests until the stop event.
+		If the model cannot be loaded, the requests are still answered (with None),
+		so the clients fail right away instead of waiting for the timeout.
+		:param context: holds the 'stop event'
+		"""
+		InferenceServer.LOGGER.info('Loading model: ' + self.model_path)
+		try:
+			self.model = self.load_model()
+		except Exception as e:
+			InferenceServer.LOGGER.error('Cannot load model: ' + self.model_path + ' (' + str(e) + ')')
+
+		while not context.stop_event.is_set():
+			try:
+				requests = self.collect_requests()
+			except queue.Empty:
+				continue
+
+			InferenceServer.LOGGER.debug('Serving ' + str(len(requests)) + ' request(s)')
+			self.serve(requests)
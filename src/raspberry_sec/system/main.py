@@ -12,13 +12,15 @@ class PCARuntime:
 	"""
 	Container class for the environment
 	"""
-	def __init__(self, log_queue: Queue, pca_system: PCASystem):
+	def __init__(self, log_queue: Queue, pca_system: PCASystem, log_level: int = logging.DEBUG):
 		"""
 		Constructor
 		:param log_queue: loggin Queue
 		:param pca_system: PCASystem instance
+		:param log_level: logging level of the component processes
 		"""
 		self.log_queue = log_queue
+		self.log_level = log_level
 		self.pca_system = pca_system
 		self.pca_thread = None
 		self.stop_event = None
@@ -41,7 +43,7 @@ class PCARuntime:
 		self.stop_event.clear()
 
 		# PCA
-		pca_context = ProcessContext(log_queue=self.log_queue, stop_event=self.stop_event)
+		pca_context = ProcessContext(log_queue=self.log_queue, stop_event=self.stop_event, log_level=self.log_level)
 		self.pca_thread = Thread(target=self.pca_system.run, name='PCA', args=(pca_context,))
 
 		# START
@@ -90,15 +92,15 @@ class LogRuntime:
 		self.process.join()
 
 
-def run_pcasystem(env: str, log_queue: Queue):
+def run_pcasystem(env: str, log_runtime: LogRuntime):
 	"""
 	Loads the PCASystem specified from the configuration and starts it
 	:param env: test/prod
-	:param log_queue: logging queue to use
+	:param log_runtime: logging facility to use
 	"""
 	# PCA
 	config_file = os.path.abspath(os.path.join('../../config', env, 'pca_system.json'))
-	pca_runtime = PCARuntime(log_queue, PCARuntime.load_pca(config_file))
+	pca_runtime = PCARuntime(log_runtime.log_queue, PCARuntime.load_pca(config_file), log_runtime.level)
 	pca_runtime.start()
 
 	input('Please press enter to exit...')
@@ -113,10 +115,10 @@ if __name__ == '__main__':
 	log_runtime.start()
 
 	# Setup logging for current process
-	ProcessReady.setup_logging(log_runtime.log_queue)
+	ProcessReady.setup_logging(log_runtime.log_queue, log_runtime.level)
 
 	# PCA
-	run_pcasystem('prod', log_runtime.log_queue)
+	run_pcasystem('prod', log_runtime)
 
 	# Stop logging process
 	log_runtime.stop()
@@ -8,6 +8,7 @@ from raspberry_sec.system.util import Loader, DynamicLoader, ProcessContext, Pro
 from raspberry_sec.interface.action import Action
 from raspberry_sec.interface.consumer import Consumer
 from raspberry_sec.interface.producer import Producer, ProducerDataManager
+from raspberry_sec.system.inference import InferenceServer
 from raspberry_sec.system.stream import StreamController, Stream
 
 
@@ -28,6 +29,8 @@ class PCASystem(ProcessReady):
 		self.stream_processes = []
 		self.prod_to_proc = {}
 		self.prod_to_proxy = {}
+		self.model_to_server = {}
+		self.inference_processes = []
 
 		self.manager = None
 		self.stream_controller = None
@@ -71,10 +74,13 @@ class PCASystem(ProcessReady):
 		# 4 - start stream controller process
 		self.start_stream_controller_process(context)
 
-		# 5 - start stream processes
+		# 5 - start the shared inference processes
+		self.start_inference_processes(context)
+
+		# 6 - start stream processes
 		self.start_stream_processes(context)
 
-		# 6 - wait for the stop event and periodically check the producers
+		# 7 - wait for the stop event and periodically check the producers
 		self.wait_for_completion(context)
 
 		PCASystem.LOGGER.info('Finished')
@@ -89,6 +95,7 @@ class PCASystem(ProcessReady):
 		proc_context = ProcessContext(
 			stop_event=context.stop_event,
 			log_queue=context.logging_queue,
+			log_level=context.log_level,
 			shared_data_proxy=self.prod_to_proxy[producer]
 		)
 		return ProcessContext.create_process(
@@ -113,7 +120,8 @@ class PCASystem(ProcessReady):
 
 	def setup_shared_manager(self):
 		"""
-		Prepares the shared data manager for use and also constructs the proxies (for producers)
+		Prepares the shared data manager for use and also constructs the proxies (for producers).
+		Producers may hand out their own transport instead of a manager proxy (e.g. a shared-memory ring).
 		"""
 		PCASystem.LOGGER.info('Number of different producers: ' + str(len(self.producer_set)))
 		for producer in self.producer_set:
@@ -147,6 +155,7 @@ class PCASystem(ProcessReady):
 		sc_context = ProcessContext(
 			log_queue=context.logging_queue,
 			stop_event=context.stop_event,
+			log_level=context.log_level,
 			message_queue=self.sc_queue,
 		)
 		self.sc_process = ProcessContext.create_process(
@@ -158,6 +167,43 @@ class PCASystem(ProcessReady):
 		PCASystem.LOGGER.info('Starting stream-controller')
 		self.sc_process.start()
 
+	def setup_inference_servers(self):
+		"""
+		Creates one inference server per shared model and connects the consumers to it
+		"""
+		for stream in self.streams:
+			for consumer in stream.consumers:
+				model_path = consumer.get_shared_model()
+				if model_path is None:
+					continue
+
+				if model_path not in self.model_to_server:
+					self.model_to_server[model_path] = InferenceServer(model_path)
+				client_id = stream.name + '/' + consumer.get_name()
+				consumer.set_inference_client(self.model_to_server[model_path].create_client(client_id))
+
+	def start_inference_processes(self, context: ProcessContext):
+		"""
+		Creates and starts the shared inference processes (before the streams, which hold the clients)
+		:param context: holds the 'stop event' and the logging queue
+		"""
+		self.setup_inference_servers()
+		for model_path, server in self.model_to_server.items():
+			i_context = ProcessContext(
+				log_queue=context.logging_queue,
+				stop_event=context.stop_event,
+				log_level=context.log_level
+			)
+			proc = ProcessContext.create_process(
+				target=server.start,
+				name='Inference process',
+				args=(i_context, )
+			)
+			self.inference_processes.append(proc)
+
+			PCASystem.LOGGER.info('Starting inference process: ' + model_path)
+			proc.start()
+
 	def start_stream_processes(self, context: ProcessContext):
 		"""
 		Creates the stream processes .zoand fires them up.
@@ -167,6 +213,7 @@ class PCASystem(ProcessReady):
 			s_context = ProcessContext(
 				stop_event=context.stop_event,
 				log_queue=context.logging_queue,
+				log_level=context.log_level,
 				shared_data_proxy=self.prod_to_proxy[stream.producer],
 				sc_queue=self.sc_queue,
 			)
@@ -192,22 +239,33 @@ class PCASystem(ProcessReady):
 
 		PCASystem.LOGGER.info('Stop event arrived')
 
+		# producers finish on the stop event, they are not killed in the middle of publishing a sample
+		PCASystem.LOGGER.info('Waiting for producers')
+		for prod, proc in self.prod_to_proc.items():
+			proc.join()
+
 		stream_proc_count = str(len(self.stream_processes))
 		PCASystem.LOGGER.info('Number of stream processes to be stopped: ' + stream_proc_count)
 		for process in self.stream_processes:
 			process.terminate()
 
+		PCASystem.LOGGER.info('Stopping inference processes')
+		for process in self.inference_processes:
+			process.terminate()
+
 		PCASystem.LOGGER.info('Stopping stream controller')
 		self.sc_process.terminate()
 
-		PCASystem.LOGGER.info('Waiting for producers')
-		for prod, proc in self.prod_to_proc.items():
-			proc.join()
+		PCASystem.LOGGER.info('Releasing shared data proxies')
+		for prod, proxy in self.prod_to_proxy.items():
+			prod.release_shared_data_proxy(proxy)
 
 
 class PCALoader(Loader):
 	"""
 	Implementation of Loader, that is capable of loading a PCASystem from the package system.
+	Classes can either be loaded all at once (load) or one by one on demand (load_class),
+	the latter only imports the modules that are really used.
 	"""
 	LOGGER = logging.getLogger('PCALoader')
 	module_package = 'raspberry_sec.module'
@@ -247,25 +305,75 @@ class PCALoader(Loader):
 			class_names.append('.'.join([_module, package_name.capitalize() + module_name.capitalize()]))
 		return class_names
 
-	def load(self):
+	def __init__(self):
 		"""
-		Loads and stores the newly loaded class objects
+		Constructor
+		"""
+		self.manifest = None
+
+	@staticmethod
+	def build_manifest():
+		"""
+		Maps the class names to their full names based on the naming rules
+		(without importing the component modules).
+		E.g. TestConsumer --> xxx.yyy.test.consumer.TestConsumer
+		:return: dictionary of class names
 		"""
 		modules = DynamicLoader.list_modules(PCALoader.module_package)
 		modules = PCALoader.filter_for_allowed_modules(modules)
 		classes = PCALoader.generate_class_names(modules)
+		return {_class.split('.')[-1]: _class for _class in classes}
+
+	def get_manifest(self):
+		"""
+		:return: the manifest (built only once)
+		"""
+		if self.manifest is None:
+			self.manifest = PCALoader.build_manifest()
+		return self.manifest
 
-		for _class in classes:
+	def store_class(self, loaded_class):
+		"""
+		Stores the class object under the component type it belongs to
+		:param loaded_class: Action, Consumer or Producer child
+		"""
+		for key in self.loaded_classes.keys():
+			if issubclass(loaded_class, key):
+				self.loaded_classes[key][loaded_class.__name__] = loaded_class
+				break
+
+	def load(self):
+		"""
+		Loads and stores the newly loaded class objects
+		"""
+		for _class in self.get_manifest().values():
 			try:
-				loaded_class = DynamicLoader.load_class(_class)
+				self.store_class(DynamicLoader.load_class(_class))
 				PCALoader.LOGGER.info('Loaded: ' + _class)
-				for key in self.loaded_classes.keys():
-					if issubclass(loaded_class, key):
-						self.loaded_classes[key][loaded_class.__name__] = loaded_class
-						break
 			except ImportError:
 				PCALoader.LOGGER.error(_class + ' - Cannot be imported')
 
+	def load_class(self, class_name: str):
+		"""
+		Imports the module of a single class (if it has not been loaded yet).
+		Raises KeyError if there is no such component.
+		:param class_name: e.g. TestConsumer
+		:return: loaded class object
+		"""
+		for classes in self.loaded_classes.values():
+			if class_name in classes:
+				return classes[class_name]
+
+		manifest = self.get_manifest()
+		if class_name not in manifest:
+			PCALoader.LOGGER.error(class_name + ' - Unknown component')
+			raise KeyError(class_name)
+
+		loaded_class = DynamicLoader.load_class(manifest[class_name])
+		PCALoader.LOGGER.info('Loaded: ' + manifest[class_name])
+		self.store_class(loaded_class)
+		return loaded_class
+
 	def get_actions(self):
 		"""
 		:return: Action class dictionary
@@ -352,6 +460,11 @@ class PCASystemJSONEncoder(JSONEncoder):
 		obj_dict = dict()
 		obj_dict['msg_limit'] = obj.message_limit
 		obj_dict['polling_interval'] = obj.polling_interval
+		obj_dict['coalescing_window'] = obj.coalescing_window
+		obj_dict['correlation_window'] = obj.correlation_window
+		obj_dict['digest_window'] = obj.digest_window
+		obj_dict['rate_limit'] = obj.rate_limit
+		obj_dict['rate_burst'] = obj.rate_burst
 		obj_dict['query'] = obj.query
 		obj_dict['action'] = dict()
 
@@ -388,11 +501,8 @@ class PCASystemJSONDecoder(JSONDecoder):
 		:param args:
 		:param kwargs:
 		"""
-		pca_loader = PCALoader()
-		pca_loader.load()
-		self.loaded_producers = pca_loader.get_producers()
-		self.loaded_consumers = pca_loader.get_consumers()
-		self.loaded_actions = pca_loader.get_actions()
+		# components are only imported when the config refers to them
+		self.pca_loader = PCALoader()
 
 		json.JSONDecoder.__init__(self, object_hook=self.object_hook, *args, **kwargs)
 
@@ -420,13 +530,13 @@ class PCASystemJSONDecoder(JSONDecoder):
 
 			producer_class_name = obj_dict['producer'][PCASystemJSONEncoder.TYPE]
 			parameters_dict = obj_dict['producer'][PCASystemJSONEncoder.PARAMETERS]
-			new_stream.producer = self.loaded_producers[producer_class_name](parameters_dict)
+			new_stream.producer = self.pca_loader.load_class(producer_class_name)(parameters_dict)
 
 			new_stream.consumers = list()
 			for consumer in obj_dict['consumers']:
 				consumer_class_name = consumer[PCASystemJSONEncoder.TYPE]
 				parameters_dict = consumer[PCASystemJSONEncoder.PARAMETERS]
-				new_stream.consumers.append(self.loaded_consumers[consumer_class_name](parameters_dict))
+				new_stream.consumers.append(self.pca_loader.load_class(consumer_class_name)(parameters_dict))
 
 			return new_stream
 		except KeyError:
@@ -441,13 +551,23 @@ class PCASystemJSONDecoder(JSONDecoder):
 		try:
 			stream_controller = StreamController()
 			stream_controller.query = obj_dict['query']
-			stream_controller.msg_limit = int(obj_dict['msg_limit'])
+			stream_controller.message_limit = int(obj_dict['msg_limit'])
 			stream_controller.polling_interval = int(obj_dict['polling_interval'])
+			if obj_dict.get('coalescing_window') is not None:
+				stream_controller.coalescing_window = float(obj_dict['coalescing_window'])
+			if obj_dict.get('correlation_window') is not None:
+				stream_controller.correlation_window = float(obj_dict['correlation_window'])
+			if obj_dict.get('digest_window') is not None:
+				stream_controller.digest_window = float(obj_dict['digest_window'])
+			if obj_dict.get('rate_limit') is not None:
+				stream_controller.rate_limit = float(obj_dict['rate_limit'])
+			if obj_dict.get('rate_burst') is not None:
+				stream_controller.rate_burst = int(obj_dict['rate_burst'])
 
 			action_class_name = obj_dict['action'][PCASystemJSONEncoder.TYPE]
 			parameters_dict = obj_dict['action'][PCASystemJSONEncoder.PARAMETERS]
 
-			stream_controller.action = self.loaded_actions[action_class_name](parameters_dict)
+			stream_controller.action = self.pca_loader.load_class(action_class_name)(parameters_dict)
 			return stream_controller
 		except KeyError:
 			PCASystemJSONDecoder.LOGGER.error('Cannot load StreamController from JSON')
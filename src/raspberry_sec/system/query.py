@@ -0,0 +1,206 @@
+import re
+
+
+class QueryNode:
+	"""
+	Base class for the nodes of a compiled StreamController query
+	"""
+	def evaluate(self, counts: dict):
+		"""
+		:param counts: number of alerts per sender (upper-case stream names)
+		:return: value of the node (bool or int)
+		"""
+		pass
+
+
+class Literal(QueryNode):
+	"""
+	Constant value (True, False or an integer)
+	"""
+	def __init__(self, value):
+		self.value = value
+
+	def evaluate(self, counts: dict):
+		return self.value
+
+
+class Placeholder(QueryNode):
+	"""
+	@STREAM@ - the number of alerts the stream has reported (true if there was any)
+	"""
+	def __init__(self, name: str):
+		self.name = name
+
+	def evaluate(self, counts: dict):
+		return counts.get(self.name, 0)
+
+
+class Not(QueryNode):
+	"""
+	Logical negation
+	"""
+	def __init__(self, operand: QueryNode):
+		self.operand = operand
+
+	def evaluate(self, counts: dict):
+		return not self.operand.evaluate(counts)
+
+
+class And(QueryNode):
+	"""
+	Logical conjunction
+	"""
+	def __init__(self, operands: list):
+		self.operands = operands
+
+	def evaluate(self, counts: dict):
+		return all(operand.evaluate(counts) for operand in self.operands)
+
+
+class Or(QueryNode):
+	"""
+	Logical disjunction
+	"""
+	def __init__(self, operands: list):
+		self.operands = operands
+
+	def evaluate(self, counts: dict):
+		return any(operand.evaluate(counts) for operand in self.operands)
+
+
+class Comparison(QueryNode):
+	"""
+	Threshold check, e.g. @STREAM1@ >= 3
+	"""
+	OPERATORS = {
+		'>': lambda a, b: a > b,
+		'>=': lambda a, b: a >= b,
+		'<': lambda a, b: a < b,
+		'<=': lambda a, b: a <= b,
+		'==': lambda a, b: a == b,
+		'!=': lambda a, b: a != b
+	}
+
+	def __init__(self, left: QueryNode, operator: str, right: QueryNode):
+		self.left = left
+		self.operator = Comparison.OPERATORS[operator]
+		self.right = right
+
+	def evaluate(self, counts: dict):
+		return self.operator(self.left.evaluate(counts), self.right.evaluate(counts))
+
+
+class Query:
+	"""
+	Query compiled into an expression tree. Grammar:
+		expr := and_expr ('or' and_expr)*
+		and_expr := not_expr ('and' not_expr)*
+		not_expr := 'not' not_expr | atom
+		atom := '(' expr ')' | 'True' | 'False' | operand [comparison operand]
+		operand := @STREAM@ | integer
+	"""
+	TOKEN_PATTERN = re.compile(r'\s*(?:(@.*?@)|(\d+)|(>=|<=|==|!=|>|<|\(|\))|([A-Za-z_]\w*))')
+
+	def __init__(self, source: str):
+		"""
+		Constructor, raises ValueError if the query is malformed
+		:param source: e.g. '@STREAM1@ and (@STREAM2@ >= 2 or not @STREAM3@)'
+		"""
+		self.source = source
+		self.names = set()
+		self.tokens = Query.tokenize(source)
+		self.position = 0
+
+		self.root = self.parse_or()
+		if self.position != len(self.tokens):
+			raise ValueError('Unexpected token in query: ' + self.tokens[self.position])
+		self.tokens = None
+
+	@staticmethod
+	def tokenize(source: str):
+		"""
+		:param source: query string
+		:return: list of tokens
+		"""
+		tokens = []
+		position = 0
+		source = source.rstrip()
+		while position < len(source):
+			match = Query.TOKEN_PATTERN.match(source, position)
+			if not match:
+				raise ValueError('Cannot parse query at: ' + source[position:])
+			tokens.append(match.group(match.lastindex))
+			position = match.end()
+		return tokens
+
+	def peek(self):
+		"""
+		:return: the next token or None
+		"""
+		return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+	def next(self):
+		"""
+		:return: the next token (consumed)
+		"""
+		token = self.peek()
+		if token is None:
+			raise ValueError('Unexpected end of query')
+		self.position += 1
+		return token
+
+	def parse_or(self):
+		operands = [self.parse_and()]
+		while self.peek() == 'or':
+			self.next()
+			operands.append(self.parse_and())
+		return operands[0] if len(operands) == 1 else Or(operands)
+
+	def parse_and(self):
+		operands = [self.parse_not()]
+		while self.peek() == 'and':
+			self.next()
+			operands.append(self.parse_not())
+		return operands[0] if len(operands) == 1 else And(operands)
+
+	def parse_not(self):
+		if self.peek() == 'not':
+			self.next()
+			return Not(self.parse_not())
+		return self.parse_atom()
+
+	def parse_atom(self):
+		token = self.peek()
+		if token == '(':
+			self.next()
+			node = self.parse_or()
+			if self.next() != ')':
+				raise ValueError('Missing closing parenthesis in query')
+			return node
+		elif token in ('True', 'False'):
+			self.next()
+			return Literal(token == 'True')
+
+		node = self.parse_operand()
+		if self.peek() in Comparison.OPERATORS:
+			operator = self.next()
+			node = Comparison(node, operator, self.parse_operand())
+		return node
+
+	def parse_operand(self):
+		token = self.next()
+		if token.startswith('@'):
+			name = token[1:-1].upper()
+			self.names.add(name)
+			return Placeholder(name)
+		elif token.isdigit():
+			return Literal(int(token))
+		else:
+			raise ValueError('Unexpected token in query: ' + token)
+
+	def evaluate(self, counts: dict):
+		"""
+		:param counts: number of alerts per sender (upper-case stream names)
+		:return: True or False
+		"""
+		return bool(self.root.evaluate(counts))
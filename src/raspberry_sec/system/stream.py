@@ -1,8 +1,11 @@
 import logging
-import re
+import queue
 import time
+from collections import Counter
 from concurrent.futures import ThreadPoolExecutor
-from itertools import groupby
+from raspberry_sec.system.alertwindow import AlertWindow
+from raspberry_sec.system.digest import ActionDigest, TokenBucket
+from raspberry_sec.system.query import Query
 from raspberry_sec.system.zonemanager import ZoneManager
 from raspberry_sec.interface.action import ActionMessage
 from raspberry_sec.interface.consumer import ConsumerContext
@@ -14,6 +17,7 @@ class Stream(ProcessReady):
 	Class for storing stream components.
 	"""
 	LOGGER = logging.getLogger('Stream')
+	WAIT_TIMEOUT = 1
 
 	def __init__(self, _name: str):
 		"""
@@ -65,6 +69,27 @@ class Stream(ProcessReady):
 
 		return True
 
+	def run_consumers(self, c_context: ConsumerContext):
+		"""
+		Runs the consumers one after the other until one of them does not alert,
+		then notifies all of them about the result (no alert if the zone of the producer is not active)
+		:param c_context: context of the sample
+		:return: final context
+		"""
+		for consumer in self.consumers:
+			if not c_context.alert:
+				break
+			Stream.LOGGER.debug(self.name + ' calling consumer: ' + consumer.get_name())
+			c_context = consumer.run(c_context)
+
+		if c_context.alert and not self.zone_manager.is_zone_active(self.producer.get_zone()):
+			Stream.LOGGER.debug(self.name + ' alert ignored, zone is not active')
+			c_context.alert = False
+
+		for consumer in self.consumers:
+			consumer.notify(c_context)
+		return c_context
+
 	def run(self, context: ProcessContext):
 		"""
 		This method runs the stream.
@@ -76,25 +101,29 @@ class Stream(ProcessReady):
 		data_proxy = context.get_prop('shared_data_proxy')
 		sc_queue = context.get_prop('sc_queue')
 
-		# stream main loop
+		# stream main loop (only new samples are processed)
+		last_id = 0
 		while True:
 			try:
 				Stream.LOGGER.debug(self.name + ' calling producer')
-				data = self.producer.get_data(data_proxy)
+				sample = self.producer.get_next_data(data_proxy, last_id, Stream.WAIT_TIMEOUT)
+				if sample is None:
+					Stream.LOGGER.debug(self.name + ' no new sample')
+					continue
+
+				last_id, _, data = sample
 
 				c_context = ConsumerContext(data, True)
-				for consumer in self.consumers:
-					if not c_context.alert:
-						break
-					Stream.LOGGER.debug(self.name + ' calling consumer: ' + consumer.get_name())
-					c_context = consumer.run(c_context)
+				c_context.views = self.producer.get_views(data_proxy, last_id)
+				c_context = self.run_consumers(c_context)
 
-				if c_context.alert and self.zone_manager.is_zone_active(self.producer.get_zone()):
+				if c_context.alert:
 					Stream.LOGGER.debug(self.name + ' enqueueing controller message')
 					sc_queue.put(StreamControllerMessage(
 						_alert=c_context.alert,
 						_msg=c_context.alert_data,
-						_sender=self.name))
+						_sender=self.name,
+						_images=c_context.alert_images))
 			except Exception as e:
 				Stream.LOGGER.error('Something really bad happened: ' + e.__str__())
 
@@ -104,23 +133,26 @@ class StreamControllerMessage:
 	Class for managing notifications in case of alerts.
 	@see raspberry_sec.interface.action.Action
 	"""
-	def __init__(self, _alert: bool, _msg, _sender: str):
+	def __init__(self, _alert: bool, _msg, _sender: str, _timestamp: float = None, _images: list = None):
 		"""
 		Constructor
 		:param _alert: True or False
 		:param _msg: content of the alert
 		:param _sender: name of the stream that sent this message
+		:param _timestamp: time of the alert (defaults to now)
+		:param _images: snapshots of the alert (list of JPEG encoded bytes)
 		"""
 		self.alert = _alert
 		self.msg = _msg
 		self.sender = _sender
+		self.timestamp = _timestamp if _timestamp is not None else time.time()
+		self.images = _images if _images is not None else []
 
 class StreamController(ProcessReady):
 	"""
 	Class for handling StreamControllerMessage-s
 	"""
 	LOGGER = logging.getLogger('StreamController')
-	PLACEHOLDER_PATTERN = '@.*?@'
 
 	def __init__(self):
 		"""
@@ -128,78 +160,212 @@ class StreamController(ProcessReady):
 		"""
 		self.action = None
 		self.query = 'False'
+		self.compiled_query = None
 		self.polling_interval = 3
 		self.message_limit = 100
+		# None: sleep-poll the queue, otherwise block on it and coalesce messages for this many seconds
+		self.coalescing_window = None
+		# None: correlate the alerts of one batch, otherwise the alerts of the last this many seconds
+		self.correlation_window = None
+		self.alert_window = None
+		# None: fire the action on every alert, otherwise fire it at most once in this many seconds (later alerts merged into one digest)
+		self.digest_window = None
+		# None: no rate limit, otherwise the number of action firings allowed per minute (rate_burst at once)
+		self.rate_limit = None
+		self.rate_burst = 1
+		self.action_digest = None
+
+	@staticmethod
+	def compile_query(query: str):
+		"""
+		Parses the query into an expression tree
+		:param query: logical expression
+		:return: Query (always false if the expression is malformed)
+		"""
+		try:
+			StreamController.LOGGER.debug('Compiling query: ' + query)
+			return Query(query)
+		except ValueError as e:
+			StreamController.LOGGER.error('Could not compile the query: ' + query + ' (' + str(e) + ')')
+			compiled = Query('False')
+			compiled.source = query
+			return compiled
 
 	@staticmethod
 	def evaluate_query(query: str):
 		"""
-		Evaluates the query and returns a logical value as a response
+		Evaluates the query (without any alerting stream) and returns a logical value as a response
 		:param query: logical expression
 		:return: True or False
 		"""
-		try:
-			StreamController.LOGGER.debug('Evaluating query: ' + query)
-			return eval(query)
-		except Exception:
-			StreamController.LOGGER.error('Could not evaluate the query: ' + query)
-			return False
+		return StreamController.compile_query(query).evaluate(dict())
+
+	def get_compiled_query(self):
+		"""
+		The query is compiled only once (and again if it gets replaced)
+		:return: compiled version of self.query
+		"""
+		if self.compiled_query is None or self.compiled_query.source != self.query:
+			self.compiled_query = StreamController.compile_query(self.query)
+			self.alert_window = None
+		return self.compiled_query
+
+	def get_alert_window(self):
+		"""
+		:return: AlertWindow tracking the streams of the current query
+		"""
+		query = self.get_compiled_query()
+		if self.alert_window is None:
+			self.alert_window = AlertWindow(self.correlation_window, query.names, self.message_limit)
+		return self.alert_window
 
 	def decide_alert(self, messages: list):
 		"""
 		This method decides based on a list of messages
-		whether to alert or not. For that it puts together a logical
-		expression that it also evaluates afterwards.
+		whether to alert or not. For that it counts the alerts per sender
+		and evaluates the compiled query against them.
 		:param messages: list of StreamControllerMessage-s
 		:return: decision (True/False) and list of ActionMessage-s
 		"""
-		query = self.query
+		if self.correlation_window is not None:
+			return self.decide_alert_in_window(messages)
+
+		counts = Counter()
 		action_messages = []
 
 		# iterating through every alert message
-		for sender, msg_iter in groupby(messages, lambda m: m.sender):
-			msg_list = list(msg_iter)
-			StreamController.LOGGER.debug(sender + ' sent ' + str(len(msg_list)) + ' messages')
+		for msg in messages:
+			if msg.alert:
+				counts[msg.sender.upper()] += 1
+				action_messages.append(ActionMessage(msg.msg, msg.images))
+
+		if counts:
+			StreamController.LOGGER.debug('Alerts per sender: ' + str(dict(counts)))
+
+		return self.get_compiled_query().evaluate(counts), action_messages
 
-			sc_messages = [msg for msg in msg_list if msg.alert]
-			if sc_messages:
-				StreamController.LOGGER.debug(sender + ' reported ' + str(len(sc_messages)) + ' alerts')
+	def decide_alert_in_window(self, messages: list):
+		"""
+		Same as decide_alert, but the placeholders of the query mean
+		'alerted within the last correlation_window seconds'.
+		The query is evaluated as each alert arrives.
+		If it is true, the ActionMessage-s of every alert within the window are returned
+		(also the ones of earlier batches that have not been reported yet).
+		:param messages: list of StreamControllerMessage-s
+		:return: decision (True/False) and list of ActionMessage-s
+		"""
+		query = self.get_compiled_query()
+		window = self.get_alert_window()
+		alert = False
+		action_messages = []
+		# alerts of the streams the query does not reference
+		untracked_messages = []
+
+		for msg in messages:
+			if msg.alert:
+				action_message = ActionMessage(msg.msg, msg.images)
+				action_messages.append(action_message)
+				if not window.add(msg.sender.upper(), msg.timestamp, action_message):
+					untracked_messages.append(action_message)
+				alert = query.evaluate(window.get_counts(time.time())) or alert
+
+		if alert:
+			action_messages = window.pop_messages(time.time()) + untracked_messages
+		return alert, action_messages
+
+	def get_action_digest(self):
+		"""
+		:return: ActionDigest or None if the alerts are not to be merged
+		"""
+		if self.action_digest is None and (self.digest_window is not None or self.rate_limit is not None):
+			bucket = None
+			if self.rate_limit is not None:
+				bucket = TokenBucket(self.rate_limit / 60.0, self.rate_burst)
+			self.action_digest = ActionDigest(self.digest_window or 0, self.message_limit, bucket)
+		return self.action_digest
+
+	def collect_action_messages(self, alert: bool, action_messages: list):
+		"""
+		Passes the messages through the digest (if there is one)
+		:param alert: decision about the current messages
+		:param action_messages: ActionMessage-s of the current messages
+		:return: list of ActionMessage-s to be fired now or None
+		"""
+		digest = self.get_action_digest()
+		if digest is None:
+			return action_messages if alert else None
+
+		now = time.monotonic()
+		if alert:
+			digest.add(action_messages, now)
+		return digest.flush(now)
+
+	def poll_messages(self, message_queue):
+		"""
+		Fetches the messages that are already in the queue
+		:param message_queue: queue of StreamControllerMessage-s
+		:return: list of StreamControllerMessage-s
+		"""
+		StreamController.LOGGER.info('Checking message queue')
+		messages = []
+		count = 0
+
+		while not message_queue.empty() and count <= self.message_limit:
+			messages.append(message_queue.get(block=False))
+			count += 1
 
-				action_messages += [ActionMessage(scm.msg) for scm in sc_messages]
-				query = query.replace('@' + sender.upper() + '@', 'True')
-			else:
-				query = query.replace('@' + sender.upper() + '@', 'False')
+		return messages
 
-		# making sure no placeholder remains in query
-		query = re.sub(pattern=StreamController.PLACEHOLDER_PATTERN, repl='False', string=query)
+	def wait_for_messages(self, message_queue):
+		"""
+		Blocks until the first message arrives (at most for polling_interval seconds),
+		then collects the messages arriving within the coalescing window into the same batch.
+		:param message_queue: queue of StreamControllerMessage-s
+		:return: list of StreamControllerMessage-s (empty if nothing arrived)
+		"""
+		try:
+			messages = [message_queue.get(timeout=self.polling_interval)]
+		except queue.Empty:
+			return []
 
-		return StreamController.evaluate_query(query), action_messages
+		deadline = time.monotonic() + self.coalescing_window
+		while len(messages) <= self.message_limit:
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				break
+			try:
+				messages.append(message_queue.get(timeout=remaining))
+			except queue.Empty:
+				break
+
+		StreamController.LOGGER.debug('Collected ' + str(len(messages)) + ' messages')
+		return messages
 
 	def run(self, context: ProcessContext):
 		"""
-		This method polls the queue for new messages
+		This method waits for new messages (or polls the queue periodically)
 		and takes care of the action firing mechanism.
 		:param context: Process context
 		"""
 		message_queue = context.get_prop('message_queue')
+		polling = self.coalescing_window is None
 
 		# iterate through messages in queuone
 		with ThreadPoolExecutor(max_workers=4) as executor:
 			while True:
-				StreamController.LOGGER.info('Checking message queue')
-				messages = []
-				count = 0
-
 				# fetch messages
-				while not message_queue.empty() and count <= self.message_limit:
-					messages.append(message_queue.get(block=False))
-					count += 1
+				if polling:
+					messages = self.poll_messages(message_queue)
+				else:
+					messages = self.wait_for_messages(message_queue)
 
 				# process messages
 				alert, action_messages = self.decide_alert(messages)
 
-				# alert
-				if alert:
+				# alert (possibly merged with the previous alerts)
+				action_messages = self.collect_action_messages(alert, action_messages)
+				if action_messages:
 					executor.submit(self.action.fire, action_messages)
 
-				time.sleep(self.polling_interval)
+				if polling:
+					time.sleep(self.polling_interval)
@@ -0,0 +1,53 @@
+import unittest
+from raspberry_sec.system.alertwindow import AlertWindow
+
+
+class TestAlertWindowMethods(unittest.TestCase):
+
+    def test_get_counts_within_window(self):
+        # Given
+        window = AlertWindow(length=10, names={'STREAM1', 'STREAM2'}, limit=100)
+        window.add('STREAM1', 100)
+        window.add('STREAM1', 105)
+        window.add('STREAM2', 95)
+        window.add('STREAM3', 105)
+
+        # When
+        counts = window.get_counts(now=108)
+
+        # Then
+        self.assertEqual({'STREAM1': 2}, counts)
+
+    def test_get_counts_drops_expired_alerts(self):
+        # Given
+        window = AlertWindow(length=10, names={'STREAM1'}, limit=100)
+        window.add('STREAM1', 100)
+
+        # When
+        counts1 = window.get_counts(now=105)
+        counts2 = window.get_counts(now=120)
+
+        # Then
+        self.assertEqual({'STREAM1': 1}, counts1)
+        self.assertEqual({}, counts2)
+        self.assertEqual(0, len(window.alerts[0]))
+
+    def test_pop_messages_hands_out_messages_once(self):
+        # Given
+        window = AlertWindow(length=10, names={'STREAM1', 'STREAM2'}, limit=100)
+        window.add('STREAM2', 104, 'MSG3')
+        window.add('STREAM1', 90, 'MSG1')
+        window.add('STREAM1', 102, 'MSG2')
+
+        # When
+        messages1 = window.pop_messages(now=108)
+        messages2 = window.pop_messages(now=108)
+
+        # Then
+        self.assertEqual(['MSG2', 'MSG3'], messages1)
+        self.assertEqual([], messages2)
+        self.assertEqual({'STREAM1': 1, 'STREAM2': 1}, window.get_counts(now=108))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from raspberry_sec.interface.action import ActionMessage
+from raspberry_sec.system.digest import ActionDigest, TokenBucket
+
+
+class TestTokenBucketMethods(unittest.TestCase):
+
+    def test_take_refills_tokens(self):
+        # Given
+        bucket = TokenBucket(rate=0.5, capacity=2)
+
+        # When
+        results = [bucket.take(0), bucket.take(0), bucket.take(1), bucket.take(2)]
+
+        # Then
+        self.assertEqual([True, True, False, True], results)
+
+
+class TestActionDigestMethods(unittest.TestCase):
+
+    def test_flush_releases_first_message_immediately(self):
+        # Given
+        digest = ActionDigest(window=10, limit=100)
+        digest.add([ActionMessage('MSG1')], 0)
+
+        # When
+        messages = digest.flush(0)
+
+        # Then
+        self.assertEqual(['MSG1'], [msg.data for msg in messages])
+
+    def test_flush_merges_and_deduplicates_messages(self):
+        # Given
+        digest = ActionDigest(window=10, limit=100)
+        digest.add([ActionMessage('MSG0')], 0)
+        digest.flush(0)
+        digest.add([ActionMessage('MSG1'), ActionMessage('MSG2')], 1)
+        digest.add([ActionMessage('MSG1')], 5)
+
+        # When
+        early = digest.flush(5)
+        messages = digest.flush(10)
+
+        # Then
+        self.assertIsNone(early)
+        self.assertEqual(['MSG1', 'MSG2'], [msg.data for msg in messages])
+        self.assertIsNone(digest.flush(20))
+
+    def test_flush_holds_back_messages_over_rate_limit(self):
+        # Given
+        digest = ActionDigest(window=0, limit=2, bucket=TokenBucket(rate=0.1, capacity=1))
+        digest.add([ActionMessage('MSG1')], 0)
+        digest.flush(0)
+        digest.add([ActionMessage('MSG2'), ActionMessage('MSG3'), ActionMessage('MSG4')], 1)
+
+        # When
+        limited = digest.flush(1)
+        messages = digest.flush(10)
+
+        # Then
+        self.assertIsNone(limited)
+        self.assertEqual(['MSG3', 'MSG4'], [msg.data for msg in messages])
+
+
+if __name__ == '__main__':
+    unittest.main()
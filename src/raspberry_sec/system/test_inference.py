@@ -0,0 +1,82 @@
+import unittest
+import threading
+from multiprocessing import Event
+import numpy as np
+from raspberry_sec.system.inference import InferenceServer, InferenceRequest
+
+
+class DoublingModel:
+
+    def predict(self, batch):
+        self.batch_size = len(batch)
+        return batch * 2
+
+
+class TestInferenceServerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.server = InferenceServer('model.h5py')
+        self.server.model = DoublingModel()
+        self.client1 = self.server.create_client('STREAM1')
+        self.client2 = self.server.create_client('STREAM2')
+
+    def test_requests_of_different_clients_are_run_in_one_batch(self):
+        # Given
+        self.server.request_queue.put(InferenceRequest('STREAM1', 1, np.array([1, 2])))
+        self.server.request_queue.put(InferenceRequest('STREAM2', 1, np.array([3])))
+
+        # When
+        requests = self.server.collect_requests()
+        self.server.serve(requests)
+
+        # Then
+        self.assertEqual(3, self.server.model.batch_size)
+        self.assertEqual([2, 4], list(self.client1.response_queue.get(timeout=1)[1]))
+        self.assertEqual([6], list(self.client2.response_queue.get(timeout=1)[1]))
+
+    def test_predict_skips_late_responses(self):
+        # Given
+        self.client1.response_queue.put((0, np.array([0])))
+        self.client1.response_queue.put((1, np.array([8])))
+
+        # When
+        prediction = self.client1.predict(np.array([4]))
+
+        # Then
+        self.assertEqual([8], list(prediction))
+
+    def test_predict_throws_exception_when_model_fails(self):
+        # Given
+        self.server.model = None
+        self.server.request_queue.put(InferenceRequest('STREAM1', 1, np.array([1])))
+
+        # When
+        self.server.serve(self.server.collect_requests())
+
+        # Then
+        self.assertRaises(RuntimeError, self.client1.predict, np.array([1]))
+
+    def test_predict_throws_exception_when_model_cannot_be_loaded(self):
+        # Given
+        def load_model():
+            raise IOError('missing file')
+        self.server.model = None
+        self.server.load_model = load_model
+        context = type('Context', (), {'stop_event': Event()})()
+        thread = threading.Thread(target=self.server.run, args=(context, ))
+        thread.start()
+
+        # When
+        try:
+            self.assertRaises(RuntimeError, self.client1.predict, np.array([1]))
+            alive = thread.is_alive()
+        finally:
+            context.stop_event.set()
+            thread.join()
+
+        # Then
+        self.assertTrue(alive)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
 import unittest
-from raspberry_sec.system.pca import PCASystem, PCALoader
+import json
+import sys
+from unittest import mock
+from raspberry_sec.system.pca import PCASystem, PCALoader, PCASystemJSONEncoder, PCASystemJSONDecoder
 from raspberry_sec.system.stream import Stream, StreamController
 
 
@@ -45,6 +48,34 @@ class TestPCALoaderMethods(unittest.TestCase):
         self.assertTrue(modules.__contains__(package + '.test3.producer.Test3Producer'))
         self.assertTrue(modules.__contains__(package + '.test4.action.Test4Action'))
 
+    def test_build_manifest_does_not_import_modules(self):
+        # Given
+        package = PCALoader.module_package
+
+        # When
+        # other tests might have imported the module already
+        with mock.patch.dict(sys.modules):
+            sys.modules.pop(package + '.nnrecognizer.consumer', None)
+            manifest = PCALoader.build_manifest()
+            imported = package + '.nnrecognizer.consumer' in sys.modules
+
+        # Then
+        self.assertEqual(package + '.test.consumer.TestConsumer', manifest['TestConsumer'])
+        self.assertEqual(package + '.nnrecognizer.consumer.NnrecognizerConsumer', manifest['NnrecognizerConsumer'])
+        self.assertFalse(imported)
+
+    def test_load_class(self):
+        # Given
+        loader = PCALoader()
+
+        # When
+        loaded_class = loader.load_class('TestConsumer')
+
+        # Then
+        self.assertEqual('TestConsumer', loaded_class.__name__)
+        self.assertIs(loaded_class, loader.get_consumers()['TestConsumer'])
+        self.assertRaises(KeyError, loader.load_class, 'UnknownConsumer')
+
 
 class TestPCASystemMethods(unittest.TestCase):
 
@@ -79,5 +110,25 @@ class TestPCASystemMethods(unittest.TestCase):
         self.assertTrue(result)
 
 
+class TestPCASystemJSONMethods(unittest.TestCase):
+
+    def test_stream_controller_round_trip(self):
+        # Given
+        controller = StreamController()
+        controller.query = '@STREAM1@'
+        controller.message_limit = 7
+        controller.digest_window = 30.0
+        controller.action = PCALoader().load_class('TestAction')({'key': 'value'})
+
+        # When
+        decoded = json.loads(json.dumps(controller, cls=PCASystemJSONEncoder), cls=PCASystemJSONDecoder)
+
+        # Then
+        self.assertEqual('@STREAM1@', decoded.query)
+        self.assertEqual(7, decoded.message_limit)
+        self.assertEqual(30.0, decoded.digest_window)
+        self.assertEqual({'key': 'value'}, decoded.action.parameters)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from raspberry_sec.system.query import Query
+
+
+class TestQueryMethods(unittest.TestCase):
+
+    def test_evaluate_logical_operators(self):
+        # Given
+        query = Query('@STREAM1@ and (@STREAM2@ or not @STREAM3@)')
+
+        # Then
+        self.assertTrue(query.evaluate({'STREAM1': 1}))
+        self.assertTrue(query.evaluate({'STREAM1': 1, 'STREAM2': 1, 'STREAM3': 1}))
+        self.assertFalse(query.evaluate({'STREAM1': 1, 'STREAM3': 1}))
+        self.assertFalse(query.evaluate({}))
+
+    def test_evaluate_thresholds(self):
+        # Given
+        query = Query('@STREAM1@ >= 3 or 2 < @STREAM2@')
+
+        # Then
+        self.assertFalse(query.evaluate({'STREAM1': 2, 'STREAM2': 2}))
+        self.assertTrue(query.evaluate({'STREAM1': 3}))
+        self.assertTrue(query.evaluate({'STREAM2': 3}))
+
+    def test_names_are_collected_in_upper_case(self):
+        # When
+        query = Query('@stream1@ and @STREAM2@ ')
+
+        # Then
+        self.assertEqual({'STREAM1', 'STREAM2'}, query.names)
+
+    def test_malformed_query_throws_exception(self):
+        # Then
+        self.assertRaises(ValueError, Query, '@STREAM1@ and')
+        self.assertRaises(ValueError, Query, '(@STREAM1@ or @STREAM2@')
+        self.assertRaises(ValueError, Query, '__import__("os")')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
+import queue
+import time
 from raspberry_sec.system.stream import Stream, StreamController, StreamControllerMessage
 from raspberry_sec.interface.producer import Producer, Type
-from raspberry_sec.interface.consumer import Consumer
+from raspberry_sec.interface.consumer import Consumer, ConsumerContext
+from raspberry_sec.interface.action import ActionMessage
 
 
 class TestStreamMethods(unittest.TestCase):
@@ -64,6 +67,44 @@ class TestStreamMethods(unittest.TestCase):
         # Then
         self.assertTrue(result)
 
+    def test_run_consumers_notifies_skipped_consumers(self):
+        # Given
+        stream = Stream('STREAM')
+        notified = []
+        consumers = [Consumer(), Consumer()]
+        consumers[0].run = lambda c: ConsumerContext(c.data, False)
+        consumers[1].run = lambda c: self.fail('should be skipped')
+        for consumer in consumers:
+            consumer.get_name = lambda: 'CONSUMER'
+            consumer.notify = lambda c: notified.append(c.alert)
+        stream.consumers = consumers
+
+        # When
+        result = stream.run_consumers(ConsumerContext('DATA', True))
+
+        # Then
+        self.assertFalse(result.alert)
+        self.assertEqual([False, False], notified)
+
+    def test_run_consumers_ignores_alert_of_inactive_zone(self):
+        # Given
+        stream = Stream('STREAM')
+        stream.producer = Producer()
+        stream.zone_manager.is_zone_active = lambda zone: False
+        notified = []
+        consumer = Consumer()
+        consumer.get_name = lambda: 'CONSUMER'
+        consumer.run = lambda c: c
+        consumer.notify = lambda c: notified.append(c.alert)
+        stream.consumers = [consumer]
+
+        # When
+        result = stream.run_consumers(ConsumerContext('DATA', True))
+
+        # Then
+        self.assertFalse(result.alert)
+        self.assertEqual([False], notified)
+
 
 class TestStreamControllerMethods(unittest.TestCase):
 
@@ -122,6 +163,132 @@ class TestStreamControllerMethods(unittest.TestCase):
         self.assertFalse(result)
         self.assertEqual(0, len(action_msgs))
 
+    def test_decide_alert_passes_images_to_action_messages(self):
+        # Given
+        controller = StreamController()
+        controller.query = '@STREAM1@'
+        messages = [StreamControllerMessage(_alert=True, _msg='MSG', _sender='STREAM1', _images=[b'JPEG'])]
+
+        # When
+        result, action_msgs = controller.decide_alert(messages)
+
+        # Then
+        self.assertTrue(result)
+        self.assertEqual([b'JPEG'], action_msgs[0].images)
+
+    def test_decide_alert_with_interleaved_senders(self):
+        # Given
+        controller = StreamController()
+        controller.query = '@STREAM1@ >= 2 and not @STREAM3@'
+        messages = [
+            StreamControllerMessage(_alert=True, _msg='MSG', _sender='STREAM1'),
+            StreamControllerMessage(_alert=True, _msg='MSG', _sender='STREAM2'),
+            StreamControllerMessage(_alert=True, _msg='MSG', _sender='STREAM1')
+        ]
+
+        # When
+        result, action_msgs = controller.decide_alert(messages)
+
+        # Then
+        self.assertTrue(result)
+        self.assertEqual(3, len(action_msgs))
+
+    def test_decide_alert_correlates_messages_within_window(self):
+        # Given
+        controller = StreamController()
+        controller.query = '@STREAM1@ and @STREAM2@'
+        controller.correlation_window = 10
+        now = time.time()
+
+        # When
+        result1, _ = controller.decide_alert([
+            StreamControllerMessage(_alert=True, _msg='MSG1', _sender='STREAM1', _timestamp=now - 5)])
+        result2, action_msgs = controller.decide_alert([
+            StreamControllerMessage(_alert=True, _msg='MSG2', _sender='STREAM2', _timestamp=now)])
+
+        # Then
+        self.assertFalse(result1)
+        self.assertTrue(result2)
+        self.assertEqual(['MSG1', 'MSG2'], [msg.data for msg in action_msgs])
+
+    def test_decide_alert_reports_correlated_messages_once(self):
+        # Given
+        controller = StreamController()
+        controller.query = '@STREAM1@ and @STREAM2@'
+        controller.correlation_window = 10
+        now = time.time()
+        controller.decide_alert([
+            StreamControllerMessage(_alert=True, _msg='MSG1', _sender='STREAM1', _timestamp=now - 5),
+            StreamControllerMessage(_alert=True, _msg='MSG2', _sender='STREAM2', _timestamp=now - 4)])
+
+        # When
+        result, action_msgs = controller.decide_alert([
+            StreamControllerMessage(_alert=True, _msg='MSG3', _sender='STREAM2', _timestamp=now)])
+
+        # Then
+        self.assertTrue(result)
+        self.assertEqual(['MSG3'], [msg.data for msg in action_msgs])
+
+    def test_decide_alert_ignores_expired_messages(self):
+        # Given
+        controller = StreamController()
+        controller.query = '@STREAM1@ and @STREAM2@'
+        controller.correlation_window = 10
+        now = time.time()
+
+        # When
+        controller.decide_alert([
+            StreamControllerMessage(_alert=True, _msg='MSG', _sender='STREAM1', _timestamp=now - 20)])
+        result, _ = controller.decide_alert([
+            StreamControllerMessage(_alert=True, _msg='MSG', _sender='STREAM2', _timestamp=now)])
+
+        # Then
+        self.assertFalse(result)
+
+    def test_collect_action_messages_merges_alerts_into_digest(self):
+        # Given
+        controller = StreamController()
+        controller.digest_window = 0.05
+        action_msgs = [ActionMessage('MSG')]
+
+        # When
+        result1 = controller.collect_action_messages(True, action_msgs)
+        result2 = controller.collect_action_messages(True, action_msgs)
+        time.sleep(0.05)
+        result3 = controller.collect_action_messages(False, [])
+
+        # Then
+        self.assertEqual(1, len(result1))
+        self.assertIsNone(result2)
+        self.assertEqual(1, len(result3))
+
+    def test_wait_for_messages_coalesces_batch(self):
+        # Given
+        controller = StreamController()
+        controller.coalescing_window = 0.05
+        message_queue = queue.Queue()
+        message_queue.put(StreamControllerMessage(_alert=True, _msg='MSG', _sender='STREAM1'))
+        message_queue.put(StreamControllerMessage(_alert=True, _msg='MSG', _sender='STREAM2'))
+
+        # When
+        messages = controller.wait_for_messages(message_queue)
+
+        # Then
+        self.assertEqual(2, len(messages))
+        self.assertTrue(message_queue.empty())
+
+    def test_wait_for_messages_returns_empty_list_on_timeout(self):
+        # Given
+        controller = StreamController()
+        controller.coalescing_window = 0.05
+        controller.polling_interval = 0.01
+
+        # When
+        messages = controller.wait_for_messages(queue.Queue())
+
+        # Then
+        self.assertEqual([], messages)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,19 @@
 import unittest
-from raspberry_sec.system.util import DynamicLoader
+import logging
+import multiprocessing
+import queue
+import time
+from raspberry_sec.system.util import DynamicLoader, BatchingQueueHandler, ProcessReady, ProcessContext
+
+
+class LoggingProcess(ProcessReady):
+
+    def run(self, context: ProcessContext):
+        for i in range(context.get_prop('count')):
+            logging.getLogger('LoggingProcess').info('CHILD %d', i)
+        if context.get_prop('wait'):
+            context.stop_event.set()
+            time.sleep(60)
 
 
 class TestDynamicLoaderMethods(unittest.TestCase):
@@ -26,5 +40,111 @@ class TestDynamicLoaderMethods(unittest.TestCase):
         self.assertTrue(loaded_class.__name__ == DynamicLoader.__name__)
 
 
+class TestBatchingQueueHandlerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = queue.Queue()
+        self.handler = BatchingQueueHandler(self.queue, capacity=3, flush_interval=60)
+        self.logger = logging.getLogger('TestBatchingQueueHandler')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+
+    def test_records_are_sent_in_batches(self):
+        # When
+        for i in range(4):
+            self.logger.info('Message %d', i)
+
+        # Then
+        batch = self.queue.get_nowait()
+        self.assertEqual(3, len(batch))
+        self.assertEqual('Message 0', batch[0].msg)
+        self.assertIsNone(batch[0].args)
+        self.assertTrue(self.queue.empty())
+
+    def test_warning_flushes_batch(self):
+        # When
+        self.logger.debug('Message')
+        self.logger.warning('Warning')
+
+        # Then
+        self.assertEqual(2, len(self.queue.get_nowait()))
+
+    def test_close_flushes_remaining_records(self):
+        # Given
+        self.logger.info('Message')
+
+        # When
+        self.handler.close()
+
+        # Then
+        self.assertEqual(1, len(self.queue.get_nowait()))
+
+
+class TestProcessReadyMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.mp_context = multiprocessing.get_context('fork')
+        self.log_queue = self.mp_context.Queue()
+        self.stop_event = self.mp_context.Event()
+        self.root = logging.getLogger()
+        self.old_handlers = list(self.root.handlers)
+        self.old_level = self.root.level
+        self.handler = ProcessReady.setup_logging(self.log_queue, logging.DEBUG)
+
+    def tearDown(self):
+        self.root.removeHandler(self.handler)
+        self.handler.close()
+        for handler in self.old_handlers:
+            if handler not in self.root.handlers:
+                self.root.addHandler(handler)
+        self.root.setLevel(self.old_level)
+
+    def start_child(self, count: int, wait: bool):
+        context = ProcessContext(self.log_queue, self.stop_event, logging.DEBUG, count=count, wait=wait)
+        process = self.mp_context.Process(target=LoggingProcess().start, args=(context,))
+        process.start()
+        return process
+
+    def get_messages(self):
+        messages = []
+        try:
+            while True:
+                messages.extend(record.getMessage() for record in self.log_queue.get(timeout=1))
+        except queue.Empty:
+            return messages
+
+    def test_records_of_forked_process_arrive_once(self):
+        # Given
+        logging.getLogger('TestProcessReady').info('PARENT')
+
+        # When
+        process = self.start_child(3, False)
+        process.join(10)
+        self.root.removeHandler(self.handler)
+        self.handler.close()
+
+        # Then
+        messages = self.get_messages()
+        self.assertEqual(0, process.exitcode)
+        self.assertEqual(['CHILD 0', 'CHILD 1', 'CHILD 2', 'PARENT'], sorted(messages))
+
+    def test_records_of_terminated_process_are_sent(self):
+        # Given
+        process = self.start_child(2, True)
+        self.assertTrue(self.stop_event.wait(10))
+
+        # When
+        process.terminate()
+        process.join(10)
+
+        # Then
+        self.assertEqual(['CHILD 0', 'CHILD 1'], sorted(self.get_messages()))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import os
+import json
+import tempfile
+from raspberry_sec.system.zonemanager import ZoneManager
+
+
+class TestZoneManagerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.original_path = ZoneManager.CONFIG_PATH
+        self.config_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        json.dump({'stream_controller': {'zones': {'Kitchen': True, 'Garage': False}}}, self.config_file)
+        self.config_file.close()
+
+        ZoneManager.CONFIG_PATH = self.config_file.name
+        ZoneManager.cached_zones = None
+        ZoneManager.cached_mtime = None
+        self.zone_manager = ZoneManager()
+
+    def tearDown(self):
+        ZoneManager.CONFIG_PATH = self.original_path
+        ZoneManager.cached_zones = None
+        ZoneManager.cached_mtime = None
+        os.remove(self.config_file.name)
+
+    def test_is_zone_active(self):
+        # Then
+        self.assertTrue(self.zone_manager.is_zone_active('Kitchen'))
+        self.assertFalse(self.zone_manager.is_zone_active('Garage'))
+        self.assertFalse(self.zone_manager.is_zone_active('Attic'))
+
+    def test_toggle_zone_updates_cache_and_config(self):
+        # When
+        self.zone_manager.toggle_zone('Garage')
+
+        # Then
+        self.assertTrue(self.zone_manager.is_zone_active('Garage'))
+        self.assertTrue(ZoneManager.load_config()['stream_controller']['zones']['Garage'])
+
+    def test_add_and_delete_zone(self):
+        # When
+        self.zone_manager.add_zone('Attic')
+        zones_after_add = self.zone_manager.get_zones()
+        self.zone_manager.delete_zone('Kitchen')
+        zones_after_delete = self.zone_manager.get_zones()
+
+        # Then
+        self.assertFalse(zones_after_add['Attic'])
+        self.assertNotIn('Kitchen', zones_after_delete)
+
+    def test_external_change_invalidates_cache(self):
+        # Given
+        self.assertTrue(self.zone_manager.is_zone_active('Kitchen'))
+        with open(ZoneManager.CONFIG_PATH, 'w') as file:
+            json.dump({'stream_controller': {'zones': {'Kitchen': False}}}, file)
+        stat = os.stat(ZoneManager.CONFIG_PATH)
+        os.utime(ZoneManager.CONFIG_PATH, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        # When
+        ZoneManager.last_check = 0
+        active = self.zone_manager.is_zone_active('Kitchen')
+
+        # Then
+        self.assertFalse(active)
+
+
+if __name__ == '__main__':
+    unittest.main()
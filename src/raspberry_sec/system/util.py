@@ -1,7 +1,10 @@
 import importlib
 import pkgutil
 import logging
+import signal
+import time
 from multiprocessing import Queue, Event, Process
+from threading import Thread
 
 
 class Loader:
@@ -67,15 +70,17 @@ class ProcessContext:
 	Container for tools that might be needed when running
 	in a separate process.
 	"""
-	def __init__(self, log_queue: Queue, stop_event: Event, **kwargs):
+	def __init__(self, log_queue: Queue, stop_event: Event, log_level: int = logging.DEBUG, **kwargs):
 		"""
 		Constructor
 		:param log_queue: queue for the new process to log into
 		:param stop_event: Event object for being notified if needed
+		:param log_level: records below this level are dropped in the new process
 		:param other: anything else that might be needed (child specific data)
 		"""
 		self.logging_queue = log_queue
 		self.stop_event = stop_event
+		self.log_level = log_level
 		self.kwargs = kwargs
 
 	def get_prop(self, name: str):
@@ -108,20 +113,46 @@ class ProcessReady:
 	that are able to run on their own (in separate processes)
 	"""
 	@staticmethod
-	def setup_logging(log_queue: Queue):
-		handler = QueueHandler(log_queue)
+	def setup_logging(log_queue: Queue, level: int = logging.DEBUG):
+		"""
+		Routes the log records of the current process into the log-queue.
+		A handler inherited from the parent process (fork) is dropped without being flushed,
+		its buffered records belong to the parent.
+		:param log_queue: queue of the LogQueueListener
+		:param level: records below this level are dropped before being sent
+		:return: the new handler
+		"""
+		handler = BatchingQueueHandler(log_queue)
 		root = logging.getLogger()
-		root.removeHandler(handler)
+		for old_handler in [h for h in root.handlers if isinstance(h, QueueHandler)]:
+			root.removeHandler(old_handler)
+			if isinstance(old_handler, BatchingQueueHandler):
+				old_handler.discard()
+			else:
+				old_handler.close()
 		root.addHandler(handler)
-		root.setLevel(logging.DEBUG)
+		root.setLevel(level)
+		return handler
+
+	@staticmethod
+	def exit(signum, frame):
+		"""
+		SIGTERM handler (see Process.terminate): exits normally, so the pending log records are sent
+		"""
+		raise SystemExit(0)
 
 	def start(self, context: ProcessContext):
 		"""
 		Common entry point for a new process
 		:param context: containing the arguments when creating a new process
 		"""
-		ProcessReady.setup_logging(context.logging_queue)
-		self.run(context)
+		handler = ProcessReady.setup_logging(context.logging_queue, context.log_level)
+		signal.signal(signal.SIGTERM, ProcessReady.exit)
+		try:
+			self.run(context)
+		finally:
+			logging.getLogger().removeHandler(handler)
+			handler.close()
 
 	def run(self, context: ProcessContext):
 		"""
@@ -150,6 +181,21 @@ class QueueHandler(logging.Handler):
 		except:
 			self.handleError(record)
 
+	@staticmethod
+	def prepare(record: logging.LogRecord):
+		"""
+		Formats the message (and the exception) in advance,
+		so that the record can be pickled and shipped cheaply.
+		:param record: LogRecord
+		:return: the same record
+		"""
+		record.msg = record.getMessage()
+		record.args = None
+		if record.exc_info:
+			record.exc_text = logging.Formatter().formatException(record.exc_info)
+			record.exc_info = None
+		return record
+
 	def get_name(self):
 		"""
 		:return: name of the object
@@ -170,6 +216,83 @@ class QueueHandler(logging.Handler):
 		return hash(self.get_name())
 
 
+class BatchingQueueHandler(QueueHandler):
+	"""
+	QueueHandler that sends the (pre-formatted) records in batches.
+	A batch is sent if it is full, if it gets old or if a warning (or worse) arrives.
+	"""
+	CAPACITY = 50
+	FLUSH_INTERVAL = 0.5
+
+	def __init__(self, queue: Queue, capacity: int = CAPACITY, flush_interval: float = FLUSH_INTERVAL):
+		"""
+		Constructor
+		:param queue: log-queue
+		:param capacity: maximum number of records in a batch
+		:param flush_interval: maximum time (seconds) a record waits in the buffer
+		"""
+		super().__init__(queue)
+		self.capacity = capacity
+		self.flush_interval = flush_interval
+		self.buffer = []
+		self.closed = False
+		self.flusher = Thread(target=self.flush_periodically, name='LogFlusher', daemon=True)
+		self.flusher.start()
+
+	def emit(self, record):
+		"""
+		Adds the record to the current batch
+		"""
+		try:
+			self.buffer.append(QueueHandler.prepare(record))
+			if len(self.buffer) >= self.capacity or record.levelno >= logging.WARNING:
+				self.flush()
+		except:
+			self.handleError(record)
+
+	def flush(self):
+		"""
+		Sends the current batch (as a list of records)
+		"""
+		self.acquire()
+		try:
+			if self.buffer:
+				self.queue.put_nowait(self.buffer)
+				self.buffer = []
+		finally:
+			self.release()
+
+	def flush_periodically(self):
+		"""
+		Makes sure that records do not get stuck in the buffer
+		"""
+		while not self.closed:
+			time.sleep(self.flush_interval)
+			try:
+				self.flush()
+			except Exception:
+				pass
+
+	def close(self):
+		"""
+		Sends the remaining records and stops flushing
+		"""
+		self.closed = True
+		try:
+			self.flush()
+		finally:
+			super().close()
+
+	def discard(self):
+		"""
+		Drops the buffered records and stops flushing (the lock is not taken,
+		it might have been held by a thread that does not exist in a forked process)
+		"""
+		self.closed = True
+		self.buffer = []
+		super().close()
+
+
 class LogQueueListener:
 	"""
 	Class representing a listener that should run in a separate process.
@@ -191,11 +314,14 @@ class LogQueueListener:
 		# Normal operation
 		while True:
 			try:
-				record = logging_queue.get()
-				if record is None:
+				item = logging_queue.get()
+				if item is None:
 					break
-				logger = logging.getLogger(record.name)
-				if logger.isEnabledFor(record.levelno):
-					logger.handle(record)
+				# BatchingQueueHandler sends lists of records
+				records = item if isinstance(item, list) else [item]
+				for record in records:
+					logger = logging.getLogger(record.name)
+					if logger.isEnabledFor(record.levelno):
+						logger.handle(record)
 			except:
 				raise
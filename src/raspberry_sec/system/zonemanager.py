@@ -1,10 +1,20 @@
 import logging
-import os, sys, json
+import os, sys, json, time
+from threading import Lock
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
 class ZoneManager:
 
-	LOGGER = logging.getLogger('ZoneManager') 		
+	LOGGER = logging.getLogger('ZoneManager')
+	# minimum time between two modification checks of the config file (seconds)
+	CHECK_INTERVAL = 0.5
+
+	# Zone table cached per process. Every process writes through the config file,
+	# so a changed modification time means someone else has updated the zones.
+	cache_lock = Lock()
+	cached_zones = None
+	cached_mtime = None
+	last_check = 0
 
 	@staticmethod
 	def get_abs_path(file: str):
@@ -15,18 +25,58 @@ class ZoneManager:
 
 	CONFIG_PATH = get_abs_path.__func__('../../config/prod/pca_system.json')
 
+	@staticmethod
+	def load_config():
+		"""
+		:return: the parsed JSON config
+		"""
+		with open(ZoneManager.CONFIG_PATH, 'r') as file:
+			config = file.read()
+
+		return json.loads(config)
+
+	@staticmethod
+	def save_config(data: dict):
+		"""
+		Saves the JSON config and refreshes the cached zones
+		:param data: the whole config
+		"""
+		with ZoneManager.cache_lock:
+			with open(ZoneManager.CONFIG_PATH, 'w+') as file:
+				json.dump(fp=file, obj=data, indent=4, sort_keys=True)
+
+			ZoneManager.cached_zones = dict(data['stream_controller']['zones'])
+			ZoneManager.cached_mtime = os.stat(ZoneManager.CONFIG_PATH).st_mtime_ns
+			ZoneManager.last_check = time.monotonic()
+
+	@staticmethod
+	def get_cached_zones():
+		"""
+		Returns the cached zone table. The config file is only parsed again
+		if its modification time has changed since the last load.
+		:return: dictionary of zones (must not be modified)
+		"""
+		with ZoneManager.cache_lock:
+			now = time.monotonic()
+			if ZoneManager.cached_zones is not None and now - ZoneManager.last_check < ZoneManager.CHECK_INTERVAL:
+				return ZoneManager.cached_zones
+
+			ZoneManager.last_check = now
+			mtime = os.stat(ZoneManager.CONFIG_PATH).st_mtime_ns
+			if mtime != ZoneManager.cached_mtime:
+				ZoneManager.LOGGER.debug('Loading zones from ' + ZoneManager.CONFIG_PATH)
+				ZoneManager.cached_zones = ZoneManager.load_config()['stream_controller']['zones']
+				ZoneManager.cached_mtime = mtime
+
+			return ZoneManager.cached_zones
+
 	def initialize(self):
 		"""
 		Function, that initialize the zone manager module
 		:param _zones: the zones coming from the html code
 		"""
 		ZoneManager.LOGGER.info('Initializing ZoneManager...')
-		with open(ZoneManager.CONFIG_PATH, 'r') as file:
-			config = file.read()
-
-		data = json.loads(config)
-		stream_controller = data['stream_controller']
-		zones = stream_controller['zones'] 
+		zones = ZoneManager.get_cached_zones()
 
 		if zones:
 			ZoneManager.LOGGER.info('ZoneManager inizialized')
@@ -39,73 +89,45 @@ class ZoneManager:
 		:param zones: the new version of zones
 		"""
 		ZoneManager.LOGGER.info('Setting up new zones')
-		with open(ZoneManager.CONFIG_PATH, 'r') as file:
-			config = file.read()
-
-		data = json.loads(config)
+		data = ZoneManager.load_config()
 		data['stream_controller']['zones'] = zones
-
-		with open(ZoneManager.CONFIG_PATH, 'w+') as file:
-			json.dump(fp=file, obj=data, indent=4, sort_keys=True)
+		ZoneManager.save_config(data)
 
 	def get_zones(self):
 		"""
 		Function returns avaiable zones in the system
 		return: dictionary of zones
 		"""
-		ZoneManager.LOGGER.info('Getting zone informations')
-		with open(ZoneManager.CONFIG_PATH, 'r') as file:
-			config = file.read()
-
-		data = json.loads(config)
-		stream_controller = data['stream_controller']
-		zones = stream_controller['zones']
-		return zones
+		ZoneManager.LOGGER.debug('Getting zone informations')
+		return dict(ZoneManager.get_cached_zones())
 
 	def add_zone(self,zone: str):
 		"""
 		Add new zone
 		Save into the JSON config
 		"""
-		with open(ZoneManager.CONFIG_PATH, 'r') as file:
-			config = file.read()
-
-		data = json.loads(config)
+		data = ZoneManager.load_config()
 		data['stream_controller']['zones'][zone] = False
-
-		with open(ZoneManager.CONFIG_PATH, 'w+') as file:
-			json.dump(fp=file, obj=data, indent=4, sort_keys=True)
+		ZoneManager.save_config(data)
 
 	def delete_zone(self,zone: str):
 		"""
 		Deleting zone
 		Save into the JSON config
 		"""
-		with open(ZoneManager.CONFIG_PATH, 'r') as file:
-			config = file.read()
-
-		data = json.loads(config)
+		data = ZoneManager.load_config()
 		del data['stream_controller']['zones'][zone]
-
-		with open(ZoneManager.CONFIG_PATH, 'w+') as file:
-			json.dump(fp=file, obj=data, indent=4, sort_keys=True)	
+		ZoneManager.save_config(data)
 
 	def is_zone_active(self,zone: str):
 		"""
 		Function for deciding whether the zone is active or not
 		:param zone: zone, from which we want to know whether active or not
 		"""
-		with open(ZoneManager.CONFIG_PATH, 'r') as file:
-			config = file.read()
-
-		data = json.loads(config)
-		zones = data['stream_controller']['zones'] 
-
-		for key, value in zones.items():
-			if key == zone and zones[key] == True:
-				ZoneManager.LOGGER.info(zone + ' is active')
-				return True
-		ZoneManager.LOGGER.info(zone + ' is inactive, not alert')
+		if ZoneManager.get_cached_zones().get(zone) == True:
+			ZoneManager.LOGGER.debug(zone + ' is active')
+			return True
+		ZoneManager.LOGGER.debug(zone + ' is inactive, not alert')
 		return False
 
 
@@ -114,16 +136,10 @@ class ZoneManager:
 		Function for toggle zone activity
 		:param zone: the actual zone what we want to activate or deactivate
 		"""
-		with open(ZoneManager.CONFIG_PATH, 'r') as file:
-			config = file.read()
-
-		data = json.loads(config)
-		zones = data['stream_controller']['zones']
+		zones = self.get_zones()
 
-		for key, value in zones.items():
-				if key == zone:
-					zones[key] = not value
-					ZoneManager.LOGGER.info('Toggle ' + key + ' activity')
-					self.set_zones(zones)
-	
+		if zone in zones:
+			zones[zone] = not zones[zone]
+			ZoneManager.LOGGER.info('Toggle ' + zone + ' activity')
+			self.set_zones(zones)
 
@@ -1,9 +1,11 @@
-from tornado.ioloop import IOLoop
+from tornado import gen
+from tornado.ioloop import IOLoop, PeriodicCallback
 from tornado.httpserver import HTTPServer
 from tornado.web import Application, RequestHandler, authenticated
-from tornado.websocket import WebSocketHandler
+from tornado.websocket import WebSocketHandler, WebSocketClosedError
+from concurrent.futures import ThreadPoolExecutor
 import multiprocessing as mp
-import os, sys, logging, uuid, base64, json
+import os, sys, logging, uuid, base64, json, time
 import cv2
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 from raspberry_sec.system.zonemanager import ZoneManager
@@ -19,6 +21,8 @@ class BaseHandler(RequestHandler):
 
     LOG_RUNTIME = 'log'
 
+    FEED_HUBS = 'hubs'
+
     ZONEMANAGER = ZoneManager()
 
     @staticmethod
@@ -57,6 +61,14 @@ class BaseHandler(RequestHandler):
     def set_pca_runtime(self, value):
         self.shared_data[BaseHandler.PCA_RUNTIME] = value
 
+    def close_feed_hubs(self):
+        """
+        Stops the live feeds (their shared data proxies are released with the PCA system)
+        """
+        hubs = self.shared_data.pop(BaseHandler.FEED_HUBS, dict())
+        for hub in hubs.values():
+            hub.close()
+
     def get_current_user(self):
         """
         Returns secure cookie content
@@ -135,6 +147,7 @@ class ControlHandler(BaseHandler):
         ControlHandler.LOGGER.info('Stopping PCA')
         runtime = self.get_pca_runtime()
         if runtime:
+            self.close_feed_hubs()
             runtime.stop()
             self.set_pca_runtime(None)
 
@@ -144,9 +157,11 @@ class ControlHandler(BaseHandler):
         """
         ControlHandler.LOGGER.info('Starting PCA')
 
+        log_runtime = self.get_log_runtime()
         pca_runtime = PCARuntime(
-            self.get_log_runtime().log_queue,
-            PCARuntime.load_pca(BaseHandler.CONFIG_PATH))
+            log_runtime.log_queue,
+            PCARuntime.load_pca(BaseHandler.CONFIG_PATH),
+            log_runtime.level)
 
         self.set_pca_runtime(pca_runtime)
         pca_runtime.start()
@@ -190,12 +205,7 @@ class ZonesHandler(BaseHandler):
         Returns zones from JSON config
         """
         ZonesHandler.LOGGER.info('Handling GET message')
-        
-        with open(BaseHandler.CONFIG_PATH, 'r') as file:
-            config = file.read()
-
-        data = json.loads(config)
-        self.write(data['stream_controller']['zones'])
+        self.write(BaseHandler.ZONEMANAGER.get_zones())
 
     @authenticated
     def post(self):
@@ -251,10 +261,163 @@ class FeedHandler(BaseHandler):
         self.render('feed.html', producers=producers)
 
 
-class FeedWebSocketHandler(WebSocketHandler, BaseHandler):
+class FeedSubscription:
+    """
+    Push settings of a live feed client
+    """
+    def __init__(self, fps: float, profile: tuple):
+        """
+        Constructor
+        :param fps: frames per second
+        :param profile: (scale, JPEG quality)
+        """
+        self.interval = 1.0 / fps
+        self.profile = profile
+        self.next_time = 0
+        self.last_id = 0
+
+
+class FeedHub:
+    """
+    Broadcasts the frames of a producer to the live feed clients.
+    Every new frame is fetched once and encoded once per (scale, quality) profile,
+    clients that are still busy with the previous frame skip the current one.
+    Fetching and encoding run on the feed executor, the IOLoop only sends the bytes.
+    """
+    LOGGER = logging.getLogger('FeedHub')
+
+    TICK_INTERVAL = 1000 / 15
+
+    def __init__(self, producer, proxy):
+        """
+        Constructor
+        :param producer: Producer instance
+        :param proxy: its shared data proxy
+        """
+        self.producer = producer
+        self.proxy = proxy
+        self.subscribers = dict()
+        self.frame = None
+        self.frame_id = 0
+        # profile --> JPEG bytes of the current frame
+        self.encoded = dict()
+        self.preparing = False
+        self.closed = False
+        self.callback = PeriodicCallback(self.tick, FeedHub.TICK_INTERVAL)
+
+    def subscribe(self, handler, subscription: FeedSubscription):
+        """
+        :param handler: FeedWebSocketHandler
+        :param subscription: its push settings
+        """
+        self.subscribers[handler] = subscription
+        if not self.closed and not self.callback.is_running():
+            self.callback.start()
+
+    def unsubscribe(self, handler):
+        """
+        :param handler: FeedWebSocketHandler
+        """
+        self.subscribers.pop(handler, None)
+        if not self.subscribers:
+            self.stop()
+
+    def stop(self):
+        """
+        Stops broadcasting (e.g. if the system was restarted)
+        """
+        self.callback.stop()
+        self.frame = None
+        self.encoded.clear()
+
+    def close(self):
+        """
+        Stops broadcasting for good and drops the clients (the PCA system is being stopped)
+        """
+        self.closed = True
+        for handler in list(self.subscribers):
+            handler.hub = None
+        self.subscribers.clear()
+        self.stop()
+
+    def prepare(self, profiles: set):
+        """
+        Fetches the latest frame (if it is newer than the current one) and encodes it
+        with the profiles that are not cached yet. Runs on the feed executor.
+        :param profiles: set of (scale, JPEG quality)
+        :return: (frame id, frame, profile --> JPEG bytes) or None if there is no frame yet
+        """
+        sample = self.producer.get_next_data(self.proxy, self.frame_id, 0)
+        if sample is not None:
+            # the frame might be a view into shared memory, which is overwritten later on
+            frame_id, frame, encoded = sample[0], sample[2].copy(), dict()
+        else:
+            frame_id, frame, encoded = self.frame_id, self.frame, dict(self.encoded)
+
+        if frame is None:
+            return None
+        for profile in profiles - encoded.keys():
+            scale, quality = profile
+            encoded[profile] = FeedWebSocketHandler.img_to_jpeg(frame, quality, scale)
+        return frame_id, frame, encoded
+
+    @gen.coroutine
+    def tick(self):
+        """
+        Sends the latest frame to the clients that are due and ready
+        """
+        now = time.monotonic()
+        due = [(handler, subscription) for handler, subscription in self.subscribers.items()
+               if now >= subscription.next_time and not handler.is_busy()]
+        if not due or self.preparing or self.closed:
+            return
+
+        self.preparing = True
+        try:
+            prepared = yield FeedWebSocketHandler.EXECUTOR.submit(self.prepare, {s.profile for _, s in due})
+        except Exception as e:
+            FeedHub.LOGGER.error('Cannot prepare frame: ' + str(e))
+            prepared = None
+        finally:
+            self.preparing = False
+
+        # the hub might have been closed while the frame was being prepared
+        if prepared is None or self.closed:
+            return
+        self.frame_id, self.frame, self.encoded = prepared
+
+        for handler, subscription in due:
+            # the client might have left in the meantime
+            if handler not in self.subscribers or subscription.last_id == self.frame_id:
+                continue
+            subscription.last_id = self.frame_id
+            subscription.next_time = now + subscription.interval
+            handler.send_frame(self.encoded[subscription.profile])
 
+
+class FeedWebSocketHandler(WebSocketHandler, BaseHandler):
+    """
+    Live feed. A plain message (name of the producer) is answered with a single HTML image,
+    a JSON message ({"producer": ..., "fps": ..., "quality": ...}) starts pushing binary JPEG frames.
+    """
     LOGGER = logging.getLogger('FeedWebSocketHandler')
 
+    MAX_FPS = 15
+
+    DEFAULT_FPS = 2
+
+    DEFAULT_QUALITY = 70
+
+    DEFAULT_SCALE = 0.5
+
+    # frames are fetched and encoded here instead of on the IOLoop
+    EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+    def initialize(self, shared_data):
+        super().initialize(shared_data)
+        self.hub = None
+        self.pending_write = None
+
     def check_origin(self, origin):
         """
         For cross origin checking
@@ -285,25 +448,125 @@ class FeedWebSocketHandler(WebSocketHandler, BaseHandler):
         final_format = b64_encoded.decode('utf-8')
         return '<img class="img-responsive center-block" src="data:image/png;base64,' + final_format + '">'
 
+    @staticmethod
+    def img_to_jpeg(img, quality: int, scale: float = 0.5):
+        """
+        :param img: numpy array
+        :param quality: JPEG quality (0-100)
+        :param scale: of the resized image
+        :return: JPEG encoded bytes of the resized image
+        """
+        resized = cv2.resize(img, (0, 0), fx=scale, fy=scale)
+        return cv2.imencode('.jpg', resized, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+    def get_producer(self, selected: str):
+        """
+        :param selected: name of the producer
+        :return: the producer and its shared data proxy or (None, None)
+        """
+        runtime = self.get_pca_runtime()
+        if runtime:
+            for producer in runtime.pca_system.producer_set:
+                if producer.get_name() == selected:
+                    return producer, runtime.pca_system.prod_to_proxy[producer]
+        return None, None
+
+    def get_hub(self, selected: str):
+        """
+        :param selected: name of the producer
+        :return: FeedHub of the producer (shared by the clients) or None
+        """
+        producer, proxy = self.get_producer(selected)
+        if producer is None:
+            return None
+
+        hubs = self.shared_data.setdefault(BaseHandler.FEED_HUBS, dict())
+        hub = hubs.get(selected)
+        if hub is None or hub.proxy is not proxy:
+            # the system has been (re)started since the hub was created
+            if hub is not None:
+                hub.stop()
+            hub = FeedHub(producer, proxy)
+            hubs[selected] = hub
+        return hub
+
+    @gen.coroutine
     def on_message(self, message):
         """
         On incoming message this method fetches an image from the given producer and sends it back
-        :param message: name of the producer
+        (or starts pushing the images in case of a JSON message)
+        :param message: name of the producer or JSON push request
         """
         FeedWebSocketHandler.LOGGER.info('Handling web-socket message')
-        selected = message
-        runtime = self.get_pca_runtime()
+        try:
+            request = json.loads(message)
+        except ValueError:
+            request = None
+
+        if isinstance(request, dict):
+            self.start_push(request)
+            return
 
-        if not runtime or not [p for p in runtime.pca_system.producer_set if p.get_name() == selected]:
+        _, proxy = self.get_producer(message)
+        if proxy is None:
             self.write_message('ERROR')
         else:
-            producer = [p for p in runtime.pca_system.producer_set if p.get_name() == selected][0]
-            proxy = runtime.pca_system.prod_to_proxy[producer]
-            self.write_message(self.img_to_str(proxy.get_data()))
+            img_str = yield FeedWebSocketHandler.EXECUTOR.submit(lambda: self.img_to_str(proxy.get_data()))
+            try:
+                self.write_message(img_str)
+            except WebSocketClosedError:
+                FeedWebSocketHandler.LOGGER.debug('Web-socket closed before the image was sent')
+
+    def start_push(self, request: dict):
+        """
+        Subscribes to the frames of the producer (pushed by its FeedHub)
+        :param request: producer name, frames per second, JPEG quality and scale
+        """
+        self.stop_push()
+        hub = self.get_hub(request.get('producer'))
+        if hub is None:
+            self.write_message('ERROR')
+            return
+
+        try:
+            fps = min(max(float(request.get('fps', FeedWebSocketHandler.DEFAULT_FPS)), 0.1), FeedWebSocketHandler.MAX_FPS)
+            quality = min(max(int(request.get('quality', FeedWebSocketHandler.DEFAULT_QUALITY)), 10), 95)
+            scale = min(max(float(request.get('scale', FeedWebSocketHandler.DEFAULT_SCALE)), 0.1), 1.0)
+        except (TypeError, ValueError):
+            self.write_message('ERROR')
+            return
+
+        FeedWebSocketHandler.LOGGER.info('Pushing ' + request['producer'] + ' with ' + str(fps) + ' fps')
+        self.hub = hub
+        hub.subscribe(self, FeedSubscription(fps, (scale, quality)))
+
+    def is_busy(self):
+        """
+        :return: True if the previous frame is still being written
+        """
+        return self.pending_write is not None and not self.pending_write.done()
+
+    def send_frame(self, data: bytes):
+        """
+        Sends the frame as a binary message
+        :param data: JPEG bytes
+        """
+        try:
+            self.pending_write = self.write_message(data, binary=True)
+        except WebSocketClosedError:
+            self.stop_push()
+
+    def stop_push(self):
+        """
+        Stops pushing the frames
+        """
+        if self.hub is not None:
+            self.hub.unsubscribe(self)
+            self.hub = None
 
     def on_close(self):
         FeedWebSocketHandler.LOGGER.info('Closing web-socket')
-        pass
+        self.stop_push()
 
 
 class AboutHandler(BaseHandler):
@@ -411,7 +674,7 @@ if __name__ == '__main__':
     log_runtime.start()
 
     # Setup logging for current process
-    ProcessReady.setup_logging(log_runtime.log_queue)
+    ProcessReady.setup_logging(log_runtime.log_queue, log_runtime.level)
 
     server = make_app(log_runtime)
     server.listen(8080)
@@ -5,19 +5,35 @@ $(document).ready(function() {
 });
 
 // Feed
+var feedSocket = null;
+var feedFps = 5;
+var feedQuality = 70;
+
 $('.dropdown-menu li a').click(function() {
     var selected = $(this).text();
     $('#feed_dropdown:first-child').html(selected + ' <span class="caret"></span>');
 
+    if (feedSocket)
+        feedSocket.close();
     var ws = new WebSocket('wss://' + location.host + '/feed/websocket');
+    feedSocket = ws;
+    ws.binaryType = 'blob';
+    $('#feed_content').html('<img class="img-responsive center-block" id="feed_img">');
 
+    // the server pushes binary JPEG frames
     ws.onmessage = function(content) {
-       $('#feed_content').html(content.data);
-       setTimeout(() => ws.send(selected), 1000);
+        if (!(content.data instanceof Blob)) {
+            $('#feed_content').html(content.data);
+            return;
+        }
+        var img = document.getElementById('feed_img');
+        if (img.src)
+            URL.revokeObjectURL(img.src);
+        img.src = URL.createObjectURL(content.data);
     };
 
     ws.onopen = function(e) {
-        ws.send(selected);
+        ws.send(JSON.stringify({'producer': selected, 'fps': feedFps, 'quality': feedQuality}));
     };
 });
 
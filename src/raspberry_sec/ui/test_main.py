@@ -0,0 +1,204 @@
+import unittest
+import time
+import numpy as np
+from unittest import mock
+from tornado.testing import AsyncTestCase, gen_test
+from raspberry_sec.ui.main import FeedHub, FeedSubscription, FeedWebSocketHandler
+
+
+class StubProducer:
+
+    def __init__(self):
+        self.frame_id = 0
+        self.calls = 0
+
+    def add_frame(self):
+        self.frame_id += 1
+
+    def get_next_data(self, proxy, after_id, timeout):
+        self.calls += 1
+        if self.frame_id <= after_id:
+            return None
+        return self.frame_id, time.time(), np.zeros((4, 4, 3), dtype=np.uint8)
+
+
+class StubClient:
+
+    def __init__(self, busy: bool = False):
+        self.busy = busy
+        self.frames = []
+        self.hub = None
+
+    def is_busy(self):
+        return self.busy
+
+    def send_frame(self, data: bytes):
+        self.frames.append(data)
+
+
+def encode(img, quality: int, scale: float = 0.5):
+    return (scale, quality)
+
+
+@mock.patch.object(FeedWebSocketHandler, 'img_to_jpeg', side_effect=encode)
+class TestFeedHubMethods(AsyncTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.producer = StubProducer()
+        self.hub = FeedHub(self.producer, 'PROXY')
+        # ticks are driven by the tests
+        self.hub.callback = mock.Mock()
+
+    def subscribe(self, client: StubClient, fps: float = 1000, profile: tuple = (0.5, 70)):
+        client.hub = self.hub
+        self.hub.subscribe(client, FeedSubscription(fps, profile))
+        return client
+
+    @gen_test
+    def test_tick_encodes_frame_once_per_profile(self, img_to_jpeg):
+        # Given
+        clients = [self.subscribe(StubClient()) for _ in range(3)]
+        clients.append(self.subscribe(StubClient(), profile=(1.0, 90)))
+        self.producer.add_frame()
+
+        # When
+        yield self.hub.tick()
+
+        # Then
+        self.assertEqual(1, self.producer.calls)
+        self.assertEqual(2, img_to_jpeg.call_count)
+        self.assertEqual([[(0.5, 70)]] * 3 + [[(1.0, 90)]], [client.frames for client in clients])
+
+    @gen_test
+    def test_tick_skips_busy_clients(self, img_to_jpeg):
+        # Given
+        busy = self.subscribe(StubClient(busy=True))
+        ready = self.subscribe(StubClient())
+        self.producer.add_frame()
+
+        # When
+        yield self.hub.tick()
+
+        # Then
+        self.assertEqual([], busy.frames)
+        self.assertEqual(1, len(ready.frames))
+
+    @gen_test
+    def test_tick_keeps_fps_of_each_client(self, img_to_jpeg):
+        # Given
+        slow = self.subscribe(StubClient(), fps=1)
+        fast = self.subscribe(StubClient(), fps=1000)
+
+        # When
+        for _ in range(2):
+            self.producer.add_frame()
+            yield self.hub.tick()
+            time.sleep(0.01)
+
+        # Then
+        self.assertEqual(1, len(slow.frames))
+        self.assertEqual(2, len(fast.frames))
+
+    @gen_test
+    def test_tick_does_not_resend_unchanged_frame(self, img_to_jpeg):
+        # Given
+        client = self.subscribe(StubClient())
+        self.producer.add_frame()
+
+        # When
+        yield self.hub.tick()
+        time.sleep(0.01)
+        yield self.hub.tick()
+
+        # Then
+        self.assertEqual(2, self.producer.calls)
+        self.assertEqual(1, len(client.frames))
+        self.assertEqual(1, img_to_jpeg.call_count)
+
+    @gen_test
+    def test_tick_ignores_frame_prepared_after_close(self, img_to_jpeg):
+        # Given
+        client = self.subscribe(StubClient())
+        self.producer.add_frame()
+        prepare = self.hub.prepare
+
+        def close_while_preparing(profiles: set):
+            self.hub.close()
+            return prepare(profiles)
+
+        self.hub.prepare = close_while_preparing
+
+        # When
+        yield self.hub.tick()
+
+        # Then
+        self.assertEqual([], client.frames)
+        self.assertIsNone(client.hub)
+        self.assertIsNone(self.hub.frame)
+
+
+class TestFeedWebSocketHandlerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.hub = mock.Mock()
+        self.handler = FeedWebSocketHandler.__new__(FeedWebSocketHandler)
+        self.handler.hub = None
+        self.handler.pending_write = None
+        self.handler.get_hub = lambda producer: self.hub if producer == 'CAMERA' else None
+        self.messages = []
+        self.handler.write_message = self.messages.append
+
+    def get_subscription(self):
+        (handler, subscription), _ = self.hub.subscribe.call_args
+        self.assertIs(self.handler, handler)
+        return subscription
+
+    def test_start_push_clamps_upper_limits(self):
+        # When
+        self.handler.start_push({'producer': 'CAMERA', 'fps': 100, 'quality': 100, 'scale': 2})
+
+        # Then
+        subscription = self.get_subscription()
+        self.assertAlmostEqual(1.0 / FeedWebSocketHandler.MAX_FPS, subscription.interval)
+        self.assertEqual((1.0, 95), subscription.profile)
+        self.assertIs(self.hub, self.handler.hub)
+
+    def test_start_push_clamps_lower_limits(self):
+        # When
+        self.handler.start_push({'producer': 'CAMERA', 'fps': 0, 'quality': 0, 'scale': 0})
+
+        # Then
+        subscription = self.get_subscription()
+        self.assertAlmostEqual(10, subscription.interval)
+        self.assertEqual((0.1, 10), subscription.profile)
+
+    def test_start_push_uses_defaults(self):
+        # When
+        self.handler.start_push({'producer': 'CAMERA'})
+
+        # Then
+        subscription = self.get_subscription()
+        self.assertAlmostEqual(1.0 / FeedWebSocketHandler.DEFAULT_FPS, subscription.interval)
+        self.assertEqual(
+            (FeedWebSocketHandler.DEFAULT_SCALE, FeedWebSocketHandler.DEFAULT_QUALITY), subscription.profile)
+
+    def test_start_push_replies_error_for_unknown_producer(self):
+        # When
+        self.handler.start_push({'producer': 'UNKNOWN'})
+
+        # Then
+        self.assertEqual(['ERROR'], self.messages)
+        self.assertIsNone(self.handler.hub)
+
+    def test_start_push_replies_error_for_invalid_settings(self):
+        # When
+        self.handler.start_push({'producer': 'CAMERA', 'fps': 'fast'})
+
+        # Then
+        self.assertEqual(['ERROR'], self.messages)
+        self.assertFalse(self.hub.subscribe.called)
+
+
+if __name__ == '__main__':
+    unittest.main()